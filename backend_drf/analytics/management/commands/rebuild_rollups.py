@@ -0,0 +1,56 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.rollups import rebuild_history
+from business_entity.models import BusinessEntity
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the sales and counts rollups (daily, hourly, per item "
+        "and per customer) from orders, invoices, customers and products, "
+        "one month at a time. Run once after installing the analytics app, "
+        "and after any bulk change made outside the ORM."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--business",
+            type=int,
+            action="append",
+            help="Business id to rebuild. Repeatable; defaults to all."
+        )
+        parser.add_argument(
+            "--from",
+            dest="date_from",
+            type=date.fromisoformat,
+            help="First day to rebuild (YYYY-MM-DD); defaults to all history."
+        )
+        parser.add_argument(
+            "--to",
+            dest="date_to",
+            type=date.fromisoformat,
+            help="Last day to rebuild (YYYY-MM-DD); defaults to today."
+        )
+
+    def handle(self, *args, **options):
+        date_from = options["date_from"]
+        date_to = options["date_to"]
+
+        if date_to and not date_from:
+            raise CommandError("--to needs --from.")
+
+        if date_from and not date_to:
+            date_to = date.today()
+
+        businesses = BusinessEntity.objects.all()
+
+        if options["business"]:
+            businesses = businesses.filter(id__in=options["business"])
+
+        for business_id in businesses.values_list("id", flat=True):
+            months = sum(1 for _ in rebuild_history(business_id, date_from, date_to))
+            self.stdout.write(
+                f"Rebuilt rollups of business {business_id} ({months} months)."
+            )
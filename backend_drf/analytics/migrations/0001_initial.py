@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('business_entity', '0013_alter_businessentity_slug'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCountsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('customers', models.PositiveIntegerField(default=0)),
+                ('products', models.PositiveIntegerField(default=0)),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('invoices', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_counts', to='business_entity.businessentity')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('business', 'day'), name='daily_counts_rollup_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('paid_invoices', models.PositiveIntegerField(default=0)),
+                ('invoice_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('paid_orders', models.PositiveIntegerField(default=0)),
+                ('order_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='business_entity.businessentity')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('business', 'day'), name='daily_sales_rollup_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('business_entity', '0013_alter_businessentity_slug'),
+        ('customers', '0006_hot_filter_indexes'),
+        ('products', '0032_gst_components'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailysalesrollup',
+            name='tax',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.CreateModel(
+            name='CustomerSalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('documents', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('tax', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='customer_sales', to='business_entity.businessentity')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='customers.customer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['business', 'day'], name='customer_sales_rollup_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('customer', 'day'), name='customer_sales_rollup_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HourlySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('paid_invoices', models.PositiveIntegerField(default=0)),
+                ('invoice_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('paid_orders', models.PositiveIntegerField(default=0)),
+                ('order_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('tax', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hourly_sales', to='business_entity.businessentity')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('business', 'hour'), name='hourly_sales_rollup_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ItemSalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('tax', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_sales', to='business_entity.businessentity')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='products.item')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['business', 'day'], name='item_sales_rollup_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('item', 'day'), name='item_sales_rollup_unique')],
+            },
+        ),
+    ]
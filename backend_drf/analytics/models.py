@@ -0,0 +1,162 @@
+from django.db import models
+
+from business_entity.models import BusinessEntity
+
+
+class DailySalesRollup(models.Model):
+    """
+    Paid sales of one business on one day, kept up to date by
+    analytics.rollups. Invoices count on their date, orders on the day
+    they were placed once a payment succeeded. Revenue is taxable value.
+    """
+    business = models.ForeignKey(
+        BusinessEntity,
+        on_delete=models.CASCADE,
+        related_name="daily_sales"
+    )
+    day = models.DateField()
+
+    paid_invoices = models.PositiveIntegerField(default=0)
+    invoice_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    paid_orders = models.PositiveIntegerField(default=0)
+    order_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    # Tax on both, for the analytics series
+    tax = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Also the index of dashboard totals and date-range charts
+            models.UniqueConstraint(
+                fields=["business", "day"],
+                name="daily_sales_rollup_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} {self.day}"
+
+
+class DailyCountsRollup(models.Model):
+    """Customers, products, orders and invoices a business added on a day."""
+    business = models.ForeignKey(
+        BusinessEntity,
+        on_delete=models.CASCADE,
+        related_name="daily_counts"
+    )
+    day = models.DateField()
+
+    customers = models.PositiveIntegerField(default=0)
+    products = models.PositiveIntegerField(default=0)
+    orders = models.PositiveIntegerField(default=0)
+    invoices = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["business", "day"],
+                name="daily_counts_rollup_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} {self.day}"
+
+
+class HourlySalesRollup(models.Model):
+    """DailySalesRollup per hour, for intraday charts."""
+    business = models.ForeignKey(
+        BusinessEntity,
+        on_delete=models.CASCADE,
+        related_name="hourly_sales"
+    )
+    hour = models.DateTimeField()
+
+    paid_invoices = models.PositiveIntegerField(default=0)
+    invoice_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    paid_orders = models.PositiveIntegerField(default=0)
+    order_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    tax = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["business", "hour"],
+                name="hourly_sales_rollup_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} {self.hour}"
+
+
+class ItemSalesRollup(models.Model):
+    """Paid sales of one item on one day, over orders and invoices."""
+    business = models.ForeignKey(
+        BusinessEntity,
+        on_delete=models.CASCADE,
+        related_name="item_sales"
+    )
+    item = models.ForeignKey(
+        "products.Item",
+        on_delete=models.CASCADE,
+        related_name="daily_sales"
+    )
+    day = models.DateField()
+
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    tax = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["item", "day"],
+                name="item_sales_rollup_unique"
+            ),
+        ]
+        indexes = [
+            # Top items of a business over a range
+            models.Index(fields=["business", "day"], name="item_sales_rollup_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} {self.day}"
+
+
+class CustomerSalesRollup(models.Model):
+    """Paid orders and invoices of one customer on one day."""
+    business = models.ForeignKey(
+        BusinessEntity,
+        on_delete=models.CASCADE,
+        related_name="customer_sales"
+    )
+    customer = models.ForeignKey(
+        "customers.Customer",
+        on_delete=models.CASCADE,
+        related_name="daily_sales"
+    )
+    day = models.DateField()
+
+    documents = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    tax = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer", "day"],
+                name="customer_sales_rollup_unique"
+            ),
+        ]
+        indexes = [
+            # Top customers of a business over a range
+            models.Index(fields=["business", "day"], name="customer_sales_rollup_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.customer_id} {self.day}"
@@ -0,0 +1,498 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import TruncDate, TruncHour, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from api.utils.on_commit import pending_batch
+from api.utils.tax_engine import money, to_decimal
+from customers.models import Customer
+from invoice.models import Invoice, InvoiceItem
+from order.models import Order, OrderItem
+from products.models import Item
+
+from .models import (
+    CustomerSalesRollup,
+    DailyCountsRollup,
+    DailySalesRollup,
+    HourlySalesRollup,
+    ItemSalesRollup,
+)
+
+
+COUNT_FIELDS = ("customers", "products", "orders", "invoices")
+SALES_FIELDS = ("paid_invoices", "invoice_revenue", "paid_orders", "order_revenue", "tax")
+ITEM_FIELDS = ("quantity", "revenue", "tax")
+CUSTOMER_FIELDS = ("documents", "revenue", "tax")
+
+
+def day_bounds(date_from, date_to):
+    """Aware [start, end) of the local days date_from..date_to."""
+    start = timezone.make_aware(datetime.combine(date_from, time.min))
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+    return start, end
+
+
+# ---------------------------------------------------------
+# Computing days from the source tables
+# ---------------------------------------------------------
+
+def grouped(queryset, keys, **aggregates):
+    """GROUP BY `keys` ({name: field or expression}), annotated with `aggregates`."""
+    return (
+        queryset
+        .values(
+            *(name for name, key in keys.items() if name == key),
+            **{
+                name: F(key) if isinstance(key, str) else key
+                for name, key in keys.items() if name != key
+            }
+        )
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+
+def documents(business_id, date_from=None, date_to=None):
+    """Invoices and orders of the business dated in the period."""
+    invoices = Invoice.objects.filter(business_id=business_id)
+    orders = Order.objects.filter(business_id=business_id)
+
+    if date_from is not None:
+        invoices = invoices.filter(date__range=(date_from, date_to))
+
+        # created_at, which the order list index covers
+        start, end = day_bounds(date_from, date_to)
+        orders = orders.filter(created_at__gte=start, created_at__lt=end)
+
+    return invoices, orders
+
+
+def paid(invoices, orders):
+    """Sales: paid invoices, and orders once a payment succeeded."""
+    return (
+        invoices.filter(status="Paid"),
+        orders.filter(payment_status="Paid"),
+    )
+
+
+def document_sums():
+    return {
+        "n": Count("id"),
+        "revenue": Sum("total_taxable_amount"),
+        "tax": Sum("total_tax"),
+    }
+
+
+def add_sales(buckets, key, kind, row):
+    bucket = buckets[key]
+    bucket[f"paid_{kind}s"] += row["n"]
+    bucket[f"{kind}_revenue"] += row["revenue"] or 0
+    bucket["tax"] += row["tax"] or 0
+
+
+def compute_days(business_id, date_from=None, date_to=None):
+    """
+    Counts and sales rows of the business per day, from one GROUP BY
+    per source table. Without dates, its whole history.
+    """
+    customers = Customer.objects.filter(business_id=business_id)
+    items = Item.objects.filter(business_id=business_id)
+
+    if date_from is not None:
+        customers = customers.filter(date__range=(date_from, date_to))
+        items = items.filter(created_date__range=(date_from, date_to))
+
+    invoices, orders = documents(business_id, date_from, date_to)
+    paid_invoices, paid_orders = paid(invoices, orders)
+    order_day = TruncDate("created_at")
+
+    counts = defaultdict(lambda: dict.fromkeys(COUNT_FIELDS, 0))
+    sales = defaultdict(lambda: dict.fromkeys(SALES_FIELDS, 0))
+
+    for field, rows in (
+        ("customers", grouped(customers, {"day": "date"}, n=Count("id"))),
+        ("products", grouped(items, {"day": "created_date"}, n=Count("id"))),
+        ("orders", grouped(orders, {"day": order_day}, n=Count("id"))),
+        ("invoices", grouped(invoices, {"day": "date"}, n=Count("id"))),
+    ):
+        for row in rows:
+            counts[row["day"]][field] = row["n"]
+
+    for row in grouped(paid_invoices, {"day": "date"}, **document_sums()):
+        add_sales(sales, row["day"], "invoice", row)
+
+    for row in grouped(paid_orders, {"day": order_day}, **document_sums()):
+        add_sales(sales, row["day"], "order", row)
+
+    return counts, sales
+
+
+def compute_hours(paid_invoices, paid_orders):
+    hours = defaultdict(lambda: dict.fromkeys(SALES_FIELDS, 0))
+
+    for row in grouped(
+        paid_invoices,
+        {"hour": TruncHour("created_at"), "day": "date"},
+        **document_sums()
+    ):
+        hour = row["hour"]
+
+        # Invoices from before created_at existed, or dated another day
+        # than they were entered, count at midnight of their date
+        if hour is None or timezone.localdate(hour) != row["day"]:
+            hour = timezone.make_aware(datetime.combine(row["day"], time.min))
+
+        add_sales(hours, hour, "invoice", row)
+
+    for row in grouped(paid_orders, {"hour": TruncHour("created_at")}, **document_sums()):
+        add_sales(hours, row["hour"], "order", row)
+
+    return hours
+
+
+def compute_item_days(paid_invoices, paid_orders):
+    item_days = defaultdict(lambda: dict.fromkeys(ITEM_FIELDS, 0))
+
+    for lines, day in (
+        (InvoiceItem.objects.filter(invoice__in=paid_invoices), "invoice__date"),
+        (OrderItem.objects.filter(order__in=paid_orders), TruncDate("order__created_at")),
+    ):
+        for row in grouped(
+            lines,
+            {"item_id": "item_id", "day": day},
+            quantity=Sum("quantity"),
+            revenue=Sum("taxable_amount"),
+            tax=Sum("tax_amount")
+        ):
+            values = item_days[(row["item_id"], row["day"])]
+
+            for field in ITEM_FIELDS:
+                values[field] += row[field] or 0
+
+    return item_days
+
+
+def compute_customer_days(paid_invoices, paid_orders):
+    customer_days = defaultdict(lambda: dict.fromkeys(CUSTOMER_FIELDS, 0))
+
+    for queryset, day in (
+        (paid_invoices, "date"),
+        (paid_orders, TruncDate("created_at")),
+    ):
+        for row in grouped(
+            queryset,
+            {"customer_id": "customer_id", "day": day},
+            **document_sums()
+        ):
+            values = customer_days[(row["customer_id"], row["day"])]
+            values["documents"] += row["n"]
+            values["revenue"] += row["revenue"] or 0
+            values["tax"] += row["tax"] or 0
+
+    return customer_days
+
+
+# ---------------------------------------------------------
+# Writing rollups
+# ---------------------------------------------------------
+
+def replace_rows(model, business_id, window, key, rows, fields):
+    """
+    Replaces the business's rows of `model` inside `window` (filter
+    kwargs, or None for all of them) with `rows`: {key values: fields}.
+    The upsert keeps two concurrent rebuilds of a day from colliding.
+    """
+    stale = model.objects.filter(business_id=business_id)
+
+    if window is not None:
+        stale = stale.filter(**window)
+
+    stale.delete()
+
+    if isinstance(key, str):
+        # Business-wide buckets: unique per business and day / hour
+        key, unique_fields = (key,), ["business", key]
+    else:
+        unique_fields = [name.removesuffix("_id") for name in key]
+
+    model.objects.bulk_create(
+        [
+            model(
+                business_id=business_id,
+                **dict(zip(key, values if len(key) > 1 else (values,))),
+                **row
+            )
+            for values, row in rows.items()
+        ],
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=list(fields),
+        batch_size=1000
+    )
+
+
+@transaction.atomic
+def rebuild_rollups(business_id, date_from=None, date_to=None):
+    """
+    Recomputes every rollup of the business for date_from..date_to (or
+    its whole history): daily counts and sales, hourly sales, and daily
+    sales per item and per customer. Days left without activity lose
+    their rows.
+    """
+    counts, sales = compute_days(business_id, date_from, date_to)
+    paid_invoices, paid_orders = paid(*documents(business_id, date_from, date_to))
+
+    days = hours = None
+
+    if date_from is not None:
+        start, end = day_bounds(date_from, date_to)
+        days = {"day__range": (date_from, date_to)}
+        hours = {"hour__gte": start, "hour__lt": end}
+
+    for model, window, key, rows, fields in (
+        (DailyCountsRollup, days, "day", counts, (*COUNT_FIELDS, "updated_at")),
+        (DailySalesRollup, days, "day", sales, (*SALES_FIELDS, "updated_at")),
+        (
+            HourlySalesRollup, hours, "hour",
+            compute_hours(paid_invoices, paid_orders), SALES_FIELDS
+        ),
+        (
+            ItemSalesRollup, days, ("item_id", "day"),
+            compute_item_days(paid_invoices, paid_orders), ITEM_FIELDS
+        ),
+        (
+            CustomerSalesRollup, days, ("customer_id", "day"),
+            compute_customer_days(paid_invoices, paid_orders), CUSTOMER_FIELDS
+        ),
+    ):
+        replace_rows(model, business_id, window, key, rows, fields)
+
+
+def refresh_rollups(days_by_business):
+    for business_id, days in days_by_business.items():
+        # A range, not just the days: one GROUP BY per table either way
+        rebuild_rollups(business_id, min(days), max(days))
+
+
+def history_start(business_id):
+    """First day with any activity or rollup row, None for an empty business."""
+    firsts = [
+        Customer.objects.filter(business_id=business_id).aggregate(d=Min("date"))["d"],
+        Item.objects.filter(business_id=business_id).aggregate(d=Min("created_date"))["d"],
+        Invoice.objects.filter(business_id=business_id).aggregate(d=Min("date"))["d"],
+        DailyCountsRollup.objects.filter(business_id=business_id).aggregate(d=Min("day"))["d"],
+        DailySalesRollup.objects.filter(business_id=business_id).aggregate(d=Min("day"))["d"],
+    ]
+
+    first_order = Order.objects.filter(
+        business_id=business_id
+    ).aggregate(d=Min("created_at"))["d"]
+
+    if first_order:
+        firsts.append(timezone.localdate(first_order))
+
+    firsts = [first for first in firsts if first]
+
+    return min(firsts) if firsts else None
+
+
+def rebuild_history(business_id, date_from=None, date_to=None):
+    """
+    Backfills the rollups one calendar month per transaction, so a long
+    history never holds more than a month of buckets in memory. Yields
+    each month's first day as it finishes.
+    """
+    date_from = date_from or history_start(business_id)
+    date_to = date_to or timezone.localdate()
+
+    if date_from is None:
+        return
+
+    month = date_from
+
+    while month <= date_to:
+        next_month = (month.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+        rebuild_rollups(business_id, month, min(next_month - timedelta(days=1), date_to))
+        yield month
+
+        month = next_month
+
+
+# ---------------------------------------------------------
+# Change tracking
+# ---------------------------------------------------------
+
+class PendingRollups:
+    """Days touched inside one transaction, recomputed once after it commits."""
+
+    def __init__(self):
+        self.days = defaultdict(set)
+
+    def __call__(self):
+        refresh_rollups(self.days)
+
+
+def schedule_rollup(business_id, day):
+    if not connection.in_atomic_block:
+        refresh_rollups({business_id: {day}})
+        return
+
+    pending = pending_batch(PendingRollups)
+
+    pending.days[business_id].add(day)
+
+
+# ---------------------------------------------------------
+# Reading rollups
+# ---------------------------------------------------------
+
+def business_totals(business_id):
+    """All-time dashboard totals: two indexed aggregates over the rollups."""
+    totals = DailyCountsRollup.objects.filter(
+        business_id=business_id
+    ).aggregate(**{field: Sum(field) for field in COUNT_FIELDS})
+
+    totals.update(
+        DailySalesRollup.objects.filter(
+            business_id=business_id
+        ).aggregate(**{field: Sum(field) for field in SALES_FIELDS})
+    )
+
+    return {field: value or 0 for field, value in totals.items()}
+
+
+def daily_revenue(business_id, date_from, date_to):
+    """Revenue per day with activity in date_from..date_to, for charts."""
+    return [
+        {
+            "day": row["day"],
+            "invoice_revenue": row["invoice_revenue"],
+            "order_revenue": row["order_revenue"],
+            "revenue": row["invoice_revenue"] + row["order_revenue"],
+            "paid_invoices": row["paid_invoices"],
+            "paid_orders": row["paid_orders"],
+        }
+        for row in DailySalesRollup.objects.filter(
+            business_id=business_id,
+            day__range=(date_from, date_to)
+        ).order_by("day").values("day", *SALES_FIELDS)
+    ]
+
+
+INTERVALS = {
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+
+def sales_point(row):
+    revenue = to_decimal(row["invoice_revenue"] or 0) + to_decimal(row["order_revenue"] or 0)
+    count = (row["paid_invoices"] or 0) + (row["paid_orders"] or 0)
+
+    return {
+        "revenue": money(revenue),
+        "tax": money(to_decimal(row["tax"] or 0)),
+        "orders": row["paid_orders"] or 0,
+        "invoices": row["paid_invoices"] or 0,
+        "average_order_value": money(revenue / count if count else revenue),
+    }
+
+
+def sales_series(business_id, date_from, date_to, interval="day"):
+    """
+    Revenue, tax, order / invoice counts and average order value per
+    hour, day, week or month, merged from the hourly or daily buckets.
+    Returns (series, totals).
+    """
+    if interval == "hour":
+        start, end = day_bounds(date_from, date_to)
+        buckets = HourlySalesRollup.objects.filter(
+            business_id=business_id,
+            hour__gte=start,
+            hour__lt=end
+        )
+        period = F("hour")
+    else:
+        buckets = DailySalesRollup.objects.filter(
+            business_id=business_id,
+            day__range=(date_from, date_to)
+        )
+        period = INTERVALS[interval]("day") if interval in INTERVALS else F("day")
+
+    sums = {field: Sum(field) for field in SALES_FIELDS}
+
+    series = [
+        {"period": row["period"], **sales_point(row)}
+        for row in buckets.values(period=period).annotate(**sums).order_by("period")
+    ]
+
+    return series, sales_point(buckets.aggregate(**sums))
+
+
+def top_items(business_id, date_from, date_to, limit=10):
+    """Best-selling items of the period by revenue."""
+    rows = list(
+        ItemSalesRollup.objects
+        .filter(business_id=business_id, day__range=(date_from, date_to))
+        .values("item_id")
+        .annotate(
+            quantity=Sum("quantity"),
+            revenue=Sum("revenue"),
+            tax=Sum("tax")
+        )
+        .order_by("-revenue", "item_id")[:limit]
+    )
+
+    # Names only for the winners, not joined into the GROUP BY
+    names = dict(
+        Item.objects.filter(
+            id__in=[row["item_id"] for row in rows]
+        ).values_list("id", "item_name")
+    )
+
+    return [
+        {
+            "item_id": row["item_id"],
+            "item_name": names.get(row["item_id"]),
+            "quantity": row["quantity"],
+            "revenue": money(to_decimal(row["revenue"])),
+            "tax": money(to_decimal(row["tax"])),
+        }
+        for row in rows
+    ]
+
+
+def top_customers(business_id, date_from, date_to, limit=10):
+    """Customers who spent the most in the period."""
+    rows = list(
+        CustomerSalesRollup.objects
+        .filter(business_id=business_id, day__range=(date_from, date_to))
+        .values("customer_id")
+        .annotate(
+            documents=Sum("documents"),
+            revenue=Sum("revenue"),
+            tax=Sum("tax")
+        )
+        .order_by("-revenue", "customer_id")[:limit]
+    )
+
+    names = dict(
+        Customer.objects.filter(
+            id__in=[row["customer_id"] for row in rows]
+        ).values_list("id", "name")
+    )
+
+    return [
+        {
+            "customer_id": row["customer_id"],
+            "name": names.get(row["customer_id"]),
+            "documents": row["documents"],
+            "revenue": money(to_decimal(row["revenue"])),
+            "tax": money(to_decimal(row["tax"])),
+        }
+        for row in rows
+    ]
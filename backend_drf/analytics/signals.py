@@ -0,0 +1,64 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from customers.models import Customer
+from invoice.models import Invoice
+from order.models import Order, Payment
+from products.models import Item
+
+from .rollups import schedule_rollup
+
+
+# Keep the daily rollups in step with the rows they count. Only the
+# day a row belongs to is recomputed, once per transaction, after it
+# commits. Bulk writes send no signals; their callers schedule the
+# rollups themselves.
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def customer_changed(sender, instance, created=True, raw=False, **kwargs):
+    # Customers are saved on every OTP login; only adding or removing
+    # one changes a count
+    if created and not raw:
+        schedule_rollup(instance.business_id, instance.date)
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def item_changed(sender, instance, created=True, raw=False, **kwargs):
+    if created and not raw:
+        schedule_rollup(instance.business_id, instance.created_date)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_rollup(
+            instance.business_id,
+            timezone.localdate(instance.created_at)
+        )
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def payment_changed(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Saving e.g. only a proof URL changes no sales
+    if raw or (update_fields and not {"status", "amount"} & set(update_fields)):
+        return
+
+    try:
+        order = instance.order
+    except Order.DoesNotExist:
+        # Deleted along with its order, which schedules the day itself
+        return
+
+    schedule_rollup(order.business_id, timezone.localdate(order.created_at))
+
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_delete, sender=Invoice)
+def invoice_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_rollup(instance.business_id, instance.date)
@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .rollups import sales_series, top_customers, top_items
+
+
+INTERVALS = ("hour", "day", "week", "month")
+
+# Hourly series are for zooming in; longer ranges use days or more
+MAX_HOURLY_DAYS = 31
+
+MAX_TOP = 50
+
+
+class SalesAnalyticsView(APIView):
+    """
+    Sales of the active business over time, merged from the
+    pre-aggregated buckets, with its top items and customers:
+    GET /dashboard/analytics/?from=2026-04-01&to=2026-06-30&interval=week&top=10
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        business = request.business
+
+        if business is None:
+            return Response({"error": "No active business selected."}, status=400)
+
+        try:
+            date_to = date.fromisoformat(
+                request.query_params.get("to") or date.today().isoformat()
+            )
+            date_from = date.fromisoformat(
+                request.query_params.get("from")
+                or (date_to - timedelta(days=29)).isoformat()
+            )
+        except ValueError:
+            return Response({"error": "Dates must be YYYY-MM-DD."}, status=400)
+
+        if date_from > date_to:
+            return Response({"error": "'from' is after 'to'."}, status=400)
+
+        interval = request.query_params.get("interval", "day").lower()
+
+        if interval not in INTERVALS:
+            return Response(
+                {"error": f"interval must be one of: {', '.join(INTERVALS)}."},
+                status=400
+            )
+
+        if interval == "hour" and (date_to - date_from).days >= MAX_HOURLY_DAYS:
+            return Response(
+                {"error": f"Hourly series cover at most {MAX_HOURLY_DAYS} days."},
+                status=400
+            )
+
+        try:
+            top = min(int(request.query_params.get("top", 10)), MAX_TOP)
+        except ValueError:
+            return Response({"error": "top must be a number."}, status=400)
+
+        series, totals = sales_series(business.id, date_from, date_to, interval)
+
+        return Response({
+            "from": date_from,
+            "to": date_to,
+            "interval": interval,
+            "totals": totals,
+            "series": series,
+            "top_items": top_items(business.id, date_from, date_to, max(top, 0)),
+            "top_customers": top_customers(business.id, date_from, date_to, max(top, 0)),
+        }, status=200)
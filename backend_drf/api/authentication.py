@@ -0,0 +1,90 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from customers.models import Customer
+
+
+# ---------------------------------------------------------
+# Tenant resolution
+# ---------------------------------------------------------
+# Both classes load the account and its business in the one query the
+# token lookup already costs, and set request.business for the views:
+# the user's active business, or the business a customer belongs to.
+
+class BusinessJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that joins the user's active business."""
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+
+        if result is not None:
+            request.business = result[0].active_business
+
+        return result
+
+    def get_user(self, validated_token):
+        # JWTAuthentication.get_user, with select_related
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        try:
+            user = (
+                self.user_model.objects
+                .select_related("active_business")
+                .get(**{api_settings.USER_ID_FIELD: user_id})
+            )
+        except self.user_model.DoesNotExist as e:
+            raise exceptions.AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            ) from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise exceptions.AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+
+        return user
+
+
+class CustomerJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        result = super().authenticate(request)
+
+        if result is not None:
+            request.business = result[0].business
+
+        return result
+
+    def get_user(self, validated_token):
+        # 🔒 Ensure this is a CUSTOMER token
+        if validated_token.get('type') != 'customer':
+            raise exceptions.AuthenticationFailed('Invalid token type')
+
+        customer_id = validated_token.get('customer_id')
+        business_id = validated_token.get('business_id')
+
+        if not customer_id or not business_id:
+            raise exceptions.AuthenticationFailed('Invalid token payload')
+
+        try:
+            return Customer.objects.select_related("business").get(
+                id=customer_id,
+                business_id=business_id
+            )
+        except Customer.DoesNotExist:
+            raise exceptions.AuthenticationFailed('No such customer')
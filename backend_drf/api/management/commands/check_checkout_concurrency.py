@@ -0,0 +1,184 @@
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+
+from business_entity.models import BusinessEntity
+from customers.models import Customer
+from customers.views import generate_customer_tokens
+from order.models import Order
+from order.views import CheckoutView
+from products.models import Item
+from users.models import User
+
+
+# ---------------------------------------------------------
+# Seeding
+# ---------------------------------------------------------
+# The checkouts run on their own threads and connections, so the seed
+# is committed and deleted again afterwards instead of rolled back.
+
+def seed(customers, stock):
+    token = uuid.uuid4().hex[:8]
+
+    user = User.objects.create(
+        email=f"concurrency-{token}@example.invalid",
+        name="Concurrency check",
+        phone=f"c{token}"
+    )
+    business = BusinessEntity.objects.create(
+        user=user,
+        business_name="Concurrency check",
+        slug=f"concurrency-{token}",
+        business_type="Retail",
+        tax_status="Registered",
+        kyc_doc_type="PAN",
+        is_active=True
+    )
+
+    item = Item.objects.create(
+        business=business,
+        item_type="Goods",
+        item_name="Contended item",
+        category="General",
+        subcategory="General",
+        area="NA",
+        gross_amount=100,
+        quantity_product=stock
+    )
+
+    created = Customer.objects.bulk_create([
+        Customer(
+            business=business,
+            name=f"Customer {i}",
+            phone=f"{i}{token}"
+        )
+        for i in range(customers)
+    ])
+
+    return user, item, [generate_customer_tokens(c)["access"] for c in created]
+
+
+def cleanup(user, item):
+    # Orders protect their customers and items from the cascade
+    Order.objects.filter(business_id=item.business_id).delete()
+    user.delete()
+
+
+class Command(BaseCommand):
+    help = (
+        "Fires --checkouts simultaneous buy-now checkouts for one unit of the "
+        "same item with --stock units on hand. Fails unless as many succeed "
+        "as there are units, the rest are refused with 400 and the stock "
+        "drops by exactly the units sold. Prints the wall time. The seeded "
+        "rows are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--checkouts",
+            type=int,
+            default=20,
+            help="Parallel checkouts, one thread and customer each."
+        )
+        parser.add_argument(
+            "--stock",
+            type=int,
+            default=5,
+            help="Units of the contended item."
+        )
+
+    def handle(self, *args, **options):
+        checkouts, stock = options["checkouts"], options["stock"]
+
+        # A deferred SQLite transaction that reads before it writes can't
+        # wait for the write lock; it fails with "database is locked"
+        if (
+            connection.vendor == "sqlite"
+            and connection.settings_dict["OPTIONS"].get("transaction_mode") != "IMMEDIATE"
+        ):
+            raise CommandError(
+                "On SQLite, run with ?transaction_mode=IMMEDIATE on DATABASE_URL."
+            )
+
+        user, item, tokens = seed(checkouts, stock)
+
+        try:
+            statuses, elapsed = self.race(item, tokens)
+
+            item.refresh_from_db()
+            orders = Order.objects.filter(business_id=item.business_id).count()
+        finally:
+            cleanup(user, item)
+
+        expected = min(checkouts, stock)
+        counts = Counter(statuses)
+
+        self.stdout.write(
+            f"{checkouts} checkouts for {stock} units in {elapsed * 1000:.0f} ms: "
+            + ", ".join(f"{n} x {code}" for code, n in sorted(counts.items(), key=str))
+        )
+
+        problems = []
+
+        if counts[201] != expected or orders != expected:
+            problems.append(f"{counts[201]} checkouts and {orders} orders went through, not {expected}")
+
+        if counts[201] + counts[400] != checkouts:
+            problems.append("some checkouts neither succeeded nor were refused")
+
+        if item.quantity_product != stock - expected or item.reserved_quantity:
+            problems.append(
+                f"stock ended at {item.quantity_product} with "
+                f"{item.reserved_quantity} reserved"
+            )
+
+        if problems:
+            raise CommandError("; ".join(problems))
+
+        self.stdout.write(self.style.SUCCESS("Concurrent checkouts never oversold the item."))
+
+    def race(self, item, tokens):
+        """Every checkout waits at a barrier, then all post at once."""
+        factory = APIRequestFactory()
+        barrier = threading.Barrier(len(tokens))
+        statuses = [None] * len(tokens)
+
+        def checkout(n):
+            request = factory.post(
+                "/",
+                {
+                    "payment_method": "CASH",
+                    "is_buy_now": "true",
+                    "item_id": item.id,
+                    "quantity": 1,
+                },
+                HTTP_AUTHORIZATION=f"Bearer {tokens[n]}"
+            )
+
+            try:
+                barrier.wait()
+                statuses[n] = CheckoutView.as_view()(request).status_code
+            except Exception as e:
+                statuses[n] = type(e).__name__
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=checkout, args=(n,))
+            for n in range(len(tokens))
+        ]
+
+        started = time.perf_counter()
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        return statuses, time.perf_counter() - started
@@ -0,0 +1,188 @@
+import gzip
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.utils.envelope import envelope
+from business_entity.models import BusinessEntity
+from products.models import Item, ItemVariant, VariantAttribute
+from products.serializers import ProductEnvelopeSerializer, ProductSerializer
+from users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+def seed(items, variants):
+    """One business with `items` items of `variants` variants each."""
+    token = uuid.uuid4().hex[:8]
+
+    user = User.objects.create(
+        email=f"envelope-{token}@example.invalid",
+        name="Envelope check",
+        phone=f"e{token}"
+    )
+    business = BusinessEntity.objects.create(
+        user=user,
+        business_name="Envelope check",
+        slug=f"envelope-{token}",
+        business_type="Retail",
+        tax_status="Registered",
+        kyc_doc_type="PAN",
+        state="Kerala",
+        is_active=True
+    )
+
+    created = Item.objects.bulk_create([
+        Item(
+            business=business,
+            item_type="Goods",
+            item_name=f"Item {i}",
+            slug=f"item-{i}",
+            has_variants=bool(variants),
+            category="General",
+            subcategory="General",
+            area="NA",
+            gross_amount=100,
+            quantity_product=10
+        )
+        for i in range(items)
+    ])
+
+    created_variants = ItemVariant.objects.bulk_create([
+        ItemVariant(
+            item=item,
+            sku=f"SKU-{item.id}-{n}",
+            barcode=f"{token}-{item.id}-{n}",
+            selling_price=100,
+            stock=10
+        )
+        for item in created
+        for n in range(variants)
+    ])
+
+    VariantAttribute.objects.bulk_create([
+        VariantAttribute(variant=variant, attribute_name="Size", attribute_value="XL")
+        for variant in created_variants
+    ])
+
+    return business
+
+
+def best_time(func, repeat):
+    """Least CPU seconds over `repeat` runs, and the last result."""
+    best = None
+
+    for _ in range(repeat):
+        started = time.process_time()
+        result = func()
+        elapsed = time.process_time() - started
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+
+class Command(BaseCommand):
+    help = (
+        "Serializes one page of seeded items in the legacy shape (business "
+        "embedded per row) and the ?envelope=true shape, fails if a row "
+        "differs beyond the moved business fields, and prints the payload "
+        "size and CPU time of both. Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--items",
+            type=int,
+            default=100,
+            help="Items on the page; the default is a full page."
+        )
+        parser.add_argument(
+            "--variants",
+            type=int,
+            default=2,
+            help="Variants per item."
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Timed runs per shape; the best one is reported."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                business = seed(options["items"], options["variants"])
+
+                # Loaded once, the way the list view's queryset is
+                items = list(
+                    Item.objects.filter(business=business)
+                    .select_related("business__user")
+                    .prefetch_related("variants__attributes", "variants__images")
+                    .order_by("-created_date", "-id")
+                )
+
+                shapes = {
+                    "legacy": lambda: JSONRenderer().render(
+                        ProductSerializer(items, many=True).data
+                    ),
+                    "envelope": lambda: JSONRenderer().render(
+                        envelope(ProductEnvelopeSerializer(items, many=True).data, business)
+                    ),
+                }
+
+                results = {
+                    label: best_time(render, options["repeat"])
+                    for label, render in shapes.items()
+                }
+
+                self.compare(
+                    ProductSerializer(items, many=True).data,
+                    envelope(ProductEnvelopeSerializer(items, many=True).data, business)
+                )
+
+                raise Rollback
+
+        except Rollback:
+            pass
+
+        for label, (cpu, body) in results.items():
+            self.stdout.write(
+                f"{label:>8}: {len(body):>8} bytes, {len(gzip.compress(body)):>6} gzipped, "
+                f"{cpu * 1000:.1f} ms CPU"
+            )
+
+        (legacy_cpu, legacy), (envelope_cpu, enveloped) = results.values()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Enveloped rows match the legacy ones; the page is "
+            f"{1 - len(enveloped) / len(legacy):.0%} smaller and takes "
+            f"{1 - envelope_cpu / legacy_cpu:.0%} less CPU."
+        ))
+
+    def compare(self, legacy, enveloped):
+        """Every legacy row must be its enveloped row plus the head fields."""
+        if len(legacy) != len(enveloped["results"]):
+            raise CommandError("The shapes have a different number of rows.")
+
+        head = {
+            key: value for key, value in enveloped.items()
+            if key != "results"
+        }
+
+        for number, (old, new) in enumerate(zip(legacy, enveloped["results"])):
+            rebuilt = {**head, **new}
+            rebuilt.pop("business_id")
+
+            if rebuilt != dict(old):
+                changed = sorted(
+                    key for key in old.keys() | rebuilt.keys()
+                    if old.get(key) != rebuilt.get(key)
+                )
+                raise CommandError(f"Row {number} differs in {', '.join(changed)}.")
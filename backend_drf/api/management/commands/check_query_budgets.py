@@ -0,0 +1,290 @@
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from business_entity.models import BusinessEntity
+from customers.models import Customer
+from customers.views import generate_customer_tokens
+from order.models import Cart, CartItem, Order, OrderItem, Payment
+from order.views import (
+    CheckoutPreviewView,
+    CheckoutView,
+    CustomerOrderHistoryView,
+    OrderDetailView,
+    OrderListView,
+    ReorderView,
+    ViewCartView,
+)
+from products.models import Item, ItemVariant, VariantAttribute, VariantImage
+from users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+# ---------------------------------------------------------
+# Endpoints and the most queries one request may run
+# ---------------------------------------------------------
+# Counts include authentication, the checkout preview's stock hold, the
+# reorder's cart write (savepoints included; the write is one upsert on
+# PostgreSQL 15+, an update plus an insert before) and the checkouts'
+# order transaction, with the savepoint around the stock decrement that
+# only lock-less backends (SQLite) take. The storefront refresh a
+# checkout schedules runs on commit, which never comes here. They must
+# not depend on the number of orders, lines or payments: a per-row query
+# blows them straight away. The cart checkout comes last, as it empties
+# the cart.
+
+def budgets(user_token, customer_token, order, variant):
+    return [
+        (
+            "Merchant order list",
+            OrderListView, "get", {}, user_token,
+            7
+        ),
+        (
+            "Merchant order detail",
+            OrderDetailView, "get", {"order_number": order.order_number}, user_token,
+            6
+        ),
+        (
+            "Customer order history",
+            CustomerOrderHistoryView, "get", {}, customer_token,
+            7
+        ),
+        (
+            "Customer cart",
+            ViewCartView, "get", {}, customer_token,
+            5
+        ),
+        (
+            "Checkout preview",
+            CheckoutPreviewView, "get", {}, customer_token,
+            11
+        ),
+        (
+            "Customer reorder",
+            ReorderView, "post", {"order_number": order.order_number}, customer_token,
+            15
+        ),
+        (
+            "Buy-now checkout",
+            CheckoutView, "post", {}, customer_token,
+            25,
+            {
+                "payment_method": "CASH",
+                "is_buy_now": "true",
+                "item_id": variant.item_id,
+                "variant_id": str(variant.uid),
+            }
+        ),
+        (
+            "Cart checkout",
+            CheckoutView, "post", {}, customer_token,
+            23,
+            {"payment_method": "CASH"}
+        ),
+    ]
+
+
+# ---------------------------------------------------------
+# Seeding
+# ---------------------------------------------------------
+
+def seed(orders, lines):
+    """
+    One business whose customer has `orders` orders of `lines` variant
+    lines each, every variant with attributes and images, two payments
+    per order, and the same lines in the cart. Bulk inserts, no save()
+    side effects.
+    """
+    token = uuid.uuid4().hex[:8]
+
+    user = User.objects.create(
+        email=f"budget-{token}@example.invalid",
+        name="Budget check",
+        phone=f"b{token}"
+    )
+    business = BusinessEntity.objects.create(
+        user=user,
+        business_name="Budget check",
+        slug=f"budget-{token}",
+        business_type="Retail",
+        tax_status="Registered",
+        kyc_doc_type="PAN",
+        is_active=True
+    )
+    user.active_business = business
+    user.save(update_fields=["active_business"])
+
+    customer = Customer.objects.create(
+        business=business,
+        name="Budget customer",
+        phone=f"9{token}"
+    )
+
+    items = Item.objects.bulk_create([
+        Item(
+            business=business,
+            item_type="Goods",
+            item_name=f"Item {i}",
+            slug=f"item-{i}",
+            has_variants=True,
+            category="General",
+            subcategory="General",
+            area="NA"
+        )
+        for i in range(lines)
+    ])
+
+    variants = ItemVariant.objects.bulk_create([
+        ItemVariant(
+            item=item,
+            sku=f"SKU-{i}",
+            barcode=f"{token}-{i}",
+            selling_price=100,
+            stock=1000
+        )
+        for i, item in enumerate(items)
+    ])
+
+    VariantAttribute.objects.bulk_create([
+        VariantAttribute(variant=variant, attribute_name=name, attribute_value=value)
+        for variant in variants
+        for name, value in (("Colour", "Red"), ("Size", "XL"))
+    ])
+
+    VariantImage.objects.bulk_create([
+        VariantImage(
+            variant=variant,
+            image_url=f"https://example.invalid/{variant.sku}-{n}.png",
+            is_primary=n == 0,
+            sort_order=n
+        )
+        for variant in variants
+        for n in range(2)
+    ])
+
+    created = Order.objects.bulk_create([
+        Order(
+            business=business,
+            customer=customer,
+            customer_name=customer.name,
+            order_number=f"{token}-O{i}",
+            invoice_id=f"{token}-I{i}"
+        )
+        for i in range(orders)
+    ])
+
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order,
+            item=variant.item,
+            variant=variant,
+            item_name=variant.item.item_name,
+            rate=100,
+            tax_percent=18,
+            tax_type="GST"
+        )
+        for order in created
+        for variant in variants
+    ])
+
+    Payment.objects.bulk_create([
+        Payment(order=order, method="UPI", status=status, amount=0)
+        for order in created
+        for status in ("Failed", "Success")
+    ])
+
+    cart = Cart.objects.create(customer=customer, business=business)
+
+    CartItem.objects.bulk_create([
+        CartItem(cart=cart, item=variant.item, variant=variant, quantity=1)
+        for variant in variants
+    ])
+
+    return user, customer, created[0], variants[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Calls the order and cart endpoints against seeded data and fails if "
+        "one of them runs more queries than its budget. Everything is "
+        "rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--orders",
+            type=int,
+            default=100,
+            help="Seeded orders; the default fills a whole page."
+        )
+        parser.add_argument(
+            "--lines",
+            type=int,
+            default=3,
+            help="Variant lines per seeded order."
+        )
+
+    def handle(self, *args, **options):
+        failures = []
+
+        try:
+            with transaction.atomic():
+                user, customer, order, variant = seed(options["orders"], options["lines"])
+
+                failures = self.check_budgets(
+                    str(RefreshToken.for_user(user).access_token),
+                    generate_customer_tokens(customer)["access"],
+                    order,
+                    variant,
+                    options["verbosity"]
+                )
+
+                raise Rollback
+
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError("Endpoints over their query budget: " + ", ".join(failures))
+
+        self.stdout.write(self.style.SUCCESS("All endpoints are within their query budgets."))
+
+    def check_budgets(self, user_token, customer_token, order, variant, verbosity):
+        factory = APIRequestFactory()
+        failures = []
+
+        for label, view, method, kwargs, token, budget, *data in budgets(
+            user_token, customer_token, order, variant
+        ):
+            request = getattr(factory, method)(
+                "/", *data, HTTP_AUTHORIZATION=f"Bearer {token}"
+            )
+
+            with CaptureQueriesContext(connection) as queries:
+                response = view.as_view()(request, **kwargs)
+                response.render()
+
+            if response.status_code not in (200, 201):
+                raise CommandError(f"{label} answered {response.status_code}.")
+
+            if len(queries) <= budget:
+                self.stdout.write(f"ok    {label}: {len(queries)} / {budget} queries")
+            else:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(
+                    f"FAIL  {label}: {len(queries)} queries, budget {budget}"
+                ))
+
+            if verbosity > 1 or len(queries) > budget:
+                for query in queries.captured_queries:
+                    self.stdout.write(f"      {query['sql'][:160]}")
+
+        return failures
@@ -0,0 +1,319 @@
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.views import GoodsItemListView
+from business_entity.models import BusinessEntity
+from customers.models import Customer
+from invoice.models import Invoice
+from order.models import Order, Payment
+from products.models import Item, ItemSnapshot
+from users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+def index_name(model, fields):
+    """Name of the index on `fields`, including auto-generated ones."""
+    for index in model._meta.indexes:
+        if list(index.fields) == list(fields):
+            return index.name
+
+    raise CommandError(f"{model.__name__} has no index on {fields}.")
+
+
+# ---------------------------------------------------------
+# Hot queries and the index each one must use
+# ---------------------------------------------------------
+
+def hot_queries(business, customer, order):
+    return [
+        (
+            "Item list (keyset)",
+            index_name(Item, ["business", "created_date", "id"]),
+            Item.objects
+            .filter(business=business)
+            .order_by("-created_date", "-id")[:100]
+        ),
+        (
+            "Visible items by type",
+            "item_visible_type_idx",
+            Item.objects
+            .filter(business=business, isShow=True, item_type="Goods")
+            .order_by("-created_date")
+        ),
+        (
+            "Storefront goods tab",
+            "snapshot_visible_type_idx",
+            ItemSnapshot.objects
+            .filter(business=business, is_visible=True, item_type="Goods")
+            # GoodsItemListView's ordering, one page
+            .order_by(*GoodsItemListView.ordering)[:100]
+        ),
+        (
+            "Storefront best selling",
+            "snapshot_best_selling_idx",
+            ItemSnapshot.objects
+            .filter(business=business, is_visible=True, best_selling=True)
+            .order_by("item_id")
+        ),
+        (
+            "Storefront trending",
+            "snapshot_trending_idx",
+            ItemSnapshot.objects
+            .filter(business=business, is_visible=True, trending=True)
+            .order_by("item_id")
+        ),
+        (
+            "Order list (keyset)",
+            index_name(Order, ["business", "created_at", "id"]),
+            Order.objects
+            .filter(business=business)
+            .order_by("-created_at", "-id")[:100]
+        ),
+        (
+            "Unpaid orders",
+            "order_payment_status_idx",
+            Order.objects
+            .filter(business=business, payment_status="Unpaid")
+            .order_by("-created_at", "-id")[:100]
+        ),
+        (
+            "Customer order history",
+            "order_customer_history_idx",
+            Order.objects
+            .filter(customer=customer, business=business)
+            .order_by("-created_at")
+        ),
+        (
+            "Paid invoice revenue",
+            "invoice_status_idx",
+            Invoice.objects
+            .filter(business=business, status="Paid")
+            .values("total_taxable_amount")
+        ),
+        (
+            "Order payment status",
+            "payment_order_status_idx",
+            Payment.objects.filter(order=order, status="Success")
+        ),
+        (
+            "Customer by name",
+            "customer_name_idx",
+            Customer.objects.filter(business=business, name=customer.name)
+        ),
+    ]
+
+
+# ---------------------------------------------------------
+# Seeding
+# ---------------------------------------------------------
+
+def seed(businesses, rows):
+    """
+    Several tenants with `rows` items, customers, orders and invoices
+    each, so a business-scoped filter is selective the way it is in
+    production. Bulk inserts: no slugs, barcodes or catalog refreshes.
+    """
+    token = uuid.uuid4().hex[:8]
+
+    user = User.objects.create(
+        email=f"plan-{token}@example.invalid",
+        name="Plan check",
+        phone=f"p{token}"
+    )
+
+    tenants = BusinessEntity.objects.bulk_create([
+        BusinessEntity(
+            user=user,
+            business_name=f"Plan check {b}",
+            slug=f"plan-{token}-{b}",
+            business_type="Retail",
+            tax_status="Registered",
+            kyc_doc_type="PAN",
+            is_active=True
+        )
+        for b in range(businesses)
+    ])
+
+    for b, business in enumerate(tenants):
+        prefix = f"{token}{b}-"
+
+        customers = Customer.objects.bulk_create([
+            Customer(
+                business=business,
+                name=f"Customer {i}",
+                phone=f"{i:010d}"
+            )
+            for i in range(rows)
+        ])
+
+        items = Item.objects.bulk_create([
+            Item(
+                business=business,
+                item_type="Goods" if i % 2 else "Service",
+                item_name=f"Item {i}",
+                slug=f"item-{i}",
+                category=f"Category {i % 10}",
+                subcategory="General",
+                area="NA",
+                isShow=i % 3 == 0,
+                best_selling=i % 20 == 0,
+                trending=i % 25 == 0
+            )
+            for i in range(rows)
+        ])
+
+        ItemSnapshot.objects.bulk_create([
+            ItemSnapshot(
+                item=item,
+                business=business,
+                slug=item.slug,
+                item_type=item.item_type,
+                is_visible=item.isShow,
+                best_selling=item.best_selling,
+                trending=item.trending,
+                created_date=item.created_date,
+                payload={}
+            )
+            for item in items
+        ])
+
+        orders = Order.objects.bulk_create([
+            Order(
+                business=business,
+                customer=customers[i % len(customers)],
+                customer_name=customers[i % len(customers)].name,
+                order_number=f"{prefix}O{i}",
+                invoice_id=f"{prefix}I{i}"
+            )
+            for i in range(rows)
+        ])
+
+        Payment.objects.bulk_create([
+            Payment(
+                order=order,
+                method="UPI",
+                status="Success" if i % 2 else "Pending",
+                amount=0
+            )
+            for i, order in enumerate(orders)
+        ])
+
+        Invoice.objects.bulk_create([
+            Invoice(
+                business=business,
+                customer=customers[i % len(customers)],
+                customer_name=customers[i % len(customers)].name,
+                invoice_id=f"{prefix}V{i}",
+                status="Paid" if i % 4 else "Unpaid"
+            )
+            for i in range(rows)
+        ])
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    return tenants[len(tenants) // 2]
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAINs the hot business-scoped queries and fails if one of them "
+        "does not use the index meant for it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--business",
+            type=int,
+            help="Business id to explain the queries for."
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            metavar="ROWS",
+            help=(
+                "Seed throwaway tenants with ROWS rows per table and check "
+                "against those. Everything is rolled back afterwards."
+            )
+        )
+        parser.add_argument(
+            "--tenants",
+            type=int,
+            default=20,
+            help="Number of seeded businesses (with --seed)."
+        )
+
+    def handle(self, *args, **options):
+        failures = []
+
+        try:
+            with transaction.atomic():
+                if options["seed"]:
+                    business = seed(options["tenants"], options["seed"])
+
+                    # Seeded tables are small enough that a sequential
+                    # scan may still win; what matters is that a usable
+                    # index exists for every query.
+                    if connection.vendor == "postgresql":
+                        with connection.cursor() as cursor:
+                            cursor.execute("SET LOCAL enable_seqscan = off")
+
+                else:
+                    business = self.get_business(options["business"])
+
+                failures = self.check_plans(business, options["verbosity"])
+
+                raise Rollback
+
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(
+                "Queries not using their index: " + ", ".join(failures)
+            )
+
+        self.stdout.write(self.style.SUCCESS("All hot queries use their indexes."))
+
+    def get_business(self, business_id):
+        businesses = BusinessEntity.objects.all()
+
+        if business_id:
+            businesses = businesses.filter(id=business_id)
+
+        business = businesses.order_by("id").first()
+
+        if not business:
+            raise CommandError("No business to explain the queries for; use --seed.")
+
+        return business
+
+    def check_plans(self, business, verbosity):
+        customer = Customer.objects.filter(business=business).first()
+        order = Order.objects.filter(business=business).first()
+
+        if not customer or not order:
+            raise CommandError(
+                f"Business {business.id} has no customers or orders; use --seed."
+            )
+
+        failures = []
+
+        for label, index, queryset in hot_queries(business, customer, order):
+            plan = queryset.explain()
+
+            if index in plan:
+                self.stdout.write(f"ok    {label}: {index}")
+            else:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f"FAIL  {label}: expected {index}"))
+
+            if verbosity > 1 or index not in plan:
+                self.stdout.write(plan)
+
+        return failures
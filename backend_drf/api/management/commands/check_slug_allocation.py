@@ -0,0 +1,150 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils.text import slugify
+
+from business_entity.models import BusinessEntity
+from products.models import Item
+from users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+def seed_business():
+    token = uuid.uuid4().hex[:8]
+
+    user = User.objects.create(
+        email=f"slug-{token}@example.invalid",
+        name="Slug check",
+        phone=f"s{token}"
+    )
+
+    return BusinessEntity.objects.create(
+        user=user,
+        business_name="Slug check",
+        slug=f"slug-check-{token}",
+        business_type="Retail",
+        tax_status="Registered",
+        kyc_doc_type="PAN",
+        is_active=True
+    )
+
+
+def new_item(business, name):
+    return Item(
+        business=business,
+        item_type="Service",
+        item_name=name,
+        category="General",
+        subcategory="General",
+        area="NA"
+    )
+
+
+def seed_duplicates(business, name, count):
+    """
+    `count` items already named `name`, slugged name, name-1, ... the
+    way the old probing loop left them. Bulk inserted, so no counter
+    row exists yet.
+    """
+    base = slugify(name)
+
+    Item.objects.bulk_create(
+        [
+            Item(
+                business=business,
+                item_type="Service",
+                item_name=name,
+                slug=f"{base}-{n}" if n else base,
+                category="General",
+                subcategory="General",
+                area="NA"
+            )
+            for n in range(count)
+        ],
+        batch_size=1000
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Saves items whose name is already taken by 0 and by --duplicates "
+        "other items and fails if a slug needs more queries with the "
+        "duplicates present. Prints the time per insert. Everything is "
+        "rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--duplicates",
+            type=int,
+            default=10000,
+            help="Items already holding the name before the timed inserts."
+        )
+        parser.add_argument(
+            "--inserts",
+            type=int,
+            default=200,
+            help="Timed inserts per run."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                business = seed_business()
+
+                runs = [
+                    self.run(business, "Fresh name", 0, options["inserts"]),
+                    self.run(business, "Taken name", options["duplicates"], options["inserts"]),
+                ]
+
+                raise Rollback
+
+        except Rollback:
+            pass
+
+        (_, fresh_queries, _), (_, taken_queries, _) = runs
+
+        if taken_queries > fresh_queries:
+            raise CommandError(
+                f"A slug with {options['duplicates']} duplicates takes "
+                f"{taken_queries} queries, {fresh_queries} without."
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            "Slug allocation does not depend on the number of duplicates."
+        ))
+
+    def run(self, business, name, duplicates, inserts):
+        """
+        Seeds the duplicates, saves one item to seed the counter, then
+        times `inserts` more. Returns (first save queries, queries per
+        insert, ms per insert).
+        """
+        seed_duplicates(business, name, duplicates)
+
+        with CaptureQueriesContext(connection) as first:
+            new_item(business, name).save()
+
+        most = 0
+        started = time.perf_counter()
+
+        for _ in range(inserts):
+            with CaptureQueriesContext(connection) as queries:
+                new_item(business, name).save()
+
+            most = max(most, len(queries))
+
+        per_insert = (time.perf_counter() - started) / inserts * 1000
+
+        self.stdout.write(
+            f"{duplicates:>6} duplicates: first save {len(first)} queries, "
+            f"then at most {most} queries and {per_insert:.2f} ms per insert"
+        )
+
+        return len(first), most, per_insert
@@ -0,0 +1,246 @@
+import random
+import timeit
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.tax_engine import compute_lines
+
+
+# ---------------------------------------------------------
+# The calculator the tax engine replaced, frozen
+# ---------------------------------------------------------
+# calculate_item_values as it was before api.utils.tax_engine, and the
+# document totals the views added up from it. Do not change these: they
+# are what the engine is checked against.
+
+def legacy_item_values(price, qty, discount_percent, tax_percent, includes_tax):
+    price = Decimal(str(price))
+    qty = Decimal(str(qty))
+    discount_percent = Decimal(str(discount_percent or 0))
+    tax_percent = Decimal(str(tax_percent or 0))
+
+    line_price = price * qty
+
+    if includes_tax:
+        discount_amount = (line_price * discount_percent) / 100
+        after_discount = line_price - discount_amount
+
+        taxable_amount = after_discount / (1 + tax_percent / 100)
+        tax_amount = after_discount - taxable_amount
+
+        base_amount = taxable_amount
+        total_value = after_discount
+    else:
+        base_amount = line_price
+
+        discount_amount = (base_amount * discount_percent) / 100
+        taxable_amount = base_amount - discount_amount
+
+        tax_amount = (taxable_amount * tax_percent) / 100
+        total_value = taxable_amount + tax_amount
+
+    return {
+        "base_amount": base_amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+        "discount_amount": discount_amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+        "taxable_amount": taxable_amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+        "tax_amount": tax_amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+        "total_value": total_value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+    }
+
+
+def legacy_document(lines, includes_tax):
+    values = [legacy_item_values(*line, includes_tax) for line in lines]
+
+    totals = {
+        name: sum((v[name] for v in values), Decimal("0.00")).quantize(
+            Decimal("0.01"), rounding=ROUND_HALF_UP
+        )
+        for name in LINE_FIELDS
+    }
+
+    final = totals["total_value"]
+    net_payable = final.quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+
+    return {
+        "lines": values,
+        "total_base_amount": totals["base_amount"],
+        "discount_amount": totals["discount_amount"],
+        "total_taxable_amount": totals["taxable_amount"],
+        "total_tax": totals["tax_amount"],
+        "total_value": final,
+        "round_off": (net_payable - final).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+        "net_payable": net_payable,
+    }
+
+
+LINE_FIELDS = (
+    "base_amount",
+    "discount_amount",
+    "taxable_amount",
+    "tax_amount",
+    "total_value",
+)
+
+TOTAL_FIELDS = (
+    "total_base_amount",
+    "discount_amount",
+    "total_taxable_amount",
+    "total_tax",
+    "total_value",
+    "round_off",
+    "net_payable",
+)
+
+
+# ---------------------------------------------------------
+# Random documents
+# ---------------------------------------------------------
+# Prices and percents come as Decimals, ints, floats and None, the way
+# the views pass them from models and request data.
+
+COMMON_RATES = [0, 5, 12, 18, 28, 0.1, 12.5, None]
+
+
+def random_price(rng):
+    kind = rng.randrange(3)
+
+    if kind == 0:
+        return Decimal(rng.randint(0, 9999999999)) / 100
+
+    if kind == 1:
+        return round(rng.uniform(0, 1e6), 2)
+
+    return rng.randint(0, 100000)
+
+
+def random_percent(rng):
+    kind = rng.randrange(3)
+
+    if kind == 0:
+        return Decimal(rng.randint(0, 10000)) / 100
+
+    if kind == 1:
+        return rng.choice(COMMON_RATES)
+
+    return round(rng.uniform(0, 100), 2)
+
+
+def random_document(rng, max_lines):
+    return [
+        (
+            random_price(rng),
+            rng.randint(0, 10000),
+            random_percent(rng),
+            random_percent(rng),
+        )
+        for _ in range(rng.randint(0, max_lines))
+    ]
+
+
+def differences(lines, includes_tax):
+    """Fields where the engine and the frozen calculator disagree."""
+    new = compute_lines(lines, includes_tax)
+    old = legacy_document(lines, includes_tax)
+
+    found = [
+        (f"line {n} {name}", new_values[name], old_values[name])
+        for n, (new_values, old_values) in enumerate(zip(new["lines"], old["lines"]))
+        for name in LINE_FIELDS
+        # str() as well, so 1.0 and 1.00 count as different
+        if str(new_values[name]) != str(old_values[name])
+    ]
+
+    found += [
+        (name, new[name], old[name])
+        for name in TOTAL_FIELDS
+        if str(new[name]) != str(old[name])
+    ]
+
+    return found
+
+
+class Command(BaseCommand):
+    help = (
+        "Checks api.utils.tax_engine against a frozen copy of the calculator it "
+        "replaced on random documents, then times both per line."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--examples",
+            type=int,
+            default=20000,
+            help="Random documents to compare, each with and without tax included."
+        )
+        parser.add_argument(
+            "--max-lines",
+            type=int,
+            default=30,
+            help="Most lines per random document."
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="Seed for the random documents; a failure prints the one it used."
+        )
+        parser.add_argument(
+            "--no-benchmark",
+            action="store_true",
+            help="Only run the equivalence check."
+        )
+
+    def handle(self, *args, **options):
+        seed = options["seed"]
+
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+
+        rng = random.Random(seed)
+
+        for number in range(options["examples"]):
+            lines = random_document(rng, options["max_lines"])
+
+            for includes_tax in (True, False):
+                found = differences(lines, includes_tax)
+
+                if found:
+                    for name, new, old in found[:10]:
+                        self.stdout.write(f"      {name}: engine {new}, calculator {old}")
+
+                    raise CommandError(
+                        f"Document {number} (seed {seed}, includes_tax={includes_tax}) "
+                        f"differs: {lines}"
+                    )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['examples']} random documents match the old calculator "
+            f"(seed {seed})."
+        ))
+
+        if not options["no_benchmark"]:
+            self.benchmark()
+
+    def benchmark(self, lines=50, number=2000):
+        """Microseconds per line, pricing a `lines` line cart both ways."""
+        rng = random.Random(1)
+
+        cart = [
+            (
+                Decimal(rng.randint(100, 999999)) / 100,
+                rng.randint(1, 5),
+                Decimal(rng.choice([0, 5, 10])),
+                Decimal(rng.choice([0, 5, 12, 18, 28])),
+            )
+            for _ in range(lines)
+        ]
+
+        timings = {
+            "old calculator": lambda: legacy_document(cart, False),
+            "tax engine": lambda: compute_lines(cart, False),
+        }
+
+        for label, price in timings.items():
+            best = min(timeit.repeat(price, number=number, repeat=5))
+            self.stdout.write(f"{label}: {best / number / lines * 1e6:.2f} us per line")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.utils.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Deletes Idempotency-Key records older than the replay window."
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys()
+        self.stdout.write(f"Deleted {deleted} expired idempotency keys.")
@@ -0,0 +1,205 @@
+"""
+Frozen helpers of the invoice 0007 / order 0021 gst_components
+migrations: api.utils.gst and api.utils.tax_engine.split_tax as they
+were when those migrations were written.
+
+Historical migrations must keep doing what they did, so nothing here
+follows the live modules. Don't edit this file; a later data migration
+that needs different rules gets its own copy.
+"""
+import re
+from decimal import Decimal, ROUND_HALF_UP
+
+
+BATCH = 500
+
+ZERO = Decimal("0.00")
+PAISA = Decimal("0.01")
+
+GST_COMPONENTS = ("cgst", "sgst", "igst", "cess")
+
+STATE_CODES = {
+    "jammu and kashmir": "01",
+    "himachal pradesh": "02",
+    "punjab": "03",
+    "chandigarh": "04",
+    "uttarakhand": "05",
+    "haryana": "06",
+    "delhi": "07",
+    "rajasthan": "08",
+    "uttar pradesh": "09",
+    "bihar": "10",
+    "sikkim": "11",
+    "arunachal pradesh": "12",
+    "nagaland": "13",
+    "manipur": "14",
+    "mizoram": "15",
+    "tripura": "16",
+    "meghalaya": "17",
+    "assam": "18",
+    "west bengal": "19",
+    "jharkhand": "20",
+    "odisha": "21",
+    "chhattisgarh": "22",
+    "madhya pradesh": "23",
+    "gujarat": "24",
+    "dadra and nagar haveli and daman and diu": "26",
+    "maharashtra": "27",
+    "karnataka": "29",
+    "goa": "30",
+    "lakshadweep": "31",
+    "kerala": "32",
+    "tamil nadu": "33",
+    "puducherry": "34",
+    "andaman and nicobar islands": "35",
+    "telangana": "36",
+    "andhra pradesh": "37",
+    "ladakh": "38",
+}
+
+STATE_ALIASES = {
+    "j and k": "01",
+    "uttaranchal": "05",
+    "new delhi": "07",
+    "nct of delhi": "07",
+    "orissa": "21",
+    "daman and diu": "26",
+    "dadra and nagar haveli": "26",
+    "pondicherry": "34",
+    "andaman and nicobar": "35",
+}
+
+GSTIN_PATTERN = re.compile(r"^[0-9]{2}[A-Z0-9]{13}$")
+
+HOME_COUNTRIES = ("", "india", "in", "ind", "bharat")
+
+OTHER_COUNTRY = "96"
+
+
+# ---------------------------------------------------------
+# api.utils.gst
+# ---------------------------------------------------------
+
+def normalize_state(name):
+    name = (name or "").lower().replace("&", " and ")
+    return " ".join(re.sub(r"[^a-z0-9 ]", " ", name).split())
+
+
+def state_code(state=None, gstin=None):
+    gstin = (gstin or "").strip().upper()
+
+    if GSTIN_PATTERN.match(gstin):
+        return gstin[:2]
+
+    name = normalize_state(state)
+
+    return STATE_CODES.get(name) or STATE_ALIASES.get(name)
+
+
+def place_of_supply(customer):
+    country = (getattr(customer, "country", None) or "").strip().lower()
+
+    if country not in HOME_COUNTRIES:
+        return OTHER_COUNTRY
+
+    return state_code(
+        getattr(customer, "state", None),
+        getattr(customer, "gstin", None)
+    )
+
+
+def is_inter_state(business, customer):
+    supplier = state_code(business.state, business.tax_number)
+    recipient = place_of_supply(customer)
+
+    if not supplier or not recipient:
+        return False
+
+    return supplier != recipient
+
+
+# ---------------------------------------------------------
+# api.utils.tax_engine
+# ---------------------------------------------------------
+
+def money(value):
+    return value.quantize(PAISA, rounding=ROUND_HALF_UP)
+
+
+def split_tax(tax_amount, cess_amount, inter_state):
+    no_split = {f"{name}_amount": ZERO for name in GST_COMPONENTS}
+    gst_amount = tax_amount - cess_amount
+
+    if inter_state:
+        return dict(no_split, igst_amount=gst_amount, cess_amount=cess_amount)
+
+    cgst = money(gst_amount / 2)
+
+    return dict(
+        no_split,
+        cgst_amount=cgst,
+        sgst_amount=gst_amount - cgst,
+        cess_amount=cess_amount
+    )
+
+
+# ---------------------------------------------------------
+# The backfill
+# ---------------------------------------------------------
+
+def split_existing(Document, Line, document_field):
+    """
+    Splits the tax of existing GST documents into CGST + SGST or IGST,
+    from the business and customer states they were written with. Old
+    lines carried no cess, so all of their tax is GST. `Line` points at
+    `Document` through `document_field`.
+    """
+    ids = list(Document.objects.order_by("id").values_list("id", flat=True))
+
+    for start in range(0, len(ids), BATCH):
+        documents = list(
+            Document.objects
+            .filter(id__in=ids[start:start + BATCH])
+            .select_related("business", "customer")
+        )
+        lines = list(
+            Line.objects.filter(**{f"{document_field}__in": documents, "tax_type": "GST"})
+        )
+        inter_state = {}
+
+        for document in documents:
+            inter_state[document.id] = is_inter_state(
+                document.business,
+                document.customer
+            )
+            document.place_of_supply = place_of_supply(document.customer) or ""
+            document.is_inter_state = False
+
+            for name in GST_COMPONENTS:
+                setattr(document, f"total_{name}", ZERO)
+
+        by_id = {document.id: document for document in documents}
+
+        for line in lines:
+            document = by_id[getattr(line, f"{document_field}_id")]
+            document.is_inter_state = inter_state[document.id]
+
+            for name, amount in split_tax(
+                line.tax_amount, ZERO, inter_state[document.id]
+            ).items():
+                setattr(line, name, amount)
+                total = f"total_{name[:-len('_amount')]}"
+                setattr(document, total, getattr(document, total) + amount)
+
+        Line.objects.bulk_update(
+            lines,
+            ["cgst_amount", "sgst_amount", "igst_amount", "cess_amount"],
+            batch_size=BATCH
+        )
+        Document.objects.bulk_update(
+            documents,
+            [
+                "place_of_supply", "is_inter_state",
+                "total_cgst", "total_sgst", "total_igst", "total_cess",
+            ]
+        )
@@ -1,4 +1,73 @@
-
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class SlugSequence(models.Model):
+    """
+    Last suffix handed out for a base slug within a scope, e.g.
+    "t-shirt" inside "item:42". Lets the next free slug be found with
+    one UPDATE instead of probing t-shirt-1, t-shirt-2, ...
+    """
+    scope = models.CharField(max_length=50)
+    base_slug = models.CharField(max_length=200)
+    last_suffix = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "base_slug"],
+                name="unique_slug_sequence"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.scope}/{self.base_slug}: {self.last_suffix}"
+
+
+class BarcodeSequence(models.Model):
+    """
+    Counter behind generated barcodes on databases without native
+    sequences. PostgreSQL uses the api_barcode_seq sequence instead, see
+    api/utils/barcode_allocator.py.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    One Idempotency-Key sent by a client for a non-repeatable request.
+    Holds the first completed response so retries get it replayed
+    instead of running the request again; see api/utils/idempotency.py.
+    """
+    scope = models.CharField(max_length=50)
+    key = models.CharField(max_length=255)
+    endpoint = models.CharField(max_length=100)
+    fingerprint = models.CharField(max_length=64)
+
+    # Null while the first request is still running
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        null=True,
+        blank=True
+    )
+
+    created_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "key"],
+                name="unique_idempotency_key"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.scope}/{self.key}"
 
 
 # from django.db import models
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from payments.views import BusinessPaymentConfigView
-from order.views import AddToCartView, CancelOrderView, CheckoutPreviewView, CheckoutView, CustomerOrderHistoryView, OrderDetailView, OrderItemListView, OrderListView, UpdateCartItemView, UpdateOrderStatusView, UpdatePaymentStatusView, ViewCartView, CreateRazorpayOrderView, VerifyRazorpayPaymentView, CreatePaypalOrderView, CapturePaypalOrderView
-from invoice.views import CustomerDetailByNameView, CustomerSearchListView, InvoiceDetailView, InvoiceItemListView, InvoiceListCreateView, ItemDetailByBarcodeView, ItemDetailByNameView, ItemSearchListView
-from products.views import BulkImportView, DownloadBarcodeView, ItemDetailView, ItemListCreateView, ItemVariantDetailView, ItemVariantListCreateView, VariantAttributeDetailView, VariantAttributeListCreateView, VariantImageDetailView, VariantImageListCreateView
+from order.views import AddToCartView, BatchCartView, CancelOrderView, CheckoutPreviewView, CheckoutView, CustomerOrderHistoryView, OrderDetailView, OrderItemListView, OrderListView, ReorderView, UpdateCartItemView, UpdateOrderStatusView, UpdatePaymentStatusView, ViewCartView, CreateRazorpayOrderView, VerifyRazorpayPaymentView, CreatePaypalOrderView, CapturePaypalOrderView
+from invoice.views import CustomerDetailByNameView, CustomerSearchListView, GSTR1ReportView, InvoiceDetailView, InvoiceItemListView, InvoiceListCreateView, ItemDetailByBarcodeView, ItemDetailByNameView, ItemSearchListView
+from products.views import BarcodeBatchView, BulkImportStatusView, BulkImportView, DownloadBarcodeView, ItemDetailView, ItemListCreateView, ItemVariantDetailView, ItemVariantListCreateView, VariantAttributeDetailView, VariantAttributeListCreateView, VariantImageDetailView, VariantImageListCreateView
 from customers.views import CustomerAddressUpdateView, CustomerDetailView, CustomerForgotPasswordView, CustomerListCreateView, CustomerLoginOtpRequestView, CustomerLoginOtpVerifyView, CustomerLoginView, CustomerResetPasswordView, CustomerSignupView, CustomerTokenRefreshView
 from business_entity.views import BusinessSetupView, BusinessUpdateView, SwitchBusinessView
+from analytics.views import SalesAnalyticsView
 from users import views as UserViews
 from .views import DashboardView, GoodsItemListView, ItemAllListView, ItemListView, AppRunView, ItemDetailBySlugView, ItemSummaryBySlugView, ServiceItemListView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
@@ -31,6 +32,7 @@ urlpatterns = [
 
     # path('login/', UserViews.LoginView.as_view(), name='auth_login'),
     path('dashboard/', DashboardView.as_view(), name="dashboard"),
+    path('dashboard/analytics/', SalesAnalyticsView.as_view(), name="dashboard-analytics"),
     path('business/setup/', BusinessSetupView.as_view(), name='business-setup'),
     path('business/<int:pk>/update/', BusinessUpdateView.as_view(), name='business-setup-update'),
     path("business/switch/", SwitchBusinessView.as_view(), name="switch-business"),
@@ -39,6 +41,7 @@ urlpatterns = [
     path('products/', ItemListCreateView.as_view(), name='item-list-create'),
     path('products/<int:pk>/', ItemDetailView.as_view(), name='item-detail'),
     path('products/bulk-import/', BulkImportView.as_view(), name='product-bulk-import'),
+    path('products/bulk-import/<uuid:job_id>/', BulkImportStatusView.as_view(), name='product-bulk-import-status'),
     
     path("items/<slug:item_slug>/variants/", ItemVariantListCreateView.as_view()),
     path("variants/<uuid:uid>/", ItemVariantDetailView.as_view()),
@@ -56,6 +59,7 @@ urlpatterns = [
     ),
 
     path('items/<int:pk>/barcode/', DownloadBarcodeView.as_view()),
+    path('items/barcodes/batch/', BarcodeBatchView.as_view(), name='item-barcode-batch'),
 
     path('search/products/', ItemSearchListView.as_view(), name='item-search'),
     path('products/detail/', ItemDetailByNameView.as_view(), name='item-detail-by-name'),
@@ -71,6 +75,7 @@ urlpatterns = [
     path('invoices/', InvoiceListCreateView.as_view(), name='invoice-list-create'),
     path('invoices/<int:pk>/', InvoiceDetailView.as_view(), name='invoice-detail'),
     path('invoices/<int:invoice_id>/items/', InvoiceItemListView.as_view(), name='invoice-item-list'),
+    path('reports/gstr1/<str:section>/', GSTR1ReportView.as_view(), name='gstr1-report'),
 
     path('orders/', OrderListView.as_view(), name='order-list'),
     path('orders/<str:order_number>/', OrderDetailView.as_view(), name='order-detail'),
@@ -112,7 +117,9 @@ urlpatterns = [
     path('payments/paypal/capture/', CapturePaypalOrderView.as_view(), name="paypal-capture"),
     path('customer/orders/', CustomerOrderHistoryView.as_view(), name='customer-order-history'),
     path('customer/order/<str:order_number>/cancel/', CancelOrderView.as_view(), name='cancel-order'),
+    path('customer/order/<str:order_number>/reorder/', ReorderView.as_view(), name='reorder'),
     path('customer/cart/update/', UpdateCartItemView.as_view(), name='update-cart'),
+    path('customer/cart/batch/', BatchCartView.as_view(), name='batch-cart'),
     path('customer/profile/address/', CustomerAddressUpdateView.as_view(), name='customer-address-update'),
 
     path('marketplace/items/', ItemAllListView.as_view(), name="marketplace"),
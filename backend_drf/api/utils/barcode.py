@@ -1,15 +1,312 @@
 # utils/barcode.py
 
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+
 import barcode
-from barcode.writer import ImageWriter
+from barcode.writer import ImageWriter, SVGWriter
 from io import BytesIO
+from django.conf import settings
 from django.core.files.base import ContentFile
+from PIL import Image, ImageDraw, ImageFont
+
+
+FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+SYMBOLOGIES = ("code128", "ean13")
+
+# Rendered images kept in this process
+MEMORY_CACHE_ITEMS = 512
+
+# Rendered images kept on local disk, shared by all workers on the host
+DISK_CACHE_DIR = getattr(
+    settings,
+    "BARCODE_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "barcode_cache")
+)
+DISK_CACHE_BYTES = getattr(settings, "BARCODE_CACHE_BYTES", 200 * 1024 * 1024)
+
+# Trimming the disk cache means listing it, so only do it now and then
+DISK_TRIM_EVERY = 200
+
+# Label sheet: A4 at 200 dpi, 3 x 8 labels
+SHEET_DPI = 200
+SHEET_SIZE = (1654, 2339)
+SHEET_COLUMNS = 3
+SHEET_ROWS = 8
+SHEET_MARGIN = 60
+
+
+# ---------------------------------------------------------
+# Render cache
+# ---------------------------------------------------------
+
+class RenderCache:
+    """
+    Content-addressed cache of rendered barcodes. The key is a hash of
+    the code and every render option, so entries never go stale and the
+    two LRU layers can be trimmed freely.
+    """
+
+    def __init__(self, max_items, directory, max_bytes):
+        self.max_items = max_items
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.writes = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        with self.lock:
+            data = self.memory.get(key)
+
+            if data is not None:
+                self.memory.move_to_end(key)
+                return data
+
+        path = self.path(key)
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+
+            # Bump mtime so the disk trim evicts least recently used
+            os.utime(path)
+
+        except OSError:
+            return None
+
+        self.remember(key, data)
+        return data
+
+    def remember(self, key, data):
+        with self.lock:
+            self.memory[key] = data
+            self.memory.move_to_end(key)
+
+            while len(self.memory) > self.max_items:
+                self.memory.popitem(last=False)
+
+    def set(self, key, data):
+        self.remember(key, data)
+
+        path = self.path(key)
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            # Write then rename so readers never see half a file
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+
+            os.replace(tmp, path)
+
+        except OSError:
+            # The disk layer is best effort
+            return
+
+        with self.lock:
+            self.writes += 1
+            trim = self.writes % DISK_TRIM_EVERY == 0
+
+        if trim:
+            self.trim()
+
+    def trim(self):
+        entries = []
+        total = 0
+
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        entries.sort()
+
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+            total -= size
+
+
+render_cache = RenderCache(MEMORY_CACHE_ITEMS, DISK_CACHE_DIR, DISK_CACHE_BYTES)
+
+
+# ---------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------
+
+def render_key(code, fmt, symbology, options):
+    payload = json.dumps(
+        [code, fmt, symbology, options],
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render_barcode(code, fmt="png", symbology="code128", **options):
+    """
+    Returns the barcode for `code` as PNG or SVG bytes. `options` are
+    python-barcode writer options (module_width, module_height,
+    font_size, write_text, ...).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported barcode format '{fmt}'.")
+
+    if symbology not in SYMBOLOGIES:
+        raise ValueError(f"Unsupported barcode type '{symbology}'.")
+
+    key = render_key(code, fmt, symbology, options)
+    data = render_cache.get(key)
+
+    if data is not None:
+        return data
+
+    writer = SVGWriter() if fmt == "svg" else ImageWriter()
+    barcode_obj = barcode.get_barcode_class(symbology)(code, writer=writer)
+
+    buffer = BytesIO()
+    barcode_obj.write(buffer, options=options or None)
+    data = buffer.getvalue()
+
+    render_cache.set(key, data)
+    return data
+
+
+def generate_barcode_image(code, fmt="png", symbology="code128"):
+    data = render_barcode(code, fmt, symbology)
+    return ContentFile(data, name=f"{code}.{fmt}")
+
+
+# ---------------------------------------------------------
+# Batches
+# ---------------------------------------------------------
+
+class _StreamBuffer:
+    """Write-only file object that hands out whatever was written."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_barcode_zip(labels, fmt="png", symbology="code128"):
+    """
+    Yields a ZIP archive of one image per (code, name) label, as it is
+    built. PNGs are already compressed, so only SVGs are deflated.
+    """
+    stream = _StreamBuffer()
+    used = set()
+    compression = zipfile.ZIP_DEFLATED if fmt == "svg" else zipfile.ZIP_STORED
+
+    with zipfile.ZipFile(stream, "w", compression) as archive:
+        for code, name in labels:
+            filename = f"{name}_{code}.{fmt}"
+
+            # Copies of the same label would otherwise share a name
+            counter = 1
+            while filename in used:
+                counter += 1
+                filename = f"{name}_{code}_{counter}.{fmt}"
+
+            used.add(filename)
+
+            archive.writestr(filename, render_barcode(code, fmt, symbology))
+            yield stream.pop()
+
+    yield stream.pop()
+
+
+def render_label_pdf(labels, symbology="code128"):
+    """
+    Lays (code, caption) labels out on A4 sheets and returns the PDF
+    bytes. Pages are drawn in 1-bit so a full sheet stays small.
+    """
+    cell_width = (SHEET_SIZE[0] - 2 * SHEET_MARGIN) // SHEET_COLUMNS
+    cell_height = (SHEET_SIZE[1] - 2 * SHEET_MARGIN) // SHEET_ROWS
+    per_page = SHEET_COLUMNS * SHEET_ROWS
+    font = ImageFont.load_default(size=28)
+
+    pages = []
+
+    for start in range(0, len(labels), per_page):
+        page = Image.new("1", SHEET_SIZE, 1)
+        draw = ImageDraw.Draw(page)
+
+        for index, (code, caption) in enumerate(labels[start:start + per_page]):
+            left = SHEET_MARGIN + (index % SHEET_COLUMNS) * cell_width
+            top = SHEET_MARGIN + (index // SHEET_COLUMNS) * cell_height
+
+            image = Image.open(BytesIO(render_barcode(code, "png", symbology)))
+            image.thumbnail((cell_width - 20, cell_height - 50))
+
+            page.paste(
+                image.convert("1", dither=Image.Dither.NONE),
+                (left + (cell_width - image.width) // 2, top)
+            )
+
+            draw.text(
+                (left + cell_width // 2, top + image.height),
+                caption[:30],
+                fill=0,
+                font=font,
+                anchor="ma"
+            )
+
+        pages.append(page)
 
-def generate_barcode_image(code):
-    CODE128 = barcode.get_barcode_class('code128')
-    barcode_obj = CODE128(code, writer=ImageWriter())
+    if not pages:
+        pages.append(Image.new("1", SHEET_SIZE, 1))
 
     buffer = BytesIO()
-    barcode_obj.write(buffer)
+    pages[0].save(
+        buffer,
+        "PDF",
+        resolution=SHEET_DPI,
+        save_all=True,
+        append_images=pages[1:]
+    )
 
-    return ContentFile(buffer.getvalue(), name=f"{code}.png")
\ No newline at end of file
+    return buffer.getvalue()
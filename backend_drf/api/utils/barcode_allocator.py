@@ -0,0 +1,93 @@
+import threading
+from collections import deque
+
+from django.db import connection, transaction
+from django.db.models import F
+
+from api.models import BarcodeSequence
+
+
+# Generated codes are EAN-13 with the "20" prefix, which GS1 keeps for
+# in-store numbering: 20 + 10 digit serial + check digit. They render as
+# EAN-13 or Code128 and never collide with the old 12 char hex codes.
+PREFIX = "20"
+SERIAL_DIGITS = 10
+
+SEQUENCE_NAME = "api_barcode_seq"
+
+# Codes taken from the database sequence per round trip and kept in this
+# process until used
+BLOCK_SIZE = 100
+
+_pool = deque()
+_lock = threading.Lock()
+
+
+def ean13_check_digit(digits):
+    """Check digit for the first 12 digits of an EAN-13."""
+    total = sum(
+        int(d) * (3 if i % 2 else 1)
+        for i, d in enumerate(digits)
+    )
+    return str((10 - total % 10) % 10)
+
+
+def ean13(serial):
+    digits = f"{PREFIX}{serial:0{SERIAL_DIGITS}d}"
+    return digits + ean13_check_digit(digits)
+
+
+def is_valid_ean13(code):
+    return (
+        isinstance(code, str)
+        and len(code) == 13
+        and code.isdigit()
+        and ean13_check_digit(code[:12]) == code[12]
+    )
+
+
+def _reserve_serials(count):
+    if connection.vendor == "postgresql":
+        # nextval() is never rolled back, so serials handed out here can
+        # safely outlive the caller's transaction
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                [SEQUENCE_NAME, count]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    sequence = BarcodeSequence.objects.filter(name="barcode")
+
+    with transaction.atomic():
+        if not sequence.update(last_value=F("last_value") + count):
+            BarcodeSequence.objects.get_or_create(name="barcode")
+            sequence.update(last_value=F("last_value") + count)
+
+        last = sequence.values_list("last_value", flat=True).get()
+
+    return list(range(last - count + 1, last + 1))
+
+
+def reserve_barcodes(count):
+    """
+    Returns `count` new barcodes, unique across Item and ItemVariant,
+    with at most one database round trip.
+    """
+    if count <= 0:
+        return []
+
+    if connection.vendor != "postgresql":
+        # The counter row is transactional here; caching serials past a
+        # rollback would hand the same codes out twice
+        return [ean13(serial) for serial in _reserve_serials(count)]
+
+    with _lock:
+        if len(_pool) < count:
+            _pool.extend(_reserve_serials(count - len(_pool) + BLOCK_SIZE))
+
+        return [ean13(_pool.popleft()) for _ in range(count)]
+
+
+def next_barcode():
+    return reserve_barcodes(1)[0]
@@ -0,0 +1,61 @@
+from products.serializers import ProductEnvelopeSerializer, product_business_fields
+
+
+# ?envelope=true switches item lists to the enveloped shape. Without it
+# every row still embeds the full business, which the current
+# frontend reads as items[i].business / items[i].currency_symbol.
+ENVELOPE_PARAM = "envelope"
+
+PAGINATION_KEYS = ("count", "next", "previous")
+
+
+def wants_envelope(request):
+    value = request.query_params.get(ENVELOPE_PARAM, "")
+    return value.lower() in ("1", "true", "yes")
+
+
+def envelope(data, business):
+    """
+    Wraps list data (paginated or not) as business fields + results.
+    """
+    if isinstance(data, dict):
+        head = {key: data[key] for key in PAGINATION_KEYS if key in data}
+        results = data["results"]
+    else:
+        head = {}
+        results = data
+
+    return {
+        **head,
+        **product_business_fields(business),
+        "results": results,
+    }
+
+
+class BusinessEnvelopeMixin:
+    """
+    For ListAPIViews of Items that all belong to one business. Override
+    get_envelope_business() when that isn't the active business.
+    """
+
+    def use_envelope(self):
+        return self.request.method == "GET" and wants_envelope(self.request)
+
+    def get_envelope_business(self):
+        return self.request.business
+
+    def get_serializer_class(self):
+        if self.use_envelope():
+            return ProductEnvelopeSerializer
+
+        return super().get_serializer_class()
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+
+        business = self.get_envelope_business()
+
+        if self.use_envelope() and business:
+            response.data = envelope(response.data, business)
+
+        return response
@@ -0,0 +1,109 @@
+import re
+
+
+# GST state codes, the first two digits of every GSTIN
+STATE_CODES = {
+    "jammu and kashmir": "01",
+    "himachal pradesh": "02",
+    "punjab": "03",
+    "chandigarh": "04",
+    "uttarakhand": "05",
+    "haryana": "06",
+    "delhi": "07",
+    "rajasthan": "08",
+    "uttar pradesh": "09",
+    "bihar": "10",
+    "sikkim": "11",
+    "arunachal pradesh": "12",
+    "nagaland": "13",
+    "manipur": "14",
+    "mizoram": "15",
+    "tripura": "16",
+    "meghalaya": "17",
+    "assam": "18",
+    "west bengal": "19",
+    "jharkhand": "20",
+    "odisha": "21",
+    "chhattisgarh": "22",
+    "madhya pradesh": "23",
+    "gujarat": "24",
+    "dadra and nagar haveli and daman and diu": "26",
+    "maharashtra": "27",
+    "karnataka": "29",
+    "goa": "30",
+    "lakshadweep": "31",
+    "kerala": "32",
+    "tamil nadu": "33",
+    "puducherry": "34",
+    "andaman and nicobar islands": "35",
+    "telangana": "36",
+    "andhra pradesh": "37",
+    "ladakh": "38",
+}
+
+# Spellings customers and businesses actually type
+STATE_ALIASES = {
+    "j and k": "01",
+    "uttaranchal": "05",
+    "new delhi": "07",
+    "nct of delhi": "07",
+    "orissa": "21",
+    "daman and diu": "26",
+    "dadra and nagar haveli": "26",
+    "pondicherry": "34",
+    "andaman and nicobar": "35",
+}
+
+GSTIN_PATTERN = re.compile(r"^[0-9]{2}[A-Z0-9]{13}$")
+
+HOME_COUNTRIES = ("", "india", "in", "ind", "bharat")
+
+# Place of supply of exports in GST returns
+OTHER_COUNTRY = "96"
+
+
+def normalize_state(name):
+    name = (name or "").lower().replace("&", " and ")
+    return " ".join(re.sub(r"[^a-z0-9 ]", " ", name).split())
+
+
+def state_code(state=None, gstin=None):
+    """
+    GST state code of a party: the GSTIN prefix when it has one,
+    otherwise its state name. None when neither says.
+    """
+    gstin = (gstin or "").strip().upper()
+
+    if GSTIN_PATTERN.match(gstin):
+        return gstin[:2]
+
+    name = normalize_state(state)
+
+    return STATE_CODES.get(name) or STATE_ALIASES.get(name)
+
+
+def place_of_supply(customer):
+    country = (getattr(customer, "country", None) or "").strip().lower()
+
+    if country not in HOME_COUNTRIES:
+        return OTHER_COUNTRY
+
+    return state_code(
+        getattr(customer, "state", None),
+        getattr(customer, "gstin", None)
+    )
+
+
+def is_inter_state(business, customer):
+    """
+    IGST applies when the supplier and the place of supply are in
+    different states, or the customer is abroad. Supplies whose place
+    of supply can't be told are treated as local (CGST + SGST).
+    """
+    supplier = state_code(business.state, business.tax_number)
+    recipient = place_of_supply(customer)
+
+    if not supplier or not recipient:
+        return False
+
+    return supplier != recipient
@@ -0,0 +1,53 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+# Browsers and CDNs may reuse a storefront response this long before
+# revalidating it with If-None-Match
+CATALOG_MAX_AGE = 60
+
+
+def catalog_etag(request, seed):
+    """
+    Strong ETag for one representation of a catalog resource: the
+    catalog version plus everything else the body depends on.
+    """
+    key = "|".join([
+        str(seed),
+        request.get_full_path(),
+        request.META.get("HTTP_ACCEPT", ""),
+    ])
+
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+def timestamp(value):
+    return int(value.timestamp()) if value else None
+
+
+def not_modified_response(request, etag, last_modified):
+    """A 304 if the request's validators still match, else None."""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=timestamp(last_modified)
+    )
+
+    if response is not None:
+        set_cache_headers(response, etag, last_modified)
+
+    return response
+
+
+def set_cache_headers(response, etag, last_modified):
+    response["ETag"] = etag
+
+    if last_modified:
+        response["Last-Modified"] = http_date(timestamp(last_modified))
+
+    response["Cache-Control"] = f"public, max-age={CATALOG_MAX_AGE}"
+    patch_vary_headers(response, ["Accept"])
+
+    return response
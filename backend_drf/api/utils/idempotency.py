@@ -0,0 +1,201 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+from api.models import IdempotencyKey
+
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Retries within this window get the first response replayed
+WINDOW = timedelta(hours=getattr(settings, "IDEMPOTENCY_WINDOW_HOURS", 24))
+
+# A request still marked in flight after this long is assumed to have
+# died with its worker; the next retry takes the key over
+IN_FLIGHT_TIMEOUT = timedelta(seconds=60)
+
+MAX_KEY_LENGTH = 255
+
+
+def request_scope(request):
+    """Keys are per caller: a customer and a user may reuse the same key."""
+    user = request.user
+    return f"{user._meta.model_name}:{user.pk}"
+
+
+def request_endpoint(request):
+    match = request.resolver_match
+    name = match.view_name if match else request.path
+    return f"{request.method} {name}"[:100]
+
+
+def request_fingerprint(request):
+    """
+    Hash of what the request asks for. A key reused for a different
+    body is a client bug and is refused rather than replayed.
+    """
+    data = request.data
+
+    if hasattr(data, "lists"):
+        data = {name: values for name, values in data.lists()}
+
+    def describe(value):
+        # Uploaded files by name and size; their bytes were already
+        # streamed to disk or memory by the parser
+        if hasattr(value, "read"):
+            return [getattr(value, "name", ""), getattr(value, "size", 0)]
+        return DjangoJSONEncoder().default(value)
+
+    payload = json.dumps(
+        [request.method, request.path, data],
+        sort_keys=True,
+        default=describe
+    )
+
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def error(message, status):
+    return Response({"error": message}, status=status)
+
+
+# ---------------------------------------------------------
+# Claiming a key
+# ---------------------------------------------------------
+
+def claim_key(scope, key, endpoint, fingerprint):
+    """
+    Marks the key in flight for this request. Returns (record, None)
+    when this request should run, or (None, response) when it must
+    not: a replay of the finished first request, or an error.
+    """
+    now = timezone.now()
+
+    try:
+        with transaction.atomic():
+            record = IdempotencyKey.objects.create(
+                scope=scope,
+                key=key,
+                endpoint=endpoint,
+                fingerprint=fingerprint,
+                created_at=now
+            )
+        return record, None
+
+    except IntegrityError:
+        pass
+
+    record = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+
+    if record is None:
+        # Deleted by a failed first attempt in the meantime
+        return claim_key(scope, key, endpoint, fingerprint)
+
+    if record.created_at < now - WINDOW:
+        return take_over(record, endpoint, fingerprint, now)
+
+    if record.endpoint != endpoint or record.fingerprint != fingerprint:
+        return None, error(
+            f"{HEADER} was already used for a different request.", 422
+        )
+
+    if record.status_code is not None:
+        response = Response(record.response_body, status=record.status_code)
+        response[REPLAYED_HEADER] = "true"
+        return None, response
+
+    if record.created_at < now - IN_FLIGHT_TIMEOUT:
+        return take_over(record, endpoint, fingerprint, now)
+
+    response = error("A request with this Idempotency-Key is in progress.", 409)
+    response["Retry-After"] = "1"
+    return None, response
+
+
+def take_over(record, endpoint, fingerprint, now):
+    """Reclaims an expired or abandoned key, unless another retry won."""
+    claimed = IdempotencyKey.objects.filter(
+        pk=record.pk,
+        created_at=record.created_at
+    ).update(
+        endpoint=endpoint,
+        fingerprint=fingerprint,
+        status_code=None,
+        response_body=None,
+        created_at=now
+    )
+
+    if not claimed:
+        response = error("A request with this Idempotency-Key is in progress.", 409)
+        response["Retry-After"] = "1"
+        return None, response
+
+    record.created_at = now
+    return record, None
+
+
+# ---------------------------------------------------------
+# View decorator
+# ---------------------------------------------------------
+
+def idempotent(view_method):
+    """
+    Makes an APIView handler safe to retry with an Idempotency-Key
+    header. The first request runs; duplicates within WINDOW get its
+    response replayed, or a 409 while it is still running. Requests
+    without the header behave exactly as before.
+
+    Server errors and exceptions free the key again so the retry runs.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER, "").strip()
+
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return error(f"{HEADER} is longer than {MAX_KEY_LENGTH} characters.", 400)
+
+        record, response = claim_key(
+            request_scope(request),
+            key,
+            request_endpoint(request),
+            request_fingerprint(request)
+        )
+
+        if response is not None:
+            return response
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            IdempotencyKey.objects.filter(pk=record.pk).delete()
+            raise
+
+        if response.status_code >= 500:
+            IdempotencyKey.objects.filter(pk=record.pk).delete()
+            return response
+
+        IdempotencyKey.objects.filter(pk=record.pk).update(
+            status_code=response.status_code,
+            response_body=response.data
+        )
+
+        return response
+
+    return wrapper
+
+
+def purge_expired_keys():
+    return IdempotencyKey.objects.filter(
+        created_at__lt=timezone.now() - WINDOW
+    ).delete()[0]
@@ -0,0 +1,39 @@
+import threading
+from functools import partial
+
+from django.db import transaction
+
+
+# Batches collecting changes for the transaction open on this thread,
+# by batch class. Django connections are per thread, so this is per
+# connection too.
+_pending = threading.local()
+
+
+def pending_batch(batch_class):
+    """
+    The `batch_class()` collecting changes until the transaction
+    commits, when it is called once. Call inside an atomic block.
+
+    Every call queues its own flush, and the first one to run takes the
+    batch. That way a rolled back savepoint, which drops the flushes
+    queued inside it, can't leave the batch without one; changes made
+    there are at worst refreshed needlessly, never missed.
+    """
+    batches = _pending.__dict__.setdefault("batches", {})
+    batch = batches.get(batch_class)
+
+    if batch is None:
+        batch = batches[batch_class] = batch_class()
+
+    transaction.on_commit(partial(flush, batch_class))
+
+    return batch
+
+
+def flush(batch_class):
+    # Taken off first, so changes the batch itself makes start a new one
+    batch = _pending.__dict__.get("batches", {}).pop(batch_class, None)
+
+    if batch is not None:
+        batch()
@@ -0,0 +1,233 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page numbers by default, exactly like the global PageNumberPagination.
+
+    ?pagination=cursor (or any ?cursor=) switches to keyset pagination on
+    the view's `keyset_ordering`, e.g. ("-created_at", "-id"): each page
+    continues strictly after the last row of the previous one, so it
+    costs one index range scan however deep it is, instead of OFFSET.
+
+    ?count=false drops the COUNT(*) in either mode.
+    """
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    count_query_param = "count"
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    ordering = ("-created_at", "-id")
+
+    # ---------------------------------------------------------
+    # Entry point
+    # ---------------------------------------------------------
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.with_count = (
+            request.query_params.get(self.count_query_param, "").lower()
+            not in ("0", "false", "no")
+        )
+        self.keyset = (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == "cursor"
+        )
+
+        if not self.keyset and self.with_count:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+
+        if not self.page_size:
+            return None
+
+        self.count = queryset.count() if self.with_count else None
+
+        if self.keyset:
+            self.ordering = tuple(getattr(view, "keyset_ordering", self.ordering))
+            return self.paginate_keyset(queryset, request)
+
+        return self.paginate_uncounted(queryset, request)
+
+    def get_paginated_response(self, data):
+        if not self.keyset and self.with_count:
+            return super().get_paginated_response(data)
+
+        body = {}
+
+        if self.with_count:
+            body["count"] = self.count
+
+        body["next"] = self.next_link
+        body["previous"] = self.previous_link
+        body["results"] = data
+
+        return Response(body)
+
+    # ---------------------------------------------------------
+    # Page numbers without COUNT(*)
+    # ---------------------------------------------------------
+
+    def paginate_uncounted(self, queryset, request):
+        try:
+            page = int(request.query_params.get(self.page_query_param, 1))
+        except (TypeError, ValueError):
+            page = 0
+
+        if page < 1:
+            raise NotFound("Invalid page.")
+
+        offset = (page - 1) * self.page_size
+
+        # One extra row tells whether a next page exists
+        rows = list(queryset[offset:offset + self.page_size + 1])
+        has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        url = request.build_absolute_uri()
+
+        self.next_link = (
+            replace_query_param(url, self.page_query_param, page + 1)
+            if has_next else None
+        )
+
+        if page == 1:
+            self.previous_link = None
+        elif page == 2:
+            self.previous_link = remove_query_param(url, self.page_query_param)
+        else:
+            self.previous_link = replace_query_param(
+                url, self.page_query_param, page - 1
+            )
+
+        return rows
+
+    # ---------------------------------------------------------
+    # Keyset
+    # ---------------------------------------------------------
+
+    def paginate_keyset(self, queryset, request):
+        position, backwards = self.decode_cursor(
+            request.query_params.get(self.cursor_query_param)
+        )
+
+        ordering = self.ordering
+
+        if backwards:
+            ordering = tuple(self.flip(field) for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.after(ordering, position))
+            except (TypeError, ValueError, DjangoValidationError):
+                raise NotFound("Invalid cursor.")
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if backwards:
+            rows.reverse()
+
+        url = request.build_absolute_uri()
+        first = self.position_of(rows[0]) if rows else None
+        last = self.position_of(rows[-1]) if rows else None
+
+        if backwards:
+            self.next_link = self.encode_cursor(url, last, False) if rows else None
+            self.previous_link = (
+                self.encode_cursor(url, first, True) if has_more else None
+            )
+        else:
+            self.next_link = (
+                self.encode_cursor(url, last, False) if has_more else None
+            )
+            self.previous_link = (
+                self.encode_cursor(url, first, True)
+                if rows and position is not None else None
+            )
+
+        return rows
+
+    @staticmethod
+    def flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def after(self, ordering, position):
+        """
+        Rows strictly after `position` in `ordering`:
+        a < x OR (a = x AND b < y) for ("-a", "-b").
+
+        The leading a <= x is implied by the OR, but lets the planner turn
+        it into an index range scan.
+        """
+        fields = [field.lstrip("-") for field in ordering]
+        lookups = [
+            "lt" if field.startswith("-") else "gt"
+            for field in ordering
+        ]
+
+        condition = Q()
+
+        for i, field in enumerate(fields):
+            branch = Q(**{f"{field}__{lookups[i]}": position[i]})
+
+            for prev in range(i):
+                branch &= Q(**{fields[prev]: position[prev]})
+
+            condition |= branch
+
+        bound = "lte" if lookups[0] == "lt" else "gte"
+
+        return Q(**{f"{fields[0]}__{bound}": position[0]}) & condition
+
+    def position_of(self, row):
+        values = []
+
+        for field in self.ordering:
+            value = getattr(row, field.lstrip("-"))
+
+            if hasattr(value, "isoformat"):
+                value = value.isoformat()
+
+            values.append(value)
+
+        return values
+
+    def encode_cursor(self, url, position, backwards):
+        payload = json.dumps({"p": position, "r": backwards})
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+
+        url = remove_query_param(url, self.page_query_param)
+        url = remove_query_param(url, self.mode_query_param)
+
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, token):
+        if not token:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            position = payload["p"]
+            backwards = bool(payload.get("r"))
+
+        except (TypeError, ValueError, KeyError):
+            raise NotFound("Invalid cursor.")
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound("Invalid cursor.")
+
+        return position, backwards
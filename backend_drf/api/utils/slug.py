@@ -0,0 +1,115 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, BigIntegerField
+from django.db.models.functions import Cast, Substr
+
+from api.models import SlugSequence
+
+
+# Allocation races are settled by the unique constraint on the slug
+# column; a loser simply takes the next suffix.
+MAX_ATTEMPTS = 5
+
+
+def highest_suffix(queryset, base_slug, field="slug"):
+    """
+    Largest N among `base_slug` / `base_slug-N` already in the table,
+    in a single aggregate query. -1 when the base is still unused.
+
+    Only needed the first time a base slug is seen; after that the
+    SlugSequence row carries the counter.
+    """
+    # Slugs are [-a-zA-Z0-9_] so the base needs no regex escaping
+    taken = queryset.filter(**{
+        f"{field}__regex": rf"^{base_slug}-[0-9]+$"
+    }).aggregate(
+        suffix=Max(
+            Cast(Substr(field, len(base_slug) + 2), BigIntegerField())
+        )
+    )["suffix"]
+
+    if taken is not None:
+        return taken
+
+    if queryset.filter(**{field: base_slug}).exists():
+        return 0
+
+    return -1
+
+
+def with_suffix(base_slug, suffix, max_length):
+    if suffix <= 0:
+        return base_slug[:max_length]
+
+    tail = f"-{suffix}"
+    return f"{base_slug[:max_length - len(tail)]}{tail}"
+
+
+def allocate_slug(scope, base_slug, queryset, field="slug", max_length=50):
+    """
+    Next free slug for `base_slug` within `scope` ("business",
+    "item:<business_id>", ...). One UPDATE ... SET last_suffix + 1 on
+    the counter row, no matter how many duplicates already exist.
+    """
+    sequence = SlugSequence.objects.filter(
+        scope=scope,
+        base_slug=base_slug
+    )
+
+    with transaction.atomic():
+        if sequence.update(last_suffix=F("last_suffix") + 1):
+            suffix = sequence.values_list("last_suffix", flat=True).get()
+            return with_suffix(base_slug, suffix, max_length)
+
+        suffix = highest_suffix(queryset, base_slug, field) + 1
+
+        try:
+            with transaction.atomic():
+                SlugSequence.objects.create(
+                    scope=scope,
+                    base_slug=base_slug,
+                    last_suffix=suffix
+                )
+        except IntegrityError:
+            # Another request seeded the counter first, use it
+            sequence.update(last_suffix=F("last_suffix") + 1)
+            suffix = sequence.values_list("last_suffix", flat=True).get()
+
+    return with_suffix(base_slug, suffix, max_length)
+
+
+def slug_taken(instance, queryset, field):
+    """
+    Whether another row holds the instance's slug, i.e. whether an
+    IntegrityError came from the slug constraint. Asked of the table
+    rather than parsed from the error, which every backend words
+    differently; the conflicting row has committed by the time the
+    insert fails.
+    """
+    return queryset.filter(
+        **{field: getattr(instance, field)}
+    ).exclude(pk=instance.pk).exists()
+
+
+def save_with_unique_slug(instance, save, scope, base_slug, queryset, field="slug"):
+    """
+    Assigns a slug and runs `save`, retrying with the next suffix if the
+    unique constraint rejects it (a concurrent insert, or a hand-made
+    slug the counter did not know about). Any other integrity error,
+    a duplicate barcode say, is raised straight away.
+    """
+    max_length = instance._meta.get_field(field).max_length
+
+    for attempt in range(MAX_ATTEMPTS):
+        setattr(
+            instance,
+            field,
+            allocate_slug(scope, base_slug, queryset, field, max_length)
+        )
+
+        try:
+            with transaction.atomic():
+                return save()
+
+        except IntegrityError:
+            if attempt == MAX_ATTEMPTS - 1 or not slug_taken(instance, queryset, field):
+                raise
@@ -0,0 +1,179 @@
+from decimal import Context, Decimal, ROUND_HALF_EVEN, ROUND_HALF_UP, localcontext
+
+
+# All tax math runs in this context instead of the thread's current
+# one. Same precision and rounding as Python's default context, so
+# intermediate results match the old per-line calculator digit for
+# digit; amounts are then rounded half-up to the paisa.
+CONTEXT = Context(prec=28, rounding=ROUND_HALF_EVEN)
+
+ZERO = Decimal("0")
+ONE = Decimal("1")
+HUNDRED = Decimal("100")
+PAISA = Decimal("0.01")
+
+# Component columns of a line, and of a document as total_<component>
+GST_COMPONENTS = ("cgst", "sgst", "igst", "cess")
+
+NO_SPLIT = {f"{name}_amount": ZERO.quantize(PAISA) for name in GST_COMPONENTS}
+
+
+def to_decimal(value):
+    if isinstance(value, Decimal):
+        return value
+
+    if isinstance(value, int):
+        return Decimal(value)
+
+    # Floats and strings go through str() like the old calculator, so
+    # 0.1 becomes Decimal("0.1") rather than its binary expansion
+    return Decimal(str(value))
+
+
+def money(value):
+    return value.quantize(PAISA, rounding=ROUND_HALF_UP)
+
+
+def line_amounts(price, qty, discount_percent, tax_percent, includes_tax,
+                 cess_percent=0, gst=False, inter_state=False):
+    # Runs inside localcontext(CONTEXT), so plain operators use it
+    price = to_decimal(price)
+    qty = to_decimal(qty)
+    discount_percent = to_decimal(discount_percent or 0)
+    tax_percent = to_decimal(tax_percent or 0)
+
+    # Compensation cess only exists under GST
+    cess_percent = to_decimal(cess_percent) if gst and cess_percent else ZERO
+
+    line_price = price * qty
+    discount = line_price * discount_percent / HUNDRED
+
+    if includes_tax:
+        after_discount = line_price - discount
+        taxable_amount = after_discount / (
+            ONE + (tax_percent + cess_percent) / HUNDRED
+        )
+        tax_amount = after_discount - taxable_amount
+        cess_amount = taxable_amount * cess_percent / HUNDRED if cess_percent else ZERO
+
+        # Base and taxable are the same amount when tax is included
+        taxable_amount = money(taxable_amount)
+
+        values = {
+            "base_amount": taxable_amount,
+            "discount_amount": money(discount),
+            "taxable_amount": taxable_amount,
+            "tax_amount": money(tax_amount),
+            "total_value": money(after_discount),
+        }
+    else:
+        taxable_amount = line_price - discount
+        cess_amount = taxable_amount * cess_percent / HUNDRED if cess_percent else ZERO
+        tax_amount = taxable_amount * tax_percent / HUNDRED + cess_amount
+
+        values = {
+            "base_amount": money(line_price),
+            "discount_amount": money(discount),
+            "taxable_amount": money(taxable_amount),
+            "tax_amount": money(tax_amount),
+            "total_value": money(taxable_amount + tax_amount),
+        }
+
+    if gst:
+        values.update(split_tax(values["tax_amount"], money(cess_amount), inter_state))
+    else:
+        values.update(NO_SPLIT)
+
+    return values
+
+
+def split_tax(tax_amount, cess_amount, inter_state):
+    """
+    GST components of a rounded tax amount. They always add up to it
+    exactly: CGST takes the rounded half, SGST the rest.
+    """
+    # Differences of paisa amounts stay in paisa
+    gst_amount = tax_amount - cess_amount
+
+    if inter_state:
+        return dict(NO_SPLIT, igst_amount=gst_amount, cess_amount=cess_amount)
+
+    cgst = money(gst_amount / 2)
+
+    return dict(
+        NO_SPLIT,
+        cgst_amount=cgst,
+        sgst_amount=gst_amount - cgst,
+        cess_amount=cess_amount
+    )
+
+
+def compute_line(price, qty, discount_percent, tax_percent, includes_tax):
+    """
+    Amounts of one line. `includes_tax` means `price` is tax inclusive:
+    the discount comes off the gross and tax is backed out of the rest.
+    """
+    with localcontext(CONTEXT):
+        return line_amounts(price, qty, discount_percent, tax_percent, includes_tax)
+
+
+def compute_lines(lines, includes_tax, tax_type=None, inter_state=False):
+    """
+    Amounts of a whole cart / order / invoice in one pass.
+
+    `lines` are (price, qty, discount_percent, tax_percent) tuples,
+    optionally followed by a cess percent. Returns the per-line amounts
+    under "lines", in input order, plus the document totals named like
+    the Order / Invoice columns: total_base_amount, discount_amount,
+    total_taxable_amount, total_tax, total_value, round_off to a
+    whole-rupee net_payable, and total_cgst / sgst / igst / cess.
+
+    GST documents (tax_type "GST") split each line's tax into CGST +
+    SGST, or IGST when `inter_state`; see api.utils.gst.is_inter_state.
+    """
+    gst = tax_type == "GST"
+
+    results = []
+    base = discount = taxable = tax = total = ZERO
+    components = dict.fromkeys(GST_COMPONENTS, ZERO)
+
+    with localcontext(CONTEXT):
+        for price, qty, discount_percent, tax_percent, *cess in lines:
+            values = line_amounts(
+                price, qty, discount_percent, tax_percent, includes_tax,
+                cess_percent=cess[0] if cess else 0,
+                gst=gst,
+                inter_state=inter_state
+            )
+            results.append(values)
+
+            # Sums of paisa amounts are exact, no rounding needed
+            base += values["base_amount"]
+            discount += values["discount_amount"]
+            taxable += values["taxable_amount"]
+            tax += values["tax_amount"]
+            total += values["total_value"]
+
+            if gst:
+                for name in GST_COMPONENTS:
+                    components[name] += values[f"{name}_amount"]
+
+        net_payable = total.quantize(ONE, rounding=ROUND_HALF_UP)
+
+        document = {
+            "lines": results,
+            "tax_type": tax_type,
+            "is_inter_state": gst and inter_state,
+            "total_base_amount": money(base),
+            "discount_amount": money(discount),
+            "total_taxable_amount": money(taxable),
+            "total_tax": money(tax),
+            "total_value": money(total),
+            "round_off": money(net_payable - total),
+            "net_payable": net_payable,
+        }
+
+        for name in GST_COMPONENTS:
+            document[f"total_{name}"] = money(components[name])
+
+        return document
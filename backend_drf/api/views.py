@@ -17,89 +17,165 @@ from django.contrib.auth.hashers import check_password
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.response import Response
 from django.contrib.auth.models import update_last_login
+from django.conf import settings
+from django.utils import timezone
+from datetime import date, timedelta
+from analytics.rollups import business_totals, daily_revenue
 from products.serializers import ProductSerializer
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from api.authentication import CustomerJWTAuthentication
 
 
-class CustomerJWTAuthentication(JWTAuthentication):
-    def get_user(self, validated_token):
-        # 🔒 Ensure this is a CUSTOMER token
-        if validated_token.get('type') != 'customer':
-            raise exceptions.AuthenticationFailed('Invalid token type')
+from django.db.models import Count, Max, Prefetch, Sum
+from products.catalog import ensure_catalog
+from products.models import BusinessCatalog, ItemSnapshot
+from products.serializers import product_business_fields
+from api.utils.http_cache import catalog_etag, not_modified_response, set_cache_headers
+from api.utils.envelope import envelope, wants_envelope
 
-        customer_id = validated_token.get('customer_id')
-        business_id = validated_token.get('business_id')
 
-        if not customer_id or not business_id:
-            raise exceptions.AuthenticationFailed('Invalid token payload')
+class CatalogCacheMixin:
+    """
+    Sends ETag / Last-Modified / Cache-Control derived from the catalog
+    version, and answers a conditional GET that still matches with 304
+    before any item query runs.
+    """
 
-        try:
-            return Customer.objects.get(
-                id=customer_id,
-                business_id=business_id
-            )
-        except Customer.DoesNotExist:
-            raise exceptions.AuthenticationFailed('No such customer')
+    def get_catalog_validators(self):
+        """(ETag seed, last modified) or None to skip HTTP caching."""
+        row = BusinessCatalog.objects.filter(
+            business__slug=self.kwargs.get("business_slug"),
+            built_at__isnull=False
+        ).values_list("business_id", "version", "updated_at").first()
 
+        if row is None:
+            return None
 
-from django.db.models import Prefetch
+        business_id, version, updated_at = row
+        return f"{business_id}:{version}", updated_at
 
-class ItemListView(generics.ListAPIView):
-    serializer_class = ProductSerializer
-    permission_classes = [AllowAny]
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
 
-    def get_queryset(self):
-        business_slug = self.kwargs.get("business_slug")
+        self.kwargs = kwargs
+        validators = self.get_catalog_validators()
 
-        return (
-            Item.objects
-            .filter(
-                business__slug=business_slug,
-                isShow=True
-            )
-            .select_related("business")
-            .prefetch_related(
-                Prefetch(
-                    "variants",
-                    queryset=ItemVariant.objects.prefetch_related(
-                        "attributes",
-                        "images"
-                    )
-                )
-            )
-            .order_by("-created_date")
+        if validators is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        seed, last_modified = validators
+        etag = catalog_etag(request, seed)
+
+        response = not_modified_response(request, etag, last_modified)
+
+        if response is not None:
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+
+        if response.status_code == 200:
+            set_cache_headers(response, etag, last_modified)
+
+        return response
+
+
+class CatalogSnapshotMixin:
+    """
+    Serves storefront items from their precomputed ItemSnapshot rows.
+    The business part of each item is serialized once per request and
+    merged in, so response time no longer grows with the nesting.
+    """
+
+    def get_business(self):
+        if not hasattr(self, "_business"):
+            self._business = BusinessEntity.objects.filter(
+                slug=self.kwargs.get("business_slug")
+            ).first()
+
+            if self._business:
+                self.catalog = ensure_catalog(self._business)
+
+        return self._business
+
+    def get_snapshots(self, **filters):
+        business = self.get_business()
+
+        if not business:
+            return ItemSnapshot.objects.none()
+
+        return ItemSnapshot.objects.filter(
+            business=business,
+            is_visible=True,
+            **filters
         )
-    
 
+    def render_snapshots(self, payloads):
+        payloads = list(payloads)
+
+        if not payloads:
+            return []
+
+        business_fields = product_business_fields(self.get_business())
+
+        return [
+            {**payload, **business_fields}
+            for payload in payloads
+        ]
+
+    def render_envelope_rows(self, payloads):
+        business = self.get_business()
 
-class BaseItemListView(generics.ListAPIView):
+        return [
+            {"business_id": business.id, **payload}
+            for payload in payloads
+        ]
+
+
+class SnapshotListView(CatalogCacheMixin, CatalogSnapshotMixin, generics.ListAPIView):
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
     item_type = None
+    ordering = ["item_id"]
 
     def get_queryset(self):
-        business_slug = self.kwargs.get("business_slug")
+        filters = {}
+
+        if self.item_type:
+            filters["item_type"] = self.item_type
 
         return (
-            Item.objects
-            .filter(
-                business__slug=business_slug,
-                isShow=True,
-                item_type=self.item_type
-            )
-            .select_related("business")
-            .prefetch_related(
-                Prefetch(
-                    "variants",
-                    queryset=ItemVariant.objects.prefetch_related(
-                        "attributes",
-                        "images"
-                    )
-                )
-            )
-            .order_by("id")
+            self.get_snapshots(**filters)
+            .order_by(*self.ordering)
+            .values_list("payload", flat=True)
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+
+        if wants_envelope(request):
+            rows = self.render_envelope_rows(queryset if page is None else page)
+        else:
+            rows = self.render_snapshots(queryset if page is None else page)
+
+        response = (
+            Response(rows) if page is None
+            else self.get_paginated_response(rows)
         )
 
+        if wants_envelope(request) and self.get_business():
+            response.data = envelope(response.data, self.get_business())
+
+        return response
+
+
+class ItemListView(SnapshotListView):
+    ordering = ["-created_date", "-item_id"]
+
+
+class BaseItemListView(SnapshotListView):
+    item_type = None
+
 
 class GoodsItemListView(BaseItemListView):
     item_type = 'Goods'
@@ -112,65 +188,53 @@ class ServiceItemListView(BaseItemListView):
 
 from django.db.models import Min, Max
 
-class ItemSummaryBySlugView(APIView):
+class ItemSummaryBySlugView(CatalogCacheMixin, CatalogSnapshotMixin, APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, business_slug):
-        items = (
-            Item.objects
-            .filter(
-                business__slug=business_slug,
-                isShow=True
-            )
-            .select_related("business")
-            .prefetch_related(
-                Prefetch(
-                    "variants",
-                    queryset=ItemVariant.objects.prefetch_related(
-                        "attributes",
-                        "images"
-                    )
-                )
-            )
-        )
-
-        # Categories in order of FIRST appearance
-        categories = (
-            items.values("category")
-            .annotate(
-                first_id=Min("id"),
-                category_image_url=Max("category_image_url")
-            )
-            .order_by("first_id")
-        )
+        if not self.get_business():
+            return Response({
+                "categories": [],
+                "best_selling": [],
+                "trending": [],
+            })
 
-        best_selling = items.filter(
+        best_selling = self.get_snapshots(
             best_selling=True
-        ).order_by("id")
+        ).order_by("item_id").values_list("payload", flat=True)
 
-        trending = items.filter(
+        trending = self.get_snapshots(
             trending=True
-        ).order_by("id")
+        ).order_by("item_id").values_list("payload", flat=True)
 
         return Response({
-            "categories": [
-                {
-                    "category": c["category"],
-                    "category_image_url": c["category_image_url"]
-                }
-                for c in categories
-            ],
-            "best_selling": ProductSerializer(best_selling, many=True).data,
-            "trending": ProductSerializer(trending, many=True).data,
+            # Categories in order of FIRST appearance
+            "categories": self.catalog.categories,
+            "best_selling": self.render_snapshots(best_selling),
+            "trending": self.render_snapshots(trending),
         })
 
 
 
 
-class ItemAllListView(generics.ListAPIView):
+class ItemAllListView(CatalogCacheMixin, generics.ListAPIView):
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
 
+    def get_catalog_validators(self):
+        # Every business has a catalog row, so this covers all items
+        totals = BusinessCatalog.objects.aggregate(
+            businesses=Count("business"),
+            versions=Sum("version"),
+            updated_at=Max("updated_at")
+        )
+
+        if not totals["businesses"]:
+            return None
+
+        seed = f"{totals['businesses']}:{totals['versions']}:{totals['updated_at']}"
+        return seed, totals["updated_at"]
+
     queryset = (
         Item.objects
         .select_related("business")
@@ -186,33 +250,19 @@ class ItemAllListView(generics.ListAPIView):
     )
 
 
-class ItemDetailBySlugView(generics.RetrieveAPIView):
+class ItemDetailBySlugView(CatalogCacheMixin, CatalogSnapshotMixin, generics.RetrieveAPIView):
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
 
-    lookup_field = "slug"
-    lookup_url_kwarg = "item_slug"
+    def retrieve(self, request, *args, **kwargs):
+        payload = self.get_snapshots(
+            slug=self.kwargs.get("item_slug")
+        ).values_list("payload", flat=True).first()
 
-    def get_queryset(self):
-        business_slug = self.kwargs.get("business_slug")
+        if payload is None:
+            raise exceptions.NotFound("No Item matches the given query.")
 
-        return (
-            Item.objects
-            .filter(
-                business__slug=business_slug,
-                isShow=True
-            )
-            .select_related("business")
-            .prefetch_related(
-                Prefetch(
-                    "variants",
-                    queryset=ItemVariant.objects.prefetch_related(
-                        "attributes",
-                        "images"
-                    )
-                )
-            )
-        )
+        return Response(self.render_snapshots([payload])[0])
 
 
 # class ItemDetailView(generics.RetrieveAPIView):
@@ -238,12 +288,25 @@ class AppRunView(APIView):
             }, status=200)
 
 
+# Dashboard loads refresh last_login at most this often
+LAST_LOGIN_INTERVAL = timedelta(
+    minutes=getattr(settings, "LAST_LOGIN_UPDATE_MINUTES", 15)
+)
+
+
+def touch_last_login(user):
+    if user.last_login and user.last_login > timezone.now() - LAST_LOGIN_INTERVAL:
+        return
+
+    update_last_login(None, user)
+
+
 class DashboardView(APIView):
     permission_classes = [IsAuthenticated, IsUserOrAdmin]
 
     def get(self, request):
         user = request.user
-        update_last_login(None, user)
+        touch_last_login(user)
 
         # -------- ADMIN DASHBOARD --------
         if user.is_superuser:
@@ -271,38 +334,39 @@ class DashboardView(APIView):
             }, status=200)
 
         # Ensure active business exists
-        if not user.active_business:
-            user.active_business = businesses.first()
+        if not request.business:
+            user.active_business = request.business = businesses.first()
             user.save()
 
-        active_business = user.active_business
+        active_business = request.business
 
-        # Fetch business-specific stats
-        from django.db.models import Sum
-        from decimal import Decimal
+        # Business-specific stats, from the daily rollups
+        totals = business_totals(active_business.id)
 
+        total_revenue = totals["invoice_revenue"] + totals["order_revenue"]
 
-        invoice_taxable = Invoice.objects.filter(
-            business=active_business,
-            status="Paid"
-        ).aggregate(
-            total=Sum("total_taxable_amount")
-        )["total"] or Decimal("0.00")
+        dashboard = {
+            "total_customers": totals["customers"],
+            "total_products": totals["products"],
+            "total_orders": totals["orders"],
+            "total_invoices": totals["invoices"],
+            "total_revenue": total_revenue
+        }
 
+        # Optional revenue chart: ?from=YYYY-MM-DD&to=YYYY-MM-DD
+        date_from = request.query_params.get("from")
+        date_to = request.query_params.get("to")
 
-        order_taxable = Order.objects.filter(
-            business=active_business,
-            payments__status="Success"
-        ).distinct().aggregate(
-            total=Sum("total_taxable_amount")
-        )["total"] or Decimal("0.00")
+        if date_from or date_to:
+            try:
+                date_to = date.fromisoformat(date_to) if date_to else date.today()
+                date_from = date.fromisoformat(date_from) if date_from else date_to - timedelta(days=29)
+            except ValueError:
+                return Response({"error": "Dates must be YYYY-MM-DD."}, status=400)
 
-        total_revenue = invoice_taxable + order_taxable
-
-        total_customers = Customer.objects.filter(business=active_business).count()
-        total_products = Item.objects.filter(business=active_business).count()
-        total_orders = Order.objects.filter(business=active_business).count()
-        total_invoices = Invoice.objects.filter(business=active_business).count()
+            dashboard["revenue_by_day"] = daily_revenue(
+                active_business.id, date_from, date_to
+            )
 
         return Response({
             "message": f"Welcome, {user.name}!",
@@ -312,13 +376,7 @@ class DashboardView(APIView):
             "businesses": BusinessEntitySerializer(businesses, many=True).data,
             "active_business": BusinessEntitySerializer(active_business).data,
 
-            "dashboard": {
-                "total_customers": total_customers,
-                "total_products": total_products,
-                "total_orders": total_orders,
-                "total_invoices": total_invoices,
-                "total_revenue": total_revenue
-            }
+            "dashboard": dashboard
         }, status=200)
 
 
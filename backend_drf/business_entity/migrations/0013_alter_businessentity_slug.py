@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:25
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def resuffix_slugs(apps, schema_editor):
+    """
+    Gives every business after the first holding a slug, and every
+    business with an empty one, the next free `base-N`, so the unique
+    constraint below can be created. NULL slugs are left alone; the
+    model allocates one on the next save.
+    """
+    BusinessEntity = apps.get_model("business_entity", "BusinessEntity")
+
+    rows = BusinessEntity.objects.order_by("id").values_list(
+        "id", "slug", "business_name"
+    )
+
+    taken = set(
+        BusinessEntity.objects.exclude(slug__isnull=True).exclude(slug="")
+        .values_list("slug", flat=True).distinct()
+    )
+    seen = set()
+    next_suffix = {}
+    changed = []
+
+    for pk, slug, business_name in rows:
+        if slug is None:
+            continue
+
+        if slug and slug not in seen:
+            seen.add(slug)
+            continue
+
+        # An empty slug gets the bare base if nobody holds it yet
+        base = slug or slugify(business_name)[:45] or "business"
+        suffix = next_suffix.get(base, 1 if slug else 0)
+
+        while True:
+            tail = f"-{suffix}" if suffix else ""
+            candidate = f"{base[:50 - len(tail)]}{tail}"
+            suffix += 1
+
+            if candidate not in taken:
+                break
+
+        next_suffix[base] = suffix
+        taken.add(candidate)
+        seen.add(candidate)
+        changed.append(BusinessEntity(id=pk, slug=candidate))
+
+    BusinessEntity.objects.bulk_update(changed, ["slug"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business_entity', '0012_alter_businessentity_is_active'),
+    ]
+
+    operations = [
+        migrations.RunPython(resuffix_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='businessentity',
+            name='slug',
+            field=models.SlugField(blank=True, null=True, unique=True),
+        ),
+    ]
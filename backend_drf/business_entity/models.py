@@ -1,5 +1,8 @@
+from functools import partial
 from django.db import models
 from django.conf import settings
+from django.utils.text import slugify
+from api.utils.slug import save_with_unique_slug
 
 class BusinessEntity(models.Model):
     CURRENCY_CHOICES = [
@@ -54,7 +57,7 @@ class BusinessEntity(models.Model):
     kyc_pan_id = models.CharField(max_length=20, blank=True, null=True)
     kyc_bucket_url = models.CharField(blank=True, null=True)
 
-    slug = models.SlugField(null=True, blank=True, db_index=True)
+    slug = models.SlugField(null=True, blank=True, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=False)
 
@@ -66,4 +69,16 @@ class BusinessEntity(models.Model):
     )
 
     def __str__(self):
-        return self.business_name
\ No newline at end of file
+        return self.business_name
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            return save_with_unique_slug(
+                self,
+                partial(super().save, *args, **kwargs),
+                scope="business",
+                base_slug=slugify(self.business_name)[:45] or "business",
+                queryset=BusinessEntity.objects.all(),
+            )
+
+        super().save(*args, **kwargs)
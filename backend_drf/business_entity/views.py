@@ -22,18 +22,6 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from django.shortcuts import get_object_or_404
 
 
-def generate_unique_slug(name):
-    base_slug = slugify(name)[:45]
-    slug = base_slug
-    counter = 1
-
-    while BusinessEntity.objects.filter(slug=slug).exists():
-        slug = f"{base_slug}-{counter}"
-        counter += 1
-
-    return slug
-
-
 # class BusinessSetupView(APIView):
 #     permission_classes = [IsAuthenticated]
 #     parser_classes = (MultiPartParser, FormParser)
@@ -162,7 +150,7 @@ class BusinessSetupView(APIView):
         if not active_biz:
             first_approved = user_businesses.filter(is_active=True).first()
             if first_approved:
-                user.active_business = first_approved
+                user.active_business = request.business = first_approved
                 user.save(update_fields=['active_business'])
                 active_biz = first_approved
 
@@ -192,8 +180,8 @@ class BusinessSetupView(APIView):
             return Response({"error": "business_name is required"}, status=400)
 
         # ---------- Generate SLUG ----------
-        # Logic updated to use the new function and key
-        data["slug"] = generate_unique_slug(data["business_name"])
+        # Allocated by BusinessEntity.save() from business_name
+        data.pop("slug", None)
 
         
         # ---------- File Upload Handling ----------
@@ -227,7 +215,7 @@ class BusinessSetupView(APIView):
 
             # Set as active business if the user doesn't have one selected yet
             if user.active_business is None:
-                user.active_business = business
+                user.active_business = request.business = business
                 user.save()
 
             return Response({
@@ -340,7 +328,7 @@ class SwitchBusinessView(APIView):
         if not business.is_active:
             return Response({"error": "This business is pending admin approval."}, status=403)
 
-        request.user.active_business = business
+        request.user.active_business = request.business = business
         request.user.save()
 
         return Response({
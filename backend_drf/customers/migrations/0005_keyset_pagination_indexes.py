@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business_entity', '0013_alter_businessentity_slug'),
+        ('customers', '0004_alter_customer_email_alter_customer_gstin_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['business', 'date', 'id'], name='customers_c_busines_b04e55_idx'),
+        ),
+    ]
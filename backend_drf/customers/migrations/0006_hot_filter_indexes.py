@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business_entity', '0013_alter_businessentity_slug'),
+        ('customers', '0005_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['business', 'name'], name='customer_name_idx'),
+        ),
+    ]
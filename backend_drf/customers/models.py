@@ -54,6 +54,13 @@ class Customer(models.Model):
             ('business', 'phone'),
         )
 
+        indexes = [
+            # Keyset pagination of the customer list
+            models.Index(fields=["business", "date", "id"]),
+            # Customer lookup by name on invoice creation
+            models.Index(fields=["business", "name"], name="customer_name_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         if self.email:
             self.email = self.email.lower()
@@ -17,9 +17,8 @@ class CustomerSerializer(serializers.ModelSerializer):
         if not request or not hasattr(request, 'user'):
             return data
 
-        # 2. Extract the active business
-        # Adjust this depending on how you've set up your User model to link to a Business
-        business = getattr(request.user, 'active_business', None)
+        # 2. Extract the active business, resolved during authentication
+        business = getattr(request, 'business', None)
         
         if not business:
             raise serializers.ValidationError({"business": ["Active business context is missing."]})
@@ -1,4 +1,5 @@
-from api.views import CustomerJWTAuthentication
+from api.authentication import CustomerJWTAuthentication
+from api.utils.pagination import KeysetPagination
 from business_entity.models import BusinessEntity
 from rest_framework import generics, serializers, status
 from .models import  Customer
@@ -13,22 +14,24 @@ from rest_framework.views import APIView
 class CustomerListCreateView(generics.ListCreateAPIView):
     serializer_class = CustomerSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-date", "-id")
 
     def get_queryset(self):
-        user = self.request.user
+        business = self.request.business
 
-        if not user.active_business:
+        if not business:
             raise serializers.ValidationError("Please select an active business first.")
 
-        return Customer.objects.filter(business=user.active_business)
+        return Customer.objects.filter(business=business)
 
     def perform_create(self, serializer):
-        user = self.request.user
+        business = self.request.business
 
-        if not user.active_business:
+        if not business:
             raise serializers.ValidationError("Please select an active business first.")
 
-        serializer.save(business=user.active_business)
+        serializer.save(business=business)
 
 
 class CustomerDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -36,12 +39,12 @@ class CustomerDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
+        business = self.request.business
 
-        if not user.active_business:
+        if not business:
             raise serializers.ValidationError("Please select an active business first.")
 
-        return Customer.objects.filter(business=user.active_business)
+        return Customer.objects.filter(business=business)
 
 
 class CustomerSignupView(generics.CreateAPIView):
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business_entity', '0013_alter_businessentity_slug'),
+        ('customers', '0005_keyset_pagination_indexes'),
+        ('invoice', '0004_invoiceitem_item_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['business', 'date', 'id'], name='invoice_inv_busines_517896_idx'),
+        ),
+    ]
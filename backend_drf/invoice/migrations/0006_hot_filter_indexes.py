@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business_entity', '0013_alter_businessentity_slug'),
+        ('customers', '0006_hot_filter_indexes'),
+        ('invoice', '0005_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['business', 'status'], include=('total_taxable_amount',), name='invoice_status_idx'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:59
+
+from django.db import migrations, models
+
+
+def split_existing(apps, schema_editor):
+    # Frozen copy, so later changes to the live GST helpers don't change this
+    from api.migration_helpers.gst_components import split_existing
+
+    split_existing(
+        apps.get_model("invoice", "Invoice"),
+        apps.get_model("invoice", "InvoiceItem"),
+        "invoice"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoice', '0006_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='is_inter_state',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='place_of_supply',
+            field=models.CharField(blank=True, default='', max_length=2),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='total_cess',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='total_cgst',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='total_igst',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='total_sgst',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='invoiceitem',
+            name='cess_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='invoiceitem',
+            name='cess_percent',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.AddField(
+            model_name='invoiceitem',
+            name='cgst_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='invoiceitem',
+            name='igst_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='invoiceitem',
+            name='sgst_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(split_existing, migrations.RunPython.noop),
+    ]
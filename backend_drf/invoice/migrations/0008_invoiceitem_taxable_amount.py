@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+def backfill_taxable_amount(apps, schema_editor):
+    InvoiceItem = apps.get_model("invoice", "InvoiceItem")
+
+    # Value of the line before tax, as the engine computed it
+    InvoiceItem.objects.update(
+        taxable_amount=models.F("total_value") - models.F("tax_amount")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoice', '0007_gst_components'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoiceitem',
+            name='taxable_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_taxable_amount, migrations.RunPython.noop),
+    ]
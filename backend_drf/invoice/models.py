@@ -26,10 +26,33 @@ class Invoice(models.Model):
     round_off = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     net_payable = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
+    # GST split of total_tax; IGST for inter-state supplies, else CGST + SGST
+    place_of_supply = models.CharField(max_length=2, blank=True, default="")
+    is_inter_state = models.BooleanField(default=False)
+    total_cgst = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_sgst = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_igst = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_cess = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
     payment_mode = models.CharField(max_length=20, default="UPI")
     status = models.CharField(max_length=10, default="Paid")
     note = models.TextField(blank=True, null=True)
 
+    # Empty on invoices older than the column; they count as midnight
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the invoice list
+            models.Index(fields=["business", "date", "id"]),
+            # Dashboard revenue: covers the summed column on PostgreSQL
+            models.Index(
+                fields=["business", "status"],
+                include=["total_taxable_amount"],
+                name="invoice_status_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.invoice_id
 
@@ -52,9 +75,17 @@ class InvoiceItem(models.Model):
 
     # ✅ Calculated values
     base_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    taxable_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     tax_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     total_value = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
+    # ✅ GST split of tax_amount
+    cess_percent = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    cgst_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    sgst_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    igst_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    cess_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
     def __str__(self):
         return f"{self.item_name} ({self.invoice.invoice_id})"
     
\ No newline at end of file
@@ -0,0 +1,269 @@
+import csv
+import io
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from api.utils.gst import GSTIN_PATTERN
+from api.utils.tax_engine import money
+from order.models import OrderItem
+
+from .models import InvoiceItem
+
+
+# Rows fetched per round trip from the server-side cursor
+CHUNK_SIZE = 2000
+
+# Rows per chunk of the streamed response
+ROWS_PER_WRITE = 500
+
+# Columns of each GSTR-1 section, in output order
+SECTIONS = {
+    "b2b": (
+        "gstin",
+        "receiver_name",
+        "invoice_number",
+        "invoice_date",
+        "invoice_value",
+        "place_of_supply",
+        "gst_rate",
+        "taxable_value",
+        "igst",
+        "cgst",
+        "sgst",
+        "cess",
+    ),
+    "b2cs": (
+        "place_of_supply",
+        "supply_type",
+        "gst_rate",
+        "taxable_value",
+        "igst",
+        "cgst",
+        "sgst",
+        "cess",
+    ),
+    "hsn": (
+        "hsn",
+        "uqc",
+        "gst_rate",
+        "quantity",
+        "total_value",
+        "taxable_value",
+        "igst",
+        "cgst",
+        "sgst",
+        "cess",
+    ),
+}
+
+TAX_SUMS = {
+    "taxable_value": Sum("taxable_amount"),
+    "igst": Sum("igst_amount"),
+    "cgst": Sum("cgst_amount"),
+    "sgst": Sum("sgst_amount"),
+    "cess": Sum("cess_amount"),
+}
+
+
+# ---------------------------------------------------------
+# GST lines of a period
+# ---------------------------------------------------------
+
+def gst_lines(business, date_from, date_to):
+    """
+    GST invoice items and order items of the period, each with the
+    name of its document relation. Cancelled documents are left out.
+    """
+    # Orders are found by created_at, which their keyset index covers
+    start = timezone.make_aware(datetime.combine(date_from, time.min))
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+
+    invoices = InvoiceItem.objects.filter(
+        invoice__business=business,
+        invoice__date__range=(date_from, date_to),
+        tax_type="GST"
+    ).exclude(invoice__status="Cancelled")
+
+    orders = OrderItem.objects.filter(
+        order__business=business,
+        order__created_at__gte=start,
+        order__created_at__lt=end,
+        tax_type="GST"
+    ).exclude(order__status="Cancelled")
+
+    return [(invoices, "invoice"), (orders, "order")]
+
+
+def registered(document):
+    return Q(**{f"{document}__customer__gstin__regex": GSTIN_PATTERN.pattern})
+
+
+def rounded(row, totals):
+    # Sums of paisa amounts, but SQLite hands them back as floats
+    for name in totals:
+        if name != "quantity":
+            row[name] = money(row[name])
+
+    return row
+
+
+def merge(rows, key, totals):
+    """
+    Adds up rows of both sources sharing `key`. Groups are per rate and
+    HSN / state, so their number stays small whatever the period.
+    """
+    groups = {}
+
+    for row in rows:
+        group = tuple(row[name] for name in key)
+
+        if group in groups:
+            for name in totals:
+                groups[group][name] += row[name]
+        else:
+            groups[group] = row
+
+    return [rounded(groups[group], totals) for group in sorted(groups, key=str)]
+
+
+# ---------------------------------------------------------
+# Sections
+# ---------------------------------------------------------
+
+def b2b_rows(business, date_from, date_to):
+    """One row per invoice and rate for customers with a GSTIN."""
+    for lines, document in gst_lines(business, date_from, date_to):
+        rows = (
+            lines
+            .filter(registered(document))
+            .values(
+                gstin=F(f"{document}__customer__gstin"),
+                receiver_name=F(f"{document}__customer_name"),
+                invoice_number=F(f"{document}__invoice_id"),
+                invoice_date=F(f"{document}__date"),
+                invoice_value=F(f"{document}__net_payable"),
+                place_of_supply=F(f"{document}__place_of_supply"),
+                gst_rate=F("tax_percent"),
+            )
+            .annotate(**TAX_SUMS)
+            .order_by("invoice_date", "invoice_number", "gst_rate")
+        )
+
+        for row in rows.iterator(chunk_size=CHUNK_SIZE):
+            yield rounded(row, TAX_SUMS)
+
+
+def b2cs_rows(business, date_from, date_to):
+    """Unregistered customers, per place of supply and rate."""
+    def rows():
+        for lines, document in gst_lines(business, date_from, date_to):
+            yield from (
+                lines
+                .exclude(registered(document))
+                .values(
+                    place_of_supply=F(f"{document}__place_of_supply"),
+                    inter_state=F(f"{document}__is_inter_state"),
+                    gst_rate=F("tax_percent"),
+                )
+                .annotate(**TAX_SUMS)
+                .order_by()
+                .iterator(chunk_size=CHUNK_SIZE)
+            )
+
+    for row in merge(rows(), ("place_of_supply", "inter_state", "gst_rate"), TAX_SUMS):
+        row["supply_type"] = "INTER" if row.pop("inter_state") else "INTRA"
+        yield row
+
+
+def hsn_rows(business, date_from, date_to):
+    """Per HSN / SAC code, unit and rate."""
+    sums = {
+        "quantity": Sum("quantity"),
+        "total_value": Sum("total_value"),
+        **TAX_SUMS,
+    }
+
+    def rows():
+        for lines, _ in gst_lines(business, date_from, date_to):
+            yield from (
+                lines
+                .values(
+                    hsn=F("item__hsn_sac_code_product"),
+                    uqc=F("item__unit_product"),
+                    gst_rate=F("tax_percent"),
+                )
+                .annotate(**sums)
+                .order_by()
+                .iterator(chunk_size=CHUNK_SIZE)
+            )
+
+    yield from merge(rows(), ("hsn", "uqc", "gst_rate"), sums)
+
+
+SECTION_ROWS = {
+    "b2b": b2b_rows,
+    "b2cs": b2cs_rows,
+    "hsn": hsn_rows,
+}
+
+
+# ---------------------------------------------------------
+# Streaming
+# ---------------------------------------------------------
+
+def stream_csv(section, rows):
+    columns = SECTIONS[section]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+
+    for number, row in enumerate(rows, start=1):
+        writer.writerow([row[name] for name in columns])
+
+        if number % ROWS_PER_WRITE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def stream_json(section, rows, date_from, date_to):
+    columns = SECTIONS[section]
+    encode = DjangoJSONEncoder().encode
+
+    yield (
+        f'{{"section": "{section}", '
+        f'"from": "{date_from.isoformat()}", '
+        f'"to": "{date_to.isoformat()}", '
+        '"rows": ['
+    )
+
+    chunk = []
+
+    for number, row in enumerate(rows):
+        chunk.append(
+            ("," if number else "")
+            + encode({name: row[name] for name in columns})
+        )
+
+        if len(chunk) == ROWS_PER_WRITE:
+            yield "".join(chunk)
+            chunk = []
+
+    chunk.append("]}")
+    yield "".join(chunk)
+
+
+def gstr1_report(business, section, date_from, date_to, output="json"):
+    """Generator of the section's CSV / JSON text, for a StreamingHttpResponse."""
+    rows = SECTION_ROWS[section](business, date_from, date_to)
+
+    if output == "csv":
+        return stream_csv(section, rows)
+
+    return stream_json(section, rows, date_from, date_to)
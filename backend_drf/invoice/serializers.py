@@ -1,6 +1,10 @@
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
+from api.utils.tax_engine import compute_lines
+from api.utils.gst import is_inter_state, place_of_supply
+from django.db import transaction
 from rest_framework import serializers
 from .models import Invoice, InvoiceItem
+from order.stock import InsufficientStock, reserve_stock
 from products.models import Item
 from business_entity.serializers import BusinessEntitySerializer
 
@@ -10,6 +14,14 @@ class InvoiceItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = InvoiceItem
         exclude = ['invoice']
+        read_only_fields = (
+            "taxable_amount",
+            "cess_percent",
+            "cgst_amount",
+            "sgst_amount",
+            "igst_amount",
+            "cess_amount",
+        )
 
 
 # ---------------- Invoice Serializer ----------------
@@ -30,17 +42,35 @@ class InvoiceSerializer(serializers.ModelSerializer):
             "total_value",
             "round_off",
             "net_payable",
+            "place_of_supply",
+            "is_inter_state",
+            "total_cgst",
+            "total_sgst",
+            "total_igst",
+            "total_cess",
         )
 
+    @transaction.atomic
     def create(self, validated_data):
         request = self.context["request"]
-        business = request.user.active_business
+        business = request.business
 
         items_data = validated_data.pop("invoice_items")
         validated_data.pop("customer_name", None)
 
         customer_obj = validated_data.get("customer")
 
+        # ---------------- STOCK ----------------
+        # Same locked, reservation-aware decrement as online checkout, so
+        # a counter sale cannot take units held for a paying customer
+        try:
+            reserve_stock([
+                (item_data["item"], None, int(item_data.get("quantity", 1)))
+                for item_data in items_data
+            ])
+        except InsufficientStock as e:
+            raise serializers.ValidationError(e.message)
+
         # ✅ Create Invoice
         invoice = Invoice.objects.create(
             business=business,
@@ -48,13 +78,27 @@ class InvoiceSerializer(serializers.ModelSerializer):
             **validated_data
         )
 
-        total_base = Decimal("0")
-        total_discount = Decimal("0")
-        total_taxable = Decimal("0")
-        total_tax = Decimal("0")
-        total_final = Decimal("0")
+        tax_type = business.tax_type
+        includes_tax = business.price_includes_tax
+
+        # ---------------- CALCULATION ----------------
+        document = compute_lines(
+            [
+                (
+                    item_data["item"].gross_amount,  # ✅ MAIN PRICE
+                    item_data.get("quantity", 1),
+                    item_data.get("discount_percent", 0),
+                    item_data["item"].tax_percent,
+                    item_data["item"].cess_percent
+                )
+                for item_data in items_data
+            ],
+            includes_tax=includes_tax,
+            tax_type=tax_type,
+            inter_state=is_inter_state(business, customer_obj)
+        )
 
-        for item_data in items_data:
+        for item_data, values in zip(items_data, document["lines"]):
             item_obj = item_data["item"]
 
             qty = Decimal(item_data.get("quantity", 1))
@@ -62,50 +106,6 @@ class InvoiceSerializer(serializers.ModelSerializer):
             discount_percent = Decimal(item_data.get("discount_percent", 0))
 
             tax_percent = Decimal(item_obj.tax_percent)
-            tax_type = business.tax_type
-            includes_tax = business.price_includes_tax
-
-            # ---------------- STOCK CHECK ----------------
-            if item_obj.quantity_product < qty:
-                raise serializers.ValidationError(
-                    f"Not enough stock for {item_obj.item_name}"
-                )
-
-            item_obj.quantity_product -= int(qty)
-            item_obj.save(update_fields=["quantity_product"])
-
-            # ---------------- CALCULATION ----------------
-            line_price = rate * qty
-
-            if includes_tax:
-                # ✅ TAX INCLUDED LOGIC (CORRECT)
-                total_amount = line_price
-
-                discount_amount = (total_amount * discount_percent) / 100
-                after_discount = total_amount - discount_amount
-
-                taxable_amount = after_discount / (1 + tax_percent / 100)
-                tax_amount = after_discount - taxable_amount
-
-                base_amount = taxable_amount
-                total_value = after_discount
-
-            else:
-                # ✅ TAX EXCLUDED LOGIC
-                base_amount = line_price
-
-                discount_amount = (base_amount * discount_percent) / 100
-                taxable_amount = base_amount - discount_amount
-
-                tax_amount = (taxable_amount * tax_percent) / 100
-                total_value = taxable_amount + tax_amount
-
-            # ---------------- ROUNDING ----------------
-            base_amount = base_amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            discount_amount = discount_amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            taxable_amount = taxable_amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            tax_amount = tax_amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            total_value = total_value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
             # ---------------- SAVE ITEM ----------------
             InvoiceItem.objects.create(
@@ -116,35 +116,38 @@ class InvoiceSerializer(serializers.ModelSerializer):
                 rate=rate,
 
                 discount_percent=discount_percent,
-                discount_amount=discount_amount,
+                discount_amount=values["discount_amount"],
 
                 tax_percent=tax_percent,
                 tax_type=tax_type,
                 price_includes_tax=includes_tax,
 
-                base_amount=base_amount,
-                tax_amount=tax_amount,
-                total_value=total_value,
+                base_amount=values["base_amount"],
+                taxable_amount=values["taxable_amount"],
+                tax_amount=values["tax_amount"],
+                total_value=values["total_value"],
+
+                cess_percent=item_obj.cess_percent if tax_type == "GST" else 0,
+                cgst_amount=values["cgst_amount"],
+                sgst_amount=values["sgst_amount"],
+                igst_amount=values["igst_amount"],
+                cess_amount=values["cess_amount"],
             )
 
-            # ---------------- TOTALS ----------------
-            total_base += base_amount
-            total_discount += discount_amount
-            total_taxable += taxable_amount
-            total_tax += tax_amount
-            total_final += total_value
-
-        # ---------------- FINAL ROUNDING ----------------
-        net_payable = total_final.quantize(Decimal("1"), rounding=ROUND_HALF_UP)
-        round_off = net_payable - total_final
-
-        invoice.total_base_amount = total_base
-        invoice.discount_amount = total_discount
-        invoice.total_taxable_amount = total_taxable
-        invoice.total_tax = total_tax
-        invoice.total_value = total_final
-        invoice.net_payable = net_payable
-        invoice.round_off = round_off
+        invoice.total_base_amount = document["total_base_amount"]
+        invoice.discount_amount = document["discount_amount"]
+        invoice.total_taxable_amount = document["total_taxable_amount"]
+        invoice.total_tax = document["total_tax"]
+        invoice.total_value = document["total_value"]
+        invoice.net_payable = document["net_payable"]
+        invoice.round_off = document["round_off"]
+
+        invoice.place_of_supply = place_of_supply(customer_obj) or ""
+        invoice.is_inter_state = document["is_inter_state"]
+        invoice.total_cgst = document["total_cgst"]
+        invoice.total_sgst = document["total_sgst"]
+        invoice.total_igst = document["total_igst"]
+        invoice.total_cess = document["total_cess"]
 
         invoice.save()
 
@@ -6,19 +6,24 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from products.models import Item
 from products.serializers import ProductSerializer
+from api.utils.envelope import BusinessEnvelopeMixin
+from api.utils.pagination import KeysetPagination
 from rest_framework import status, generics, filters
 from .models import Invoice, InvoiceItem
 from .serializers import InvoiceSerializer, InvoiceItemSerializer
+from .reports import SECTIONS, gstr1_report
+from datetime import date
+from django.http import StreamingHttpResponse
 from django.db.models import Q
 from rest_framework import serializers
 
 
-class ItemSearchListView(generics.ListAPIView):
+class ItemSearchListView(BusinessEnvelopeMixin, generics.ListAPIView):
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        business = self.request.user.active_business
+        business = self.request.business
         if business is None:
             return Item.objects.none()
 
@@ -34,6 +39,9 @@ class ItemSearchListView(generics.ListAPIView):
         return Item.objects.filter(
             business=business,
             item_name__icontains=search_term
+        ).select_related("business__user").prefetch_related(
+            "variants__attributes",
+            "variants__images"
         )
 
 
@@ -46,7 +54,7 @@ class ItemDetailByNameView(APIView):
         if not product_name:
             return Response({"error": "Product name is required."}, status=400)
 
-        business = request.user.active_business
+        business = request.business
         if business is None:
             return Response({"error": "No active business selected."}, status=400)
 
@@ -70,7 +78,7 @@ class ItemDetailByBarcodeView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        business = request.user.active_business
+        business = request.business
 
         if not business:
             return Response(
@@ -101,7 +109,7 @@ class CustomerSearchListView(generics.ListAPIView):
     search_fields = ['name']
 
     def get_queryset(self):
-        business = self.request.user.active_business
+        business = self.request.business
         if business is None:
             return Customer.objects.none()
 
@@ -117,7 +125,7 @@ class CustomerDetailByNameView(APIView):
         if not name:
             return Response({"error": "Customer name is required."}, status=400)
 
-        business = request.user.active_business
+        business = request.business
         if business is None:
             return Response({"error": "No active business selected."}, status=400)
 
@@ -135,14 +143,16 @@ from rest_framework.exceptions import ValidationError
 class InvoiceListCreateView(generics.ListCreateAPIView):
     serializer_class = InvoiceSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-date", "-id")
 
     def get_queryset(self):
         return Invoice.objects.filter(
-            business=self.request.user.active_business
+            business=self.request.business
         ).order_by("-date")
 
     def perform_create(self, serializer):
-        if not self.request.user.active_business:
+        if not self.request.business:
             raise ValidationError("No active business selected.")
         serializer.save()
 
@@ -153,7 +163,7 @@ class InvoiceDetailView(generics.RetrieveAPIView):
 
     def get_queryset(self):
         return Invoice.objects.filter(
-            business=self.request.user.active_business
+            business=self.request.business
         )
 
 
@@ -166,5 +176,58 @@ class InvoiceItemListView(generics.ListAPIView):
 
         return InvoiceItem.objects.filter(
             invoice_id=invoice_id,
-            invoice__business=self.request.user.active_business
+            invoice__business=self.request.business
         )
+
+
+class GSTR1ReportView(APIView):
+    """
+    GSTR-1 section (b2b, b2cs or hsn) of the active business for a
+    period, aggregated in the database and streamed as JSON or CSV:
+    GET /reports/gstr1/<section>/?from=2026-04-01&to=2026-04-30&output=csv
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, section):
+        business = request.business
+
+        if business is None:
+            return Response({"error": "No active business selected."}, status=400)
+
+        if section not in SECTIONS:
+            return Response(
+                {"error": f"Unknown section. Use one of: {', '.join(SECTIONS)}."},
+                status=400
+            )
+
+        today = date.today()
+
+        try:
+            date_from = date.fromisoformat(
+                request.query_params.get("from") or today.replace(day=1).isoformat()
+            )
+            date_to = date.fromisoformat(
+                request.query_params.get("to") or today.isoformat()
+            )
+        except ValueError:
+            return Response({"error": "Dates must be YYYY-MM-DD."}, status=400)
+
+        if date_from > date_to:
+            return Response({"error": "'from' is after 'to'."}, status=400)
+
+        output = request.query_params.get("output", "json").lower()
+
+        if output not in ("json", "csv"):
+            return Response({"error": "output must be json or csv."}, status=400)
+
+        response = StreamingHttpResponse(
+            gstr1_report(business, section, date_from, date_to, output),
+            content_type="text/csv" if output == "csv" else "application/json"
+        )
+
+        if output == "csv":
+            response["Content-Disposition"] = (
+                f'attachment; filename="gstr1-{section}-{date_from}-{date_to}.csv"'
+            )
+
+        return response
@@ -14,6 +14,7 @@ from datetime import timedelta
 from pathlib import Path
 from decouple import config
 import dj_database_url
+from corsheaders.defaults import default_headers
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -58,7 +59,8 @@ INSTALLED_APPS = [
     'django_filters',
     'order',
     'encrypted_model_fields',
-    'payments'
+    'payments',
+    'analytics'
 ]
 
 SITE_ID = 1
@@ -215,7 +217,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication that also loads the active business
+        'api.authentication.BusinessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -261,3 +264,7 @@ CORS_ALLOWED_ORIGINS = [
     "http://3.27.129.212:5173",
     "https://ramsamtrends.com",
 ]
+
+# Clients send Idempotency-Key on checkout / payment retries
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed"]
@@ -0,0 +1,378 @@
+import uuid
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Prefetch
+
+from api.utils.gst import is_inter_state
+from api.utils.tax_engine import compute_lines
+from products.models import Item, ItemVariant
+
+from .models import Cart, CartItem
+from .serializers import CartItemSerializer
+from .stock import find_shortages, held_by, stock_demand
+
+
+# Operations one batch cart request may carry. Reorders aren't capped:
+# their lines come from an order, not from the request.
+MAX_OPERATIONS = 200
+
+CART_ACTIONS = ("add", "set", "remove")
+
+
+class CartError(Exception):
+    """Raised with every operation that could not be applied, not just the first."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(", ".join(e["error"] for e in errors))
+
+    @property
+    def message(self):
+        return self.errors[0]["error"]
+
+
+# ---------------------------------------------------------
+# Pricing
+# ---------------------------------------------------------
+
+def price_line(item, variant, qty):
+    """(price, qty, discount %, tax %, cess %) of a cart line for compute_lines."""
+    return (
+        variant.selling_price if variant else item.gross_amount,
+        qty,
+        getattr(item, "discount_percent", 0),
+        item.tax_percent,
+        item.cess_percent
+    )
+
+
+def price_lines(business, customer, lines):
+    """Prices (item, variant, qty) lines for the customer's place of supply."""
+    return compute_lines(
+        [price_line(item, variant, qty) for item, variant, qty in lines],
+        includes_tax=business.price_includes_tax,
+        tax_type=business.tax_type,
+        inter_state=is_inter_state(business, customer)
+    )
+
+
+# ---------------------------------------------------------
+# Cart read model
+# ---------------------------------------------------------
+
+def load_cart(customer, business, display=True):
+    """
+    The customer's cart with its lines, items and variants, plus the
+    variants' attributes and images when `display`: four queries
+    whatever its size, two without. None without a cart; reading never
+    creates one.
+    """
+    lines = CartItem.objects.select_related("item", "variant")
+
+    if display:
+        lines = lines.prefetch_related("variant__attributes", "variant__images")
+
+    return (
+        Cart.objects
+        .filter(customer=customer, business=business)
+        .prefetch_related(Prefetch("items", queryset=lines))
+        .first()
+    )
+
+
+def cart_lines(cart):
+    return list(cart.items.all()) if cart else []
+
+
+def cart_view(customer, business):
+    """
+    The cart as ViewCartView returns it: CartItemSerializer lines with
+    their tax engine amounts merged in, total_amount (price x quantity,
+    as before) and the priced document totals.
+    """
+    cart = load_cart(customer, business)
+    lines = cart_lines(cart)
+
+    document = price_lines(business, customer, [
+        (line.item, line.variant, line.quantity) for line in lines
+    ])
+
+    return {
+        "id": cart.id if cart else None,
+        "items": [
+            {**data, **values}
+            for data, values in zip(
+                CartItemSerializer(lines, many=True).data,
+                document["lines"]
+            )
+        ],
+        "total_amount": sum((line.subtotal() for line in lines), Decimal("0.00")),
+        "totals": {
+            name: value for name, value in document.items() if name != "lines"
+        },
+    }
+
+
+# ---------------------------------------------------------
+# Batch writes
+# ---------------------------------------------------------
+
+def parse_operation(index, data):
+    """
+    Checks one {"action", "item", "variant", "quantity"} operation.
+    Returns it cleaned up, or an error dict.
+    """
+    if not isinstance(data, dict):
+        return {"index": index, "error": "Invalid operation"}
+
+    action = data.get("action", "add")
+
+    if action not in CART_ACTIONS:
+        return {"index": index, "error": "Invalid action"}
+
+    try:
+        item_id = int(data.get("item"))
+    except (TypeError, ValueError):
+        return {"index": index, "error": "Item is required"}
+
+    variant_uid = data.get("variant") or None
+
+    if variant_uid is not None:
+        try:
+            variant_uid = uuid.UUID(str(variant_uid))
+        except ValueError:
+            return {"index": index, "error": "Variant not found"}
+
+    quantity = 0
+
+    if action != "remove":
+        try:
+            quantity = int(data.get("quantity", 1))
+        except (TypeError, ValueError):
+            return {"index": index, "error": "Invalid quantity"}
+
+        # set 0 removes the line, add 0 does nothing useful
+        if quantity < 0 or (action == "add" and quantity == 0):
+            return {"index": index, "error": "Invalid quantity"}
+
+    return {
+        "index": index,
+        "action": action,
+        "item": item_id,
+        "variant": variant_uid,
+        "quantity": quantity,
+    }
+
+
+def resolve_operations(business, operations):
+    """
+    Parses the operations and finds their items and variants in the
+    business: two queries for any number of them. Returns
+    ([(operation, item, variant)], errors).
+    """
+    parsed = [parse_operation(index, data) for index, data in enumerate(operations)]
+    errors = [op for op in parsed if "error" in op]
+    valid = [op for op in parsed if "error" not in op]
+
+    items = Item.objects.filter(business=business).in_bulk(
+        {op["item"] for op in valid}
+    )
+
+    uids = {op["variant"] for op in valid if op["variant"]}
+    variants = {
+        variant.uid: variant
+        for variant in ItemVariant.objects.filter(uid__in=uids, item__business=business)
+    } if uids else {}
+
+    resolved = []
+
+    for op in valid:
+        item = items.get(op["item"])
+
+        if item is None:
+            errors.append({"index": op["index"], "error": "Item not found"})
+            continue
+
+        variant = None
+
+        # As AddToCartView: a variant is only looked at for items having them
+        if item.has_variants:
+            if not op["variant"]:
+                errors.append({"index": op["index"], "error": "Variant required"})
+                continue
+
+            variant = variants.get(op["variant"])
+
+            if variant is None or variant.item_id != item.id:
+                errors.append({"index": op["index"], "error": "Variant not found"})
+                continue
+
+            if not variant.is_active:
+                errors.append({"index": op["index"], "error": "Variant not available"})
+                continue
+
+        resolved.append((op, item, variant))
+
+    return resolved, sorted(errors, key=lambda e: e["index"])
+
+
+def loaded_stock(demand, owners, variants, customer):
+    """
+    Available stock of the demanded rows, read off the items and
+    variants already loaded. Units the customer holds themselves count
+    as available to them.
+    """
+    own = held_by(customer)
+
+    return {
+        "item": {
+            pk: owners[("item", pk)].available_quantity + own["item"].get(pk, 0)
+            for pk in demand["item"]
+        },
+        "variant": {
+            pk: variants[pk].available_stock + own["variant"].get(pk, 0)
+            for pk in demand["variant"]
+        },
+    }
+
+
+def lock_cart(customer, business):
+    """The customer's cart, created if needed, row-locked until commit."""
+    cart = (
+        Cart.objects
+        .select_for_update()
+        .filter(customer=customer, business=business)
+        .first()
+    )
+
+    if cart is None:
+        cart, _ = Cart.objects.get_or_create(customer=customer, business=business)
+
+    return cart
+
+
+def write_lines(cart, existing, quantities):
+    """
+    Upserts the changed lines in one bulk_create on
+    unique_cart_item_variant and deletes the emptied ones in one DELETE.
+
+    The upsert needs the constraint to treat NULL variants as equal;
+    where the database can't (SQLite, PostgreSQL < 15) existing lines
+    are updated with bulk_update instead, which the cart lock keeps safe.
+    """
+    changed = [
+        CartItem(cart=cart, item_id=item_id, variant_id=variant_id, quantity=qty)
+        for (item_id, variant_id), qty in quantities.items()
+        if qty and qty != getattr(existing.get((item_id, variant_id)), "quantity", None)
+    ]
+    emptied = [
+        line.id for key, line in existing.items() if not quantities.get(key)
+    ]
+
+    if changed:
+        if connection.features.supports_nulls_distinct_unique_constraints:
+            CartItem.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=["cart", "item", "variant"],
+                update_fields=["quantity"]
+            )
+        else:
+            updates = []
+
+            for line in changed:
+                current = existing.get((line.item_id, line.variant_id))
+
+                if current:
+                    current.quantity = line.quantity
+                    updates.append(current)
+
+            CartItem.objects.bulk_update(updates, ["quantity"])
+            CartItem.objects.bulk_create([
+                line for line in changed
+                if (line.item_id, line.variant_id) not in existing
+            ])
+
+    if emptied:
+        CartItem.objects.filter(id__in=emptied).delete()
+
+
+def apply_cart_operations(customer, business, operations, partial=False):
+    """
+    Applies add / set / remove operations to the customer's cart in one
+    transaction, in order; set 0 removes a line. Lines that grow are
+    checked against the available stock.
+
+    Raises CartError with every bad operation and stock shortage, or
+    with `partial`, leaves those lines as they were and returns them.
+    The query count doesn't depend on the number of operations.
+    """
+    resolved, errors = resolve_operations(business, operations)
+
+    with transaction.atomic():
+        cart = lock_cart(customer, business)
+
+        existing = {
+            (line.item_id, line.variant_id): line
+            for line in CartItem.objects.filter(cart=cart).only(
+                "id", "item_id", "variant_id", "quantity"
+            )
+        }
+
+        quantities = {key: line.quantity for key, line in existing.items()}
+        touched = {}
+
+        for op, item, variant in resolved:
+            key = (item.id, variant.id if variant else None)
+            touched.setdefault(key, (item, variant, []))[2].append(op["index"])
+
+            if op["action"] == "add":
+                quantities[key] = quantities.get(key, 0) + op["quantity"]
+            elif op["action"] == "set":
+                quantities[key] = op["quantity"]
+            else:
+                quantities[key] = 0
+
+        # Only lines that grow need stock; lowering one always works
+        grown = [
+            (item, variant, quantities[key])
+            for key, (item, variant, _) in touched.items()
+            if quantities[key] > getattr(existing.get(key), "quantity", 0)
+        ]
+
+        demand, owners = stock_demand(grown)
+        shortages = []
+
+        if owners:
+            variants = {variant.id: variant for _, variant, _ in grown if variant}
+            shortages = find_shortages(
+                demand, loaded_stock(demand, owners, variants, customer), owners
+            )
+
+        # Stock row of each line, as stock_demand keys them
+        rows = {
+            ("variant", key[1]) if key[1] else ("item", key[0]): key
+            for key in touched
+        }
+
+        for shortage in shortages:
+            kind = "variant" if "variant_id" in shortage else "item"
+            key = rows[(kind, shortage[f"{kind}_id"])]
+
+            errors.extend(
+                {"index": index, "error": "Not enough stock", **shortage}
+                for index in touched[key][2]
+            )
+
+            if key in existing:
+                quantities[key] = existing[key].quantity
+            else:
+                quantities.pop(key)
+
+        if errors and not partial:
+            raise CartError(sorted(errors, key=lambda e: e["index"]))
+
+        write_lines(cart, existing, quantities)
+
+    return sorted(errors, key=lambda e: e["index"])
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from order.models import Order, Payment, backfill_payment_status
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the stored payment_status and paid_amount of orders "
+        "from their payments. Needed only after payments were written "
+        "around Payment.save(), e.g. with bulk_create or update()."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--business",
+            type=int,
+            action="append",
+            help="Business id to backfill. Repeatable; defaults to all."
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=5000,
+            help="Order ids per UPDATE."
+        )
+
+    def handle(self, *args, **options):
+        orders = Order.objects.all()
+
+        if options["business"]:
+            orders = orders.filter(business_id__in=options["business"])
+
+        updated = backfill_payment_status(orders, Payment, options["batch"])
+
+        self.stdout.write(f"Recomputed the payment status of {updated} orders.")
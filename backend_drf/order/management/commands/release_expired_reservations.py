@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from order.stock import SWEEP_BATCH, release_expired
+
+
+class Command(BaseCommand):
+    help = "Releases the stock held by expired checkout reservations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=SWEEP_BATCH,
+            help="Reservations released per transaction."
+        )
+        parser.add_argument(
+            "--loop",
+            type=int,
+            metavar="SECONDS",
+            help="Keep sweeping every SECONDS instead of exiting."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            released = 0
+
+            while True:
+                units = release_expired(options["batch"])
+
+                if not units:
+                    break
+
+                released += units
+
+            if released:
+                self.stdout.write(f"Released {released} reserved units.")
+
+            if not options["loop"]:
+                break
+
+            time.sleep(options["loop"])
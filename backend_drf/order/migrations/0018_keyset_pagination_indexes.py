@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business_entity', '0013_alter_businessentity_slug'),
+        ('customers', '0005_keyset_pagination_indexes'),
+        ('order', '0017_remove_cartitem_order_carti_cart_id_752a11_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['business', 'created_at', 'id'], name='order_order_busines_0d89b1_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:15
+
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    from order.models import backfill_payment_status
+
+    backfill_payment_status(
+        apps.get_model("order", "Order").objects.all(),
+        apps.get_model("order", "Payment")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business_entity', '0013_alter_businessentity_slug'),
+        ('customers', '0006_hot_filter_indexes'),
+        ('order', '0021_gst_components'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='paid_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='payment_status',
+            field=models.CharField(choices=[('Unpaid', 'Unpaid'), ('Pending', 'Pending'), ('Paid', 'Paid'), ('Failed', 'Failed')], default='Unpaid', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['business', 'payment_status', 'created_at', 'id'], name='order_payment_status_idx'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
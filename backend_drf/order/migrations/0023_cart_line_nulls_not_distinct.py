@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:18
+
+from django.db import migrations, models
+
+
+def merge_duplicate_lines(apps, schema_editor):
+    """
+    Lines without a variant were never unique (NULLs are distinct), so
+    a cart can hold the same item twice. Their quantities go onto the
+    oldest line and the others are deleted.
+    """
+    from django.db.models import Count, Min, Sum
+
+    CartItem = apps.get_model("order", "CartItem")
+
+    duplicates = (
+        CartItem.objects
+        .filter(variant__isnull=True)
+        .values("cart_id", "item_id")
+        .annotate(lines=Count("id"), first=Min("id"), total=Sum("quantity"))
+        .filter(lines__gt=1)
+    )
+
+    for group in duplicates:
+        CartItem.objects.filter(id=group["first"]).update(quantity=group["total"])
+        CartItem.objects.filter(
+            cart_id=group["cart_id"],
+            item_id=group["item_id"],
+            variant__isnull=True
+        ).exclude(id=group["first"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0022_payment_status'),
+        ('products', '0032_gst_components'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_lines, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='cartitem',
+            name='unique_cart_item_variant',
+        ),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'item', 'variant'), name='unique_cart_item_variant', nulls_distinct=False),
+        ),
+    ]
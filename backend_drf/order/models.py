@@ -1,4 +1,8 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import Case, Exists, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
 from business_entity.models import BusinessEntity
 from customers.models import Customer  # assuming you have a Customer model
 from products.models import Item, ItemVariant  # your existing Item model
@@ -29,31 +33,119 @@ class Order(models.Model):
     round_off = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     net_payable = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
+    # GST split of total_tax; IGST for inter-state supplies, else CGST + SGST
+    place_of_supply = models.CharField(max_length=2, blank=True, default="")
+    is_inter_state = models.BooleanField(default=False)
+    total_cgst = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_sgst = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_igst = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_cess = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
     status = models.CharField(max_length=20, default="Pending")
 
+    PAYMENT_STATUS_CHOICES = [
+        ("Unpaid", "Unpaid"),
+        ("Pending", "Pending"),
+        ("Paid", "Paid"),
+        ("Failed", "Failed"),
+    ]
+
+    # Derived from the payments, kept current by Payment.save() / delete()
+    payment_status = models.CharField(
+        max_length=20,
+        choices=PAYMENT_STATUS_CHOICES,
+        default="Unpaid"
+    )
+    paid_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
     attachment_url = models.URLField(blank=True, null=True)
     special_notes = models.TextField(blank=True, null=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    @property
-    def payment_status(self):
-        if not self.payments.exists():
-            return "Unpaid"
+    class Meta:
+        indexes = [
+            # Keyset pagination of the order list
+            models.Index(fields=["business", "created_at", "id"]),
+            # Customer order history
+            models.Index(
+                fields=["customer", "business", "created_at"],
+                name="order_customer_history_idx"
+            ),
+            # Order list filtered by payment status, e.g. unpaid orders
+            models.Index(
+                fields=["business", "payment_status", "created_at", "id"],
+                name="order_payment_status_idx"
+            ),
+        ]
 
-        if self.payments.filter(status="Success").exists():
-            return "Paid"
+    def refresh_payment_status(self):
+        """Recomputes payment_status and paid_amount from the payments."""
+        with transaction.atomic():
+            # Lock the order first, so the recount below sees payments
+            # committed while waiting for it
+            list(Order.objects.select_for_update().filter(pk=self.pk).values_list("pk"))
 
-        if self.payments.filter(status="Pending").exists():
-            return "Pending"
+            Order.objects.filter(pk=self.pk).update(**payment_status_updates(Payment))
 
-        return "Failed"
+        self.refresh_from_db(fields=["payment_status", "paid_amount"])
 
     def __str__(self):
         return self.order_number
 
 
+def payment_status_updates(payment_model):
+    """
+    UPDATE expressions for Order.payment_status and paid_amount.
+    Paid once any payment succeeded, else Pending while one is pending,
+    Failed when all failed or were refunded, Unpaid without payments.
+    `payment_model` is Payment, or its historical version in migrations.
+    """
+    payments = payment_model.objects.filter(order=OuterRef("pk"))
+    succeeded = payments.filter(status="Success")
+
+    return {
+        "payment_status": Case(
+            When(Exists(succeeded), then=Value("Paid")),
+            When(Exists(payments.filter(status="Pending")), then=Value("Pending")),
+            When(Exists(payments), then=Value("Failed")),
+            default=Value("Unpaid"),
+        ),
+        "paid_amount": Coalesce(
+            Subquery(
+                succeeded
+                .values("order")
+                .annotate(total=Sum("amount"))
+                .values("total")
+            ),
+            Value(Decimal("0.00")),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2)
+        ),
+    }
+
+
+def backfill_payment_status(orders, payment_model, batch_size=5000):
+    """
+    Recomputes payment_status and paid_amount of `orders`, one UPDATE
+    per range of batch_size ids. Returns the number of orders updated.
+    """
+    bounds = orders.aggregate(first=models.Min("id"), last=models.Max("id"))
+
+    if bounds["first"] is None:
+        return 0
+
+    updated = 0
+
+    for start in range(bounds["first"], bounds["last"] + 1, batch_size):
+        updated += orders.filter(
+            id__gte=start,
+            id__lt=start + batch_size
+        ).update(**payment_status_updates(payment_model))
+
+    return updated
+
+
 class OrderItem(models.Model):
     order = models.ForeignKey(
         Order,
@@ -105,6 +197,13 @@ class OrderItem(models.Model):
     tax_type = models.CharField(max_length=20)
     price_includes_tax = models.BooleanField(default=False)
 
+    # Split of tax_amount, see api.utils.tax_engine
+    cess_percent = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    cgst_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    sgst_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    igst_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    cess_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
     base_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     taxable_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     total_value = models.DecimalField(max_digits=12, decimal_places=2, default=0)
@@ -155,11 +254,68 @@ class Payment(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # payment_status and paid-order revenue
+            models.Index(fields=["order", "status"], name="payment_order_status_idx"),
+        ]
+
     def __str__(self):
         return f"{self.order.order_number} - {self.method}"
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+
+        # e.g. only a proof URL saved: the order's status can't change
+        if update_fields is not None and not {"status", "amount"} & set(update_fields):
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.order.refresh_payment_status()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self.order.refresh_payment_status()
+
+        return result
     
 
 
+class StockReservation(models.Model):
+    """
+    Stock held for a customer between checkout preview / gateway order
+    and order placement. Held units are counted on the row itself
+    (Item.reserved_quantity, ItemVariant.reserved_stock), so available
+    stock is one column subtraction instead of a sum over this table.
+    """
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.CASCADE,
+        related_name="stock_reservations"
+    )
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        related_name="reservations"
+    )
+    variant = models.ForeignKey(
+        ItemVariant,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="reservations"
+    )
+
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.quantity} x {self.item_id} for {self.customer_id}"
+
+
 class Cart(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
     business = models.ForeignKey(BusinessEntity, on_delete=models.CASCADE)
@@ -197,9 +353,12 @@ class CartItem(models.Model):
         ]
 
         constraints = [
+            # One line per item without a variant too, so batch writes
+            # can upsert on it (PostgreSQL 15+; see order.cart)
             models.UniqueConstraint(
                 fields=['cart', 'item', 'variant'],
-                name='unique_cart_item_variant'
+                name='unique_cart_item_variant',
+                nulls_distinct=False
             )
         ]
 
@@ -1,5 +1,6 @@
 from products.serializers import VariantAttributeSerializer, VariantImageSerializer
 from business_entity.serializers import BusinessEntitySerializer
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Cart, CartItem, Order, OrderItem, Payment
 
@@ -55,6 +56,11 @@ class OrderItemSerializer(serializers.ModelSerializer):
             "base_amount",
             "taxable_amount",
             "tax_amount",
+            "cess_percent",
+            "cgst_amount",
+            "sgst_amount",
+            "igst_amount",
+            "cess_amount",
             "total_value",
             "subtotal",
         ]
@@ -109,6 +115,7 @@ class OrderSerializer(serializers.ModelSerializer):
 
             'status',
             'payment_status',
+            'paid_amount',
             'total_base_amount',
             'discount_amount',
             'total_taxable_amount',
@@ -116,6 +123,12 @@ class OrderSerializer(serializers.ModelSerializer):
             'total_value',
             'round_off',
             'net_payable',
+            'place_of_supply',
+            'is_inter_state',
+            'total_cgst',
+            'total_sgst',
+            'total_igst',
+            'total_cess',
 
             'order_items',
             'payments',   # ✅ NEW
@@ -127,9 +140,31 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
 
     def get_payment_status(self, obj):
-        payment = obj.payments.last()
+        # Latest payment, from the prefetched list: .last() would
+        # re-query because it orders
+        payment = max(obj.payments.all(), key=lambda p: p.pk, default=None)
         return payment.status if payment else "Pending"
 
+
+def with_order_relations(queryset):
+    """
+    Loads everything OrderSerializer reads, so a page of orders costs
+    the same few queries whatever its size.
+    """
+    return (
+        queryset
+        .select_related("customer", "business__user")
+        .prefetch_related(
+            Prefetch(
+                "order_items",
+                queryset=OrderItem.objects
+                .select_related("variant")
+                .prefetch_related("variant__attributes", "variant__images")
+            ),
+            "payments",
+        )
+    )
+
         
 class OrderStatusUpdateSerializer(serializers.Serializer):
     status = serializers.ChoiceField(
@@ -196,10 +231,12 @@ class CartItemSerializer(serializers.ModelSerializer):
 
     def get_item_image(self, obj):
         if obj.variant:
-            image = obj.variant.images.filter(is_primary=True).first()
+            # From the prefetched images, in their sort order
+            images = list(obj.variant.images.all())
+            image = next((image for image in images if image.is_primary), None)
 
-            if not image:
-                image = obj.variant.images.first()
+            if not image and images:
+                image = images[0]
 
             return image.image_url if image else None
 
@@ -225,35 +262,3 @@ class CartItemSerializer(serializers.ModelSerializer):
 
     def get_subtotal(self, obj):
         return obj.subtotal()
-
-
-from decimal import Decimal
-
-class CartSerializer(serializers.ModelSerializer):
-    items = serializers.SerializerMethodField()
-    total_amount = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Cart
-        fields = ['id', 'items', 'total_amount']
-
-    def get_items(self, obj):
-        qs = (
-            obj.items
-            .select_related("item", "variant")
-            .prefetch_related(
-                "variant__attributes",
-                "variant__images"
-            )
-        )
-        return CartItemSerializer(qs, many=True).data
-
-
-    def get_total_amount(self, obj):
-        return sum(
-            (item.subtotal() for item in obj.items.select_related("item", "variant")),
-            Decimal("0.00")
-        )
-
-
-
@@ -0,0 +1,396 @@
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from products.catalog import schedule_refresh
+from products.models import Item, ItemVariant
+
+from .models import StockReservation
+
+
+# How long a checkout preview / gateway order holds its stock
+RESERVATION_MINUTES = getattr(settings, "STOCK_RESERVATION_MINUTES", 15)
+
+# Expired reservations released per sweeper transaction
+SWEEP_BATCH = 1000
+
+# (model, stock column, reserved column) per kind of stocked row
+STOCK_COLUMNS = {
+    "item": (Item, "quantity_product", "reserved_quantity"),
+    "variant": (ItemVariant, "stock", "reserved_stock"),
+}
+
+
+class InsufficientStock(Exception):
+    """Raised with every line that could not be covered, not just the first."""
+
+    def __init__(self, shortages):
+        self.shortages = shortages
+        super().__init__(
+            ", ".join(
+                f"{s['name']} ({s['available']} of {s['requested']})"
+                for s in shortages
+            )
+        )
+
+    @property
+    def message(self):
+        if not self.shortages:
+            # A concurrent writer changed the rows again before they
+            # could be read back, see reserve_stock
+            return "Not enough stock"
+
+        return f"Not enough stock for {self.shortages[0]['name']}"
+
+
+# ---------------------------------------------------------
+# Stock lines
+# ---------------------------------------------------------
+
+def stock_demand(lines):
+    """
+    Sums the requested quantity per stocked row. `lines` are
+    (item, variant, qty) tuples; only goods carry stock.
+
+    Returns {"item": {id: qty}, "variant": {id: qty}} and the item of
+    each row, keyed ("item", id) / ("variant", id).
+    """
+    demand = {"item": defaultdict(int), "variant": defaultdict(int)}
+    owners = {}
+
+    for item, variant, qty in lines:
+        if item.item_type != "Goods":
+            continue
+
+        key = ("variant", variant.id) if variant else ("item", item.id)
+        demand[key[0]][key[1]] += qty
+        owners[key] = item
+
+    return {kind: dict(rows) for kind, rows in demand.items()}, owners
+
+
+def find_shortages(demand, available, owners):
+    return [
+        {
+            f"{kind}_id": pk,
+            "name": owners[(kind, pk)].item_name,
+            "requested": qty,
+            "available": max(available[kind].get(pk, 0), 0),
+        }
+        for kind in STOCK_COLUMNS
+        for pk, qty in sorted(demand[kind].items())
+        if available[kind].get(pk, 0) < qty
+    ]
+
+
+def stock_shortages(lines, customer=None):
+    """
+    Lines the available stock can't cover. Plain reads, no locks.
+    Units the customer holds themselves count as available to them.
+    """
+    demand, owners = stock_demand(lines)
+    own = held_by(customer) if customer else {"item": {}, "variant": {}}
+    available = {}
+
+    for kind, (model, stock, reserved) in STOCK_COLUMNS.items():
+        available[kind] = {
+            pk: on_hand - held + own[kind].get(pk, 0)
+            for pk, on_hand, held in (
+                model.objects
+                .filter(id__in=demand[kind])
+                .values_list("id", stock, reserved)
+            )
+        }
+
+    return find_shortages(demand, available, owners)
+
+
+# ---------------------------------------------------------
+# Row locks and batch updates
+# ---------------------------------------------------------
+
+def lock_stock(rows):
+    """
+    Row-locks the given {"item": ids, "variant": ids} in a fixed order:
+    items before variants, each by primary key. Every path that changes
+    stock or reservations locks this way, so two of them can only wait
+    on each other, never deadlock.
+
+    Returns the available stock per row: {"item": {id: units}, ...}.
+    """
+    available = {}
+
+    for kind, (model, stock, reserved) in STOCK_COLUMNS.items():
+        available[kind] = {
+            pk: on_hand - held
+            for pk, on_hand, held in (
+                model.objects
+                .select_for_update()
+                .filter(id__in=rows[kind])
+                .order_by("id")
+                .values_list("id", stock, reserved)
+            )
+        }
+
+    return available
+
+
+def adjust(kind, column, amounts, sign, guarded=False):
+    """
+    One UPDATE for all rows of a table:
+    SET column = column -/+ CASE id WHEN .. THEN qty .. END.
+
+    `guarded` only touches rows whose available stock still covers
+    their amount. Returns the number of rows updated.
+    """
+    if not amounts:
+        return 0
+
+    model, stock, reserved = STOCK_COLUMNS[kind]
+    field = getattr(model, column).field
+
+    delta = Case(
+        *[When(id=pk, then=Value(qty)) for pk, qty in amounts.items()],
+        output_field=field
+    )
+
+    if guarded:
+        condition = Q()
+
+        for pk, qty in amounts.items():
+            condition |= Q(id=pk, **{f"{stock}__gte": F(reserved) + qty})
+
+        queryset = model.objects.filter(condition)
+    else:
+        queryset = model.objects.filter(id__in=amounts)
+
+    value = F(column) - delta if sign < 0 else F(column) + delta
+
+    return queryset.update(**{column: value})
+
+
+# ---------------------------------------------------------
+# Reservations
+# ---------------------------------------------------------
+
+def rows_of(queryset):
+    rows = {"item": set(), "variant": set()}
+
+    for item_id, variant_id in queryset.values_list("item_id", "variant_id"):
+        if variant_id:
+            rows["variant"].add(variant_id)
+        else:
+            rows["item"].add(item_id)
+
+    return rows
+
+
+def rows_filter(rows):
+    return (
+        Q(variant__isnull=True, item_id__in=rows["item"])
+        | Q(variant_id__in=rows["variant"])
+    )
+
+
+def held_by(customer):
+    held = {"item": defaultdict(int), "variant": defaultdict(int)}
+
+    for item_id, variant_id, qty in (
+        StockReservation.objects
+        .filter(customer=customer, expires_at__gt=timezone.now())
+        .values_list("item_id", "variant_id", "quantity")
+    ):
+        if variant_id:
+            held["variant"][variant_id] += qty
+        else:
+            held["item"][item_id] += qty
+
+    return held
+
+
+def release_holds(condition):
+    """
+    Deletes the reservations matching `condition` and takes their
+    units off the reserved counters. The rows they hold must already
+    be locked. Returns the released units per row.
+    """
+    released = {"item": defaultdict(int), "variant": defaultdict(int)}
+    ids = []
+
+    for pk, item_id, variant_id, qty in (
+        StockReservation.objects
+        .filter(condition)
+        .values_list("id", "item_id", "variant_id", "quantity")
+    ):
+        ids.append(pk)
+
+        if variant_id:
+            released["variant"][variant_id] += qty
+        else:
+            released["item"][item_id] += qty
+
+    if ids:
+        StockReservation.objects.filter(id__in=ids).delete()
+
+        for kind, (_, _, reserved) in STOCK_COLUMNS.items():
+            adjust(kind, reserved, released[kind], -1)
+
+    return released
+
+
+def claim_rows(demand, customer):
+    """
+    Locks the demanded rows plus those the customer already holds,
+    then drops the customer's holds and any expired ones on these
+    rows. Returns the stock now available per row.
+    """
+    rows = {kind: set(demand[kind]) for kind in STOCK_COLUMNS}
+    condition = Q(expires_at__lte=timezone.now())
+
+    if customer:
+        own = StockReservation.objects.filter(customer=customer)
+
+        for kind, ids in rows_of(own).items():
+            rows[kind] |= ids
+
+    available = lock_stock(rows)
+    condition &= rows_filter(rows)
+
+    if customer:
+        condition |= Q(customer=customer)
+
+    released = release_holds(condition)
+
+    for kind in STOCK_COLUMNS:
+        for pk, qty in released[kind].items():
+            available[kind][pk] = available[kind].get(pk, 0) + qty
+
+    return available
+
+
+@transaction.atomic
+def hold_stock(customer, lines):
+    """
+    Replaces the customer's reservations with holds on `lines` for
+    RESERVATION_MINUTES. Raises InsufficientStock, holding nothing, if
+    the available stock can't cover them. Returns the expiry time.
+    """
+    demand, owners = stock_demand(lines)
+    available = claim_rows(demand, customer)
+
+    shortages = find_shortages(demand, available, owners)
+
+    if shortages:
+        raise InsufficientStock(shortages)
+
+    for kind, (_, _, reserved) in STOCK_COLUMNS.items():
+        adjust(kind, reserved, demand[kind], 1)
+
+    expires_at = timezone.now() + timedelta(minutes=RESERVATION_MINUTES)
+
+    StockReservation.objects.bulk_create([
+        StockReservation(
+            customer=customer,
+            item=owners[(kind, pk)],
+            variant_id=pk if kind == "variant" else None,
+            quantity=qty,
+            expires_at=expires_at
+        )
+        for kind in STOCK_COLUMNS
+        for pk, qty in demand[kind].items()
+    ])
+
+    return expires_at
+
+
+def reserve_stock(lines, customer=None):
+    """
+    Takes the stock for a checkout, converting the customer's
+    reservations into the decrement. Call inside the order's
+    transaction: on InsufficientStock the caller's rollback restores
+    the holds and releases the locks.
+    """
+    demand, owners = stock_demand(lines)
+    available = claim_rows(demand, customer)
+
+    shortages = find_shortages(demand, available, owners)
+
+    if shortages:
+        raise InsufficientStock(shortages)
+
+    # Without row locks (SQLite) a concurrent writer can get in between
+    # the read and the conditional update. The savepoint undoes this
+    # call's own decrements before the shortages are read back, so
+    # only the lines the other writer took show up.
+    savepoint = (
+        nullcontext() if connection.features.has_select_for_update
+        else transaction.atomic()
+    )
+
+    try:
+        with savepoint:
+            for kind, (_, stock, _) in STOCK_COLUMNS.items():
+                if adjust(kind, stock, demand[kind], -1, guarded=True) != len(demand[kind]):
+                    raise InsufficientStock([])
+
+    except InsufficientStock:
+        raise InsufficientStock(stock_shortages(lines))
+
+    stock_changed(demand)
+
+
+def release_stock(lines):
+    """Puts the stock of cancelled lines back, in the same lock order."""
+    demand, _ = stock_demand(lines)
+
+    lock_stock(demand)
+
+    for kind, (_, stock, _) in STOCK_COLUMNS.items():
+        adjust(kind, stock, demand[kind], 1)
+
+    stock_changed(demand)
+
+
+def release_expired(batch=SWEEP_BATCH):
+    """
+    Releases up to `batch` expired reservations (and any other expired
+    ones on the same rows) in one transaction. Returns the units freed.
+    """
+    with transaction.atomic():
+        expired = StockReservation.objects.filter(
+            expires_at__lte=timezone.now()
+        ).order_by("expires_at")[:batch]
+
+        rows = rows_of(expired)
+
+        if not rows["item"] and not rows["variant"]:
+            return 0
+
+        lock_stock(rows)
+
+        released = release_holds(
+            Q(expires_at__lte=timezone.now()) & rows_filter(rows)
+        )
+
+    return sum(
+        qty
+        for kind in STOCK_COLUMNS
+        for qty in released[kind].values()
+    )
+
+
+def stock_changed(demand):
+    # update() sends no post_save; refresh the storefront snapshots
+    # that show stock once the transaction commits. Stock only: the
+    # category index stays as it is
+    if demand["item"] or demand["variant"]:
+        schedule_refresh(
+            item_ids=demand["item"],
+            variant_ids=demand["variant"],
+            stock_only=True
+        )
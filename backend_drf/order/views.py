@@ -1,7 +1,10 @@
 import uuid
-from api.views import CustomerJWTAuthentication
+from api.authentication import CustomerJWTAuthentication
 from api.utils.file_upload import upload_file_to_s3
-from api.utils.tax_calculator import calculate_item_values
+from api.utils.tax_engine import GST_COMPONENTS
+from api.utils.gst import place_of_supply
+from api.utils.pagination import KeysetPagination
+from api.utils.idempotency import idempotent
 from users.permissions import IsUserOrAdmin
 from business_entity.models import BusinessEntity
 from rest_framework import generics, status, serializers
@@ -10,27 +13,34 @@ from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
 from django.db.models import Q
 from .models import Cart, CartItem, Order, OrderItem, Payment
+from .stock import InsufficientStock, hold_stock, release_stock, reserve_stock
 from products.models import Item, ItemVariant
 from customers.models import Customer
-from .serializers import CartSerializer, OrderItemSerializer, OrderSerializer, OrderStatusUpdateSerializer
+from .cart import MAX_OPERATIONS, CartError, apply_cart_operations, cart_lines, cart_view, load_cart, price_lines
+from .serializers import OrderItemSerializer, OrderSerializer, OrderStatusUpdateSerializer, with_order_relations
 from datetime import date
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 
+
 class OrderListView(generics.ListAPIView):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated, IsUserOrAdmin]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-created_at", "-id")
+
+    # e.g. ?payment_status=Unpaid
+    filterset_fields = ["payment_status"]
 
     def get_queryset(self):
-        user = self.request.user
+        business = self.request.business
 
-        if not user.active_business:
+        if not business:
             return Order.objects.none()
 
-        return (
+        return with_order_relations(
             Order.objects
-            .filter(business=user.active_business)
-            .prefetch_related('order_items')   
+            .filter(business=business)
             .order_by('-created_at')
         )
 
@@ -41,15 +51,14 @@ class OrderDetailView(generics.RetrieveAPIView):
     lookup_field = 'order_number'
 
     def get_queryset(self):
-        user = self.request.user
+        business = self.request.business
 
-        if not user.active_business:
+        if not business:
             return Order.objects.none()
 
-        return (
+        return with_order_relations(
             Order.objects
-            .filter(business=user.active_business)
-            .prefetch_related('order_items', 'payments')   
+            .filter(business=business)
             .order_by('-created_at')
         )
 
@@ -59,19 +68,23 @@ class OrderItemListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated, IsUserOrAdmin]
 
     def get_queryset(self):
-        user = self.request.user
+        business = self.request.business
         order_number = self.kwargs.get('order_number')  # ✅ FIX
 
-        if not user.active_business:
+        if not business:
             return OrderItem.objects.none()
 
         order = get_object_or_404(
             Order,
             order_number=order_number,
-            business=user.active_business
+            business=business
         )
 
-        return order.order_items.select_related('item')
+        return (
+            order.order_items
+            .select_related('variant')
+            .prefetch_related('variant__attributes', 'variant__images')
+        )
     
 
 class UpdateOrderStatusView(APIView):
@@ -81,7 +94,7 @@ class UpdateOrderStatusView(APIView):
         serializer = OrderStatusUpdateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        if not request.user.active_business:
+        if not request.business:
             return Response(
                 {"error": "No active business selected"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -90,7 +103,7 @@ class UpdateOrderStatusView(APIView):
         order = get_object_or_404(
             Order,
             order_number=order_number,
-            business=request.user.active_business
+            business=request.business
         )
 
         order.status = serializer.validated_data["status"]
@@ -107,7 +120,7 @@ class UpdatePaymentStatusView(APIView):
     permission_classes = [IsAuthenticated, IsUserOrAdmin]
 
     def patch(self, request, order_number):
-        if not request.user.active_business:
+        if not request.business:
             return Response(
                 {"error": "No active business selected"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -124,7 +137,7 @@ class UpdatePaymentStatusView(APIView):
         order = get_object_or_404(
             Order,
             order_number=order_number,
-            business=request.user.active_business
+            business=request.business
         )
 
         payment = order.payments.last()
@@ -225,20 +238,12 @@ class AddToCartView(generics.GenericAPIView):
             "quantity": cart_item.quantity
         }, status=200)
 
-class ViewCartView(generics.RetrieveAPIView):
-    serializer_class = CartSerializer
+class ViewCartView(APIView):
     authentication_classes = [CustomerJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
-    def get_object(self):
-        customer = self.request.user
-        business = customer.business
-
-        cart, _ = Cart.objects.get_or_create(
-            customer=customer,
-            business=business
-        )
-        return cart
+    def get(self, request):
+        return Response(cart_view(request.user, request.business))
 
 
 
@@ -246,7 +251,7 @@ from decimal import Decimal, ROUND_HALF_UP
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from api.views import CustomerJWTAuthentication
+from api.authentication import CustomerJWTAuthentication
 from .models import Cart
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.db import transaction
@@ -271,6 +276,10 @@ class CheckoutPreviewView(APIView):
             item_id = request.query_params.get("item_id")
             try:
                 quantity = int(request.query_params.get("quantity", 1))
+
+                if quantity < 1:
+                    return Response({"error": "Invalid quantity"}, status=400)
+
                 item = Item.objects.get(id=item_id, business=business)
                 variant = None
 
@@ -294,98 +303,56 @@ class CheckoutPreviewView(APIView):
                 return Response({"error": "Invalid item or quantity for Buy Now"}, status=400)
         else:
             # --- NORMAL CART LOGIC ---
-            try:
-                cart = Cart.objects.get(customer=customer, business=business)
-                cart_items = cart.items.select_related("item")
-                
-                if not cart_items.exists():
-                    return Response({"error": "Cart is empty"}, status=400)
-                    
-                for ci in cart_items:
-                    items_to_process.append({
-                        "item": ci.item,
-                        "variant": ci.variant,
-                        "quantity": ci.quantity
-                    })
+            cart_items = cart_lines(load_cart(customer, business, display=False))
 
-                    for data in items_to_process:
-                        item = data["item"]
-                        variant = data["variant"]
-                        qty = data["quantity"]
-                    
-            except Cart.DoesNotExist:
+            if not cart_items:
                 return Response({"error": "Cart is empty"}, status=400)
 
+            for ci in cart_items:
+                items_to_process.append({
+                    "item": ci.item,
+                    "variant": ci.variant,
+                    "quantity": ci.quantity
+                })
 
-        # ---------------- TOTALS ----------------
-        total_base = Decimal("0.00")
-        total_discount = Decimal("0.00")
-        total_taxable = Decimal("0.00")
-        total_tax = Decimal("0.00")
-        total_final = Decimal("0.00")
-
-        items = []
-
-        # ---------------- LOOP ----------------
-        for data in items_to_process:
-            item = data["item"]
-            variant = data["variant"]
-            qty = data["quantity"]
-
-            if item.item_type == "Goods":
-
-                if variant:
-                    if variant.stock < qty:
-                        return Response(
-                            {"error": f"Not enough stock for {item.item_name}"},
-                            status=400
-                        )
-
-                else:
-                    if item.quantity_product < qty:
-                        return Response(
-                            {"error": f"Not enough stock for {item.item_name}"},
-                            status=400
-                        )
-                return Response(
-                    {"error": f"Not enough stock for {item.item_name}"},
-                    status=400
-                )
 
-            values = calculate_item_values(
-                price = (
-                    variant.selling_price
-                    if variant
-                    else item.gross_amount
-                ),
-                qty=qty,
-                discount_percent=getattr(item, "discount_percent", 0),
-                tax_percent=item.tax_percent,
-                includes_tax=business.price_includes_tax
-            )
+        # ---------------- STOCK ----------------
+        # Hold the stock until the order is placed or the hold expires
+        try:
+            reserved_until = hold_stock(customer, [
+                (data["item"], data["variant"], data["quantity"])
+                for data in items_to_process
+            ])
+        except InsufficientStock as e:
+            return Response({
+                "error": e.message,
+                "out_of_stock": e.shortages
+            }, status=400)
 
-            items.append({
-                "item_id": item.id,
-                "name": item.item_name,
-                "qty": qty,
+        # ---------------- TOTALS ----------------
+        document = price_lines(business, customer, [
+            (data["item"], data["variant"], data["quantity"])
+            for data in items_to_process
+        ])
+
+        items = [
+            {
+                "item_id": data["item"].id,
+                "name": data["item"].item_name,
+                "qty": data["quantity"],
                 **values
-            })
-
-            total_base += values["base_amount"]
-            total_discount += values["discount_amount"]
-            total_taxable += values["taxable_amount"]
-            total_tax += values["tax_amount"]
-            total_final += values["total_value"]
+            }
+            for data, values in zip(items_to_process, document["lines"])
+        ]
 
-        # ---------------- ROUNDING ----------------
-        total_base = total_base.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        total_discount = total_discount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        total_taxable = total_taxable.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        total_tax = total_tax.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        total_final = total_final.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        total_base = document["total_base_amount"]
+        total_discount = document["discount_amount"]
+        total_taxable = document["total_taxable_amount"]
+        total_tax = document["total_tax"]
+        total_final = document["total_value"]
 
-        net_payable = total_final.quantize(Decimal("1"), rounding=ROUND_HALF_UP)
-        round_off = (net_payable - total_final).quantize(Decimal("0.01"))
+        net_payable = document["net_payable"]
+        round_off = document["round_off"]
 
         
         # ---------------- PAYMENT CONFIG ----------------
@@ -442,6 +409,12 @@ class CheckoutPreviewView(APIView):
             "total_value": total_final,
             "round_off": round_off,
             "net_payable": net_payable,
+            "is_inter_state": document["is_inter_state"],
+            **{
+                f"total_{name}": document[f"total_{name}"]
+                for name in GST_COMPONENTS
+            },
+            "reserved_until": reserved_until,
 
             "payment": payment_data
         })
@@ -453,7 +426,7 @@ class CheckoutView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
-    @transaction.atomic
+    @idempotent
     def post(self, request):
         customer = request.user
         business = customer.business
@@ -464,7 +437,34 @@ class CheckoutView(APIView):
 
         # ✅ UPI PROOF FILE
         payment_proof_file = request.FILES.get("payment_proof")
+        payment_proof_url = None
+
+        if payment_method == "UPI":
+            if not payment_proof_file:
+                return Response(
+                    {"error": "Payment proof required for UPI"},
+                    status=400
+                )
+
+            # Upload before the order transaction so the stock and cart
+            # locks aren't held for the S3 round trip
+            payment_proof_url = upload_file_to_s3(
+                payment_proof_file,
+                folder_name="payment_proofs"
+            )
+
+        try:
+            return self.place_order(
+                request, customer, business, payment_method, payment_proof_url
+            )
+        except InsufficientStock as e:
+            return Response({
+                "error": e.message,
+                "out_of_stock": e.shortages
+            }, status=400)
 
+    @transaction.atomic
+    def place_order(self, request, customer, business, payment_method, payment_proof_url):
         # ---------------- CHECKOUT MODE: BUY NOW vs CART ----------------
         # Because of MultiPartParser, booleans often come through as strings like "true"
         is_buy_now = str(request.data.get("is_buy_now", "false")).lower() == "true"
@@ -477,6 +477,10 @@ class CheckoutView(APIView):
             item_id = request.data.get("item_id")
             try:
                 quantity = int(request.data.get("quantity", 1))
+
+                if quantity < 1:
+                    return Response({"error": "Invalid quantity"}, status=400)
+
                 # Fetch just this single item
                 # Assuming you have an Item model imported
                 item = Item.objects.get(id=item_id, business=business) 
@@ -488,7 +492,9 @@ class CheckoutView(APIView):
                     if not variant_id:
                         return Response({"error": "Variant required"}, status=400)
 
-                    variant = ItemVariant.objects.get(
+                    variant = ItemVariant.objects.prefetch_related(
+                        "attributes"
+                    ).get(
                         uid=variant_id,
                         item=item
                     )
@@ -507,8 +513,14 @@ class CheckoutView(APIView):
                     customer=customer,
                     business=business
                 )
-                cart_items = cart.items.select_related("item")
-                if not cart_items.exists():
+                # One query for the lines, one for every variant's
+                # attributes (display names)
+                cart_items = list(
+                    cart.items
+                    .select_related("item", "variant")
+                    .prefetch_related("variant__attributes")
+                )
+                if not cart_items:
                     return Response({"error": "Cart empty"}, status=400)
                 
                 # Add all cart items to our processing list
@@ -518,84 +530,35 @@ class CheckoutView(APIView):
                         "variant": ci.variant,
                         "quantity": ci.quantity
                     })
-
-                    for data in items_to_process:
-                        item = data["item"]
-                        variant = data["variant"]
-                        qty = data["quantity"]
             except Cart.DoesNotExist:
                 return Response({"error": "Cart empty"}, status=400)
 
 
-        # ---------------- TOTALS ----------------
-        totals = {
-            "base": Decimal("0.00"),
-            "discount": Decimal("0.00"),
-            "taxable": Decimal("0.00"),
-            "tax": Decimal("0.00"),
-            "final": Decimal("0.00"),
-        }
-
-        order_items_data = []
-
         # ---------------- CALCULATION ----------------
-        # Now we loop through `items_to_process` regardless of where they came from
-        for data in items_to_process:
-            item = data["item"]
-            variant = data["variant"]
-            qty = data["quantity"]
-
-            if item.item_type == "Goods":
-
-                if variant:
-                    if variant.stock < qty:
-                        return Response(
-                            {"error": f"Not enough stock for {item.item_name}"},
-                            status=400
-                        )
-
-                else:
-                    if item.quantity_product < qty:
-                        return Response(
-                            {"error": f"Not enough stock for {item.item_name}"},
-                            status=400
-                        )
-                return Response(
-                    {"error": f"Not enough stock for {item.item_name}"},
-                    status=400
-                )
-
-            values = calculate_item_values(
-                # price = (
-                #     variant.selling_price
-                #     if variant
-                #     else item.gross_amount
-                # )
-                qty=qty,
-                discount_percent=getattr(item, "discount_percent", 0),
-                tax_percent=item.tax_percent,
-                includes_tax=business.price_includes_tax
-            )
-
-            order_items_data.append((item, variant, qty, values))
-
-            totals["base"] += values["base_amount"]
-            totals["discount"] += values["discount_amount"]
-            totals["taxable"] += values["taxable_amount"]
-            totals["tax"] += values["tax_amount"]
-            totals["final"] += values["total_value"]
-
-        # ---------------- ROUNDING ----------------
-        totals = {
-            k: v.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            for k, v in totals.items()
-        }
-
-        net_payable = totals["final"].quantize(Decimal("1"), rounding=ROUND_HALF_UP)
-        round_off = (net_payable - totals["final"]).quantize(
-            Decimal("0.01"), rounding=ROUND_HALF_UP
+        # Now we price `items_to_process` regardless of where they came from
+        document = price_lines(business, customer, [
+            (data["item"], data["variant"], data["quantity"])
+            for data in items_to_process
+        ])
+
+        order_items_data = [
+            (data["item"], data["variant"], data["quantity"], values)
+            for data, values in zip(items_to_process, document["lines"])
+        ]
+
+        # ---------------- STOCK ----------------
+        # Locks and decrements every stocked line at once; raises
+        # InsufficientStock (rolling the whole order back) otherwise
+        reserve_stock(
+            [
+                (item, variant, qty)
+                for item, variant, qty, _ in order_items_data
+            ],
+            customer=customer
         )
 
+        net_payable = document["net_payable"]
+
         # ---------------- CREATE ORDER ----------------
         order = Order.objects.create(
             business=business,
@@ -603,30 +566,25 @@ class CheckoutView(APIView):
             customer_name=customer.name,
             order_number=f"ORD-{uuid.uuid4().hex[:8].upper()}",
             invoice_id=f"INV-{uuid.uuid4().hex[:8].upper()}",
-            total_base_amount=totals["base"],
-            discount_amount=totals["discount"],
-            total_taxable_amount=totals["taxable"],
-            total_tax=totals["tax"],
-            total_value=totals["final"],
-            round_off=round_off,
+            total_base_amount=document["total_base_amount"],
+            discount_amount=document["discount_amount"],
+            total_taxable_amount=document["total_taxable_amount"],
+            total_tax=document["total_tax"],
+            total_value=document["total_value"],
+            round_off=document["round_off"],
             net_payable=net_payable,
+            place_of_supply=place_of_supply(customer) or "",
+            is_inter_state=document["is_inter_state"],
+            total_cgst=document["total_cgst"],
+            total_sgst=document["total_sgst"],
+            total_igst=document["total_igst"],
+            total_cess=document["total_cess"],
             status="Pending"
         )
 
         # ---------------- CREATE ORDER ITEMS ----------------
-        for item, variant, qty, values in order_items_data:
-            if item.item_type == "Goods":
-
-                if variant:
-                    variant.stock -= qty
-                    variant.save(update_fields=["stock"])
-
-                else:
-                    item.quantity_product -= qty
-                    item.save(update_fields=["quantity_product"])
-                
-
-            OrderItem.objects.create(
+        OrderItem.objects.bulk_create([
+            OrderItem(
                 order=order,
                 item=item,
                 variant=variant,
@@ -646,26 +604,17 @@ class CheckoutView(APIView):
                 base_amount=values["base_amount"],
                 taxable_amount=values["taxable_amount"],
                 total_value=values["total_value"],
-            )        
+                cess_percent=item.cess_percent if business.tax_type == "GST" else 0,
+                cgst_amount=values["cgst_amount"],
+                sgst_amount=values["sgst_amount"],
+                igst_amount=values["igst_amount"],
+                cess_amount=values["cess_amount"],
+            )
+            for item, variant, qty, values in order_items_data
+        ])
             
         # ---------------- PAYMENT LOGIC ----------------
         payment_status = "Pending"
-        payment_proof_url = None
-
-        if payment_method == "CASH":
-            payment_status = "Pending"
-
-        elif payment_method == "UPI":
-            if not payment_proof_file:
-                return Response(
-                    {"error": "Payment proof required for UPI"},
-                    status=400
-                )
-
-            payment_proof_url = upload_file_to_s3(
-                payment_proof_file,
-                folder_name="payment_proofs"
-            )
 
         Payment.objects.create(
             order=order,
@@ -676,22 +625,17 @@ class CheckoutView(APIView):
         )
 
         # ---------------- CLEAR CART OR REMOVE BUY NOW ITEM ----------------
-        try:
-            # Grab the user's cart
-            user_cart = Cart.objects.get(customer=customer, business=business)
-            
-            if is_buy_now:
-                # If they used Buy Now, ONLY delete the specific item they just bought
-                user_cart.items.filter(
-                    item_id=item_id,
-                    variant=variant
-                ).delete()
-            else:
-                # If they used normal checkout, clear the whole cart
-                user_cart.items.all().delete()
-                
-        except Cart.DoesNotExist:
-            pass # No cart to clean up, which is fine
+        if is_buy_now:
+            # If they used Buy Now, ONLY delete the specific item they just bought
+            CartItem.objects.filter(
+                cart__customer=customer,
+                cart__business=business,
+                item_id=item_id,
+                variant=variant
+            ).delete()
+        else:
+            # If they used normal checkout, clear the whole cart
+            cart.items.all().delete()
 
         return Response({
             "message": "Order placed successfully",
@@ -702,6 +646,7 @@ class CheckoutView(APIView):
     
 
     
+
 import requests
 from django.conf import settings
 import hmac
@@ -713,33 +658,36 @@ class CreateRazorpayOrderView(APIView):
     authentication_classes = [CustomerJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         customer = request.user
         business = customer.business
 
         cart = Cart.objects.get(customer=customer, business=business)
-        cart_items = cart.items.select_related("item")
+        cart_items = cart.items.select_related("item", "variant")
 
         if not cart_items.exists():
             return Response({"error": "Cart empty"}, status=400)
 
-        total_amount = Decimal("0.00")
-
-        for ci in cart_items:
-            values = calculate_item_values(
-                price=(
-                    ci.variant.selling_price
-                    if ci.variant
-                    else ci.item.gross_amount
-                ),
-                qty=ci.quantity,
-                discount_percent=getattr(ci.item, "discount_percent", 0),
-                tax_percent=ci.item.tax_percent,
-                includes_tax=business.price_includes_tax
-            )
-            total_amount += values["total_value"]
-
-        total_amount = total_amount.quantize(Decimal("1"))
+        # Hold the stock while the customer is at the gateway
+        try:
+            hold_stock(customer, [
+                (ci.item, ci.variant, ci.quantity)
+                for ci in cart_items
+            ])
+        except InsufficientStock as e:
+            return Response({
+                "error": e.message,
+                "out_of_stock": e.shortages
+            }, status=400)
+
+        document = price_lines(business, customer, [
+            (ci.item, ci.variant, ci.quantity)
+            for ci in cart_items
+        ])
+
+        # Charge exactly what checkout will record as net_payable
+        total_amount = document["net_payable"]
 
         # 🔐 Razorpay client (USE BUSINESS KEYS)
         client = razorpay.Client(auth=(
@@ -804,33 +752,35 @@ class CreatePaypalOrderView(APIView):
     authentication_classes = [CustomerJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         customer = request.user
         business = customer.business
 
         cart = Cart.objects.get(customer=customer, business=business)
-        cart_items = cart.items.select_related("item")
+        cart_items = cart.items.select_related("item", "variant")
 
         if not cart_items.exists():
             return Response({"error": "Cart empty"}, status=400)
 
-        total_amount = Decimal("0.00")
-
-        for ci in cart_items:
-            values = calculate_item_values(
-                price=(
-                    ci.variant.selling_price
-                    if ci.variant
-                    else ci.item.gross_amount
-                ),
-                qty=ci.quantity,
-                discount_percent=getattr(ci.item, "discount_percent", 0),
-                tax_percent=ci.item.tax_percent,
-                includes_tax=business.price_includes_tax
-            )
-            total_amount += values["total_value"]
-
-        total_amount = total_amount.quantize(Decimal("0.01"))
+        # Hold the stock while the customer is at the gateway
+        try:
+            hold_stock(customer, [
+                (ci.item, ci.variant, ci.quantity)
+                for ci in cart_items
+            ])
+        except InsufficientStock as e:
+            return Response({
+                "error": e.message,
+                "out_of_stock": e.shortages
+            }, status=400)
+
+        document = price_lines(business, customer, [
+            (ci.item, ci.variant, ci.quantity)
+            for ci in cart_items
+        ])
+
+        total_amount = document["total_value"]
 
         # 🔐 GET PAYPAL ACCESS TOKEN
         auth = (business.payment_config.gateway_public_key, business.payment_config.gateway_secret_key)
@@ -928,7 +878,7 @@ class CancelOrderView(APIView):
         customer = request.user
 
         try:
-            order = Order.objects.get(
+            order = Order.objects.select_for_update().get(
                 order_number=order_number,
                 customer=customer,
                 business=customer.business
@@ -943,16 +893,10 @@ class CancelOrderView(APIView):
             )
 
         # 🔁 Restore stock
-        for order_item in order.order_items.all():
-
-            if order_item.variant:
-                order_item.variant.stock += order_item.quantity
-                order_item.variant.save(update_fields=["stock"])
-
-            else:
-                product = order_item.item
-                product.quantity_product += order_item.quantity
-                product.save(update_fields=["quantity_product"])
+        release_stock(
+            (order_item.item, order_item.variant, order_item.quantity)
+            for order_item in order.order_items.select_related("item", "variant")
+        )
 
         order.status = "Cancelled"
         order.save()
@@ -967,10 +911,12 @@ class CustomerOrderHistoryView(generics.ListAPIView):
 
     def get_queryset(self):
         customer = self.request.user
-        return Order.objects.filter(
-            customer=customer,
-            business=customer.business
-        ).order_by('-created_at')
+        return with_order_relations(
+            Order.objects.filter(
+                customer=customer,
+                business=customer.business
+            ).order_by('-created_at')
+        )
 
 class UpdateCartItemView(APIView):
     authentication_classes = [CustomerJWTAuthentication]
@@ -1017,3 +963,96 @@ class UpdateCartItemView(APIView):
         return Response({"message": "Cart updated"})
 
 
+class BatchCartView(APIView):
+    """
+    Applies many cart operations in one transaction:
+    {"operations": [{"action": "add" | "set" | "remove", "item": id,
+    "variant": uid, "quantity": n}, ...], "partial": false}.
+
+    All or nothing by default; with "partial" the operations that can't
+    be applied are skipped and listed. Answers with the cart.
+    """
+    authentication_classes = [CustomerJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        customer = request.user
+        business = request.business
+        operations = request.data.get("operations")
+
+        if not isinstance(operations, list) or not operations:
+            return Response({"error": "operations must be a non-empty list"}, status=400)
+
+        if len(operations) > MAX_OPERATIONS:
+            return Response(
+                {"error": f"At most {MAX_OPERATIONS} operations per request"},
+                status=400
+            )
+
+        partial = str(request.data.get("partial", "false")).lower() == "true"
+
+        try:
+            skipped = apply_cart_operations(customer, business, operations, partial=partial)
+        except CartError as e:
+            return Response({
+                "error": e.message,
+                "errors": e.errors
+            }, status=400)
+
+        return Response({**cart_view(customer, business), "skipped": skipped})
+
+
+class ReorderView(APIView):
+    """
+    Adds every line of a past order to the cart, at today's prices.
+    Lines that are gone or out of stock are left out and listed under
+    "unavailable"; the rest are added. Answers with the cart.
+    """
+    authentication_classes = [CustomerJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, order_number):
+        customer = request.user
+        business = request.business
+
+        lines = list(
+            OrderItem.objects
+            .filter(
+                order__order_number=order_number,
+                order__customer=customer,
+                order__business=business
+            )
+            .order_by("id")
+            .values("item_id", "variant__uid", "item_name", "variant_name", "quantity")
+        )
+
+        if not lines:
+            return Response({"error": "Order not found"}, status=404)
+
+        skipped = apply_cart_operations(customer, business, [
+            {
+                "action": "add",
+                "item": line["item_id"],
+                "variant": line["variant__uid"],
+                "quantity": line["quantity"],
+            }
+            for line in lines
+        ], partial=True)
+
+        unavailable = []
+
+        for error in skipped:
+            line = lines[error.pop("index")]
+            error.pop("name", None)
+
+            unavailable.append({
+                **error,
+                "item_id": line["item_id"],
+                "item_name": line["item_name"],
+                "variant_name": line["variant_name"],
+                "quantity": line["quantity"],
+            })
+
+        return Response({**cart_view(customer, business), "unavailable": unavailable})
+
+
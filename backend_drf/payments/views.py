@@ -14,9 +14,9 @@ class BusinessPaymentConfigView(APIView):
     parser_classes = (MultiPartParser, FormParser)
 
     def get_active_business(self, request):
-        if not request.user.active_business:
+        if not request.business:
             return None
-        return request.user.active_business
+        return request.business
 
     def get(self, request):
         business = self.get_active_business(request)
@@ -0,0 +1,273 @@
+from django.db import connection, transaction
+from django.db.models import F, Max, Min, Prefetch
+from django.utils import timezone
+
+from api.utils.on_commit import pending_batch
+from business_entity.models import BusinessEntity
+
+from .models import BusinessCatalog, Item, ItemSnapshot, ItemVariant
+from .serializers import ItemSnapshotSerializer
+
+
+SNAPSHOT_FIELDS = [
+    "business",
+    "slug",
+    "item_type",
+    "is_visible",
+    "best_selling",
+    "trending",
+    "created_date",
+    "payload",
+]
+
+# Items serialized per query batch during a full rebuild
+REBUILD_BATCH = 500
+
+
+# ---------------------------------------------------------
+# Rebuilding
+# ---------------------------------------------------------
+
+def snapshot_queryset():
+    return Item.objects.prefetch_related(
+        Prefetch(
+            "variants",
+            queryset=ItemVariant.objects.prefetch_related(
+                "attributes",
+                "images"
+            )
+        )
+    )
+
+
+def rebuild_item_snapshots(item_ids):
+    """
+    Re-serializes the given items into their snapshots. Ids whose item
+    no longer exists are skipped; the snapshot went with the item.
+    Returns the ids of the businesses touched.
+    """
+    item_ids = list(item_ids)
+    business_ids = set()
+
+    for start in range(0, len(item_ids), REBUILD_BATCH):
+        items = snapshot_queryset().filter(
+            id__in=item_ids[start:start + REBUILD_BATCH]
+        )
+
+        snapshots = []
+
+        for item in items:
+            business_ids.add(item.business_id)
+
+            snapshots.append(ItemSnapshot(
+                item=item,
+                business_id=item.business_id,
+                slug=item.slug,
+                item_type=item.item_type,
+                is_visible=item.isShow,
+                best_selling=item.best_selling,
+                trending=item.trending,
+                created_date=item.created_date,
+                payload=ItemSnapshotSerializer(item).data,
+            ))
+
+        ItemSnapshot.objects.bulk_create(
+            snapshots,
+            update_conflicts=True,
+            unique_fields=["item"],
+            update_fields=SNAPSHOT_FIELDS + ["updated_at"],
+        )
+
+    return business_ids
+
+
+def rebuild_category_index(business_id):
+    """
+    Recomputes the category index and bumps the catalog version, which
+    invalidates every cached storefront response of the business.
+    """
+    categories = [
+        {
+            "category": c["category"],
+            "category_image_url": c["category_image_url"]
+        }
+        for c in (
+            Item.objects
+            .filter(business_id=business_id, isShow=True)
+            .values("category")
+            .annotate(
+                first_id=Min("id"),
+                category_image_url=Max("category_image_url")
+            )
+            .order_by("first_id")
+        )
+    ]
+
+    updated = BusinessCatalog.objects.filter(
+        business_id=business_id
+    ).update(
+        categories=categories,
+        version=F("version") + 1,
+        updated_at=timezone.now()
+    )
+
+    # A business deleted in the refreshed transaction has no catalog
+    if not updated and BusinessEntity.objects.filter(id=business_id).exists():
+        BusinessCatalog.objects.get_or_create(
+            business_id=business_id,
+            defaults={"categories": categories}
+        )
+
+
+def bump_catalog_version(business_id):
+    updated = BusinessCatalog.objects.filter(
+        business_id=business_id
+    ).update(
+        version=F("version") + 1,
+        updated_at=timezone.now()
+    )
+
+    if not updated and BusinessEntity.objects.filter(id=business_id).exists():
+        BusinessCatalog.objects.get_or_create(business_id=business_id)
+
+
+def rebuild_business_catalog(business_id):
+    item_ids = Item.objects.filter(
+        business_id=business_id
+    ).values_list("id", flat=True)
+
+    with transaction.atomic():
+        rebuild_item_snapshots(item_ids)
+        rebuild_category_index(business_id)
+
+        BusinessCatalog.objects.filter(
+            business_id=business_id
+        ).update(built_at=timezone.now())
+
+    return BusinessCatalog.objects.get(business_id=business_id)
+
+
+def ensure_catalog(business):
+    """
+    Builds the catalog of a business the first time it is served, so
+    existing shops don't need a separate backfill before going live.
+    """
+    try:
+        catalog = business.catalog
+    except BusinessCatalog.DoesNotExist:
+        catalog = None
+
+    if catalog is None or catalog.built_at is None:
+        catalog = rebuild_business_catalog(business.id)
+
+    return catalog
+
+
+def refresh_catalog(item_ids=(), variant_ids=(), business_ids=()):
+    item_ids = set(item_ids)
+    business_ids = set(business_ids)
+
+    if variant_ids:
+        item_ids.update(
+            ItemVariant.objects
+            .filter(id__in=variant_ids)
+            .values_list("item_id", flat=True)
+        )
+
+    business_ids |= rebuild_item_snapshots(item_ids)
+
+    for business_id in business_ids:
+        rebuild_category_index(business_id)
+
+
+def snapshot_payloads(item_ids):
+    return {
+        item_id: (business_id, payload)
+        for item_id, business_id, payload in (
+            ItemSnapshot.objects
+            .filter(item_id__in=item_ids)
+            .values_list("item_id", "business_id", "payload")
+        )
+    }
+
+
+def refresh_stock(item_ids=(), variant_ids=()):
+    """
+    Refreshes the snapshots of items whose stock moved (a sale, a
+    cancellation, a hold) without rebuilding the category index. The
+    catalog version moves whenever a refreshed payload differs, so an
+    ETag never outlives the stock figures it was sent with; changes
+    the payload doesn't show leave cached responses valid.
+    """
+    item_ids = set(item_ids)
+
+    if variant_ids:
+        item_ids.update(
+            ItemVariant.objects
+            .filter(id__in=variant_ids)
+            .values_list("item_id", flat=True)
+        )
+
+    before = snapshot_payloads(item_ids)
+    rebuild_item_snapshots(item_ids)
+    after = snapshot_payloads(item_ids)
+
+    changed = {
+        business_id
+        for item_id, (business_id, payload) in after.items()
+        if before.get(item_id, (None, None))[1] != payload
+    }
+
+    for business_id in changed:
+        bump_catalog_version(business_id)
+
+
+# ---------------------------------------------------------
+# Change tracking
+# ---------------------------------------------------------
+
+class PendingRefresh:
+    """
+    Everything changed inside one transaction, refreshed once after it
+    commits. Saving an item with ten variants rebuilds it once.
+    """
+
+    def __init__(self):
+        self.item_ids = set()
+        self.variant_ids = set()
+        self.business_ids = set()
+        self.stock_item_ids = set()
+        self.stock_variant_ids = set()
+
+    def __call__(self):
+        if self.item_ids or self.variant_ids or self.business_ids:
+            refresh_catalog(self.item_ids, self.variant_ids, self.business_ids)
+
+        # Items the full refresh already rebuilt need no second pass
+        stock_item_ids = self.stock_item_ids - self.item_ids
+
+        if stock_item_ids or self.stock_variant_ids:
+            refresh_stock(stock_item_ids, self.stock_variant_ids)
+
+
+def schedule_refresh(item_ids=(), variant_ids=(), business_ids=(), stock_only=False):
+    """
+    Refreshes the storefront catalog once the transaction commits.
+    `stock_only` changes (sales, holds) go through refresh_stock.
+    """
+    if not connection.in_atomic_block:
+        if stock_only:
+            refresh_stock(item_ids, variant_ids)
+        else:
+            refresh_catalog(item_ids, variant_ids, business_ids)
+        return
+
+    pending = pending_batch(PendingRefresh)
+
+    if stock_only:
+        pending.stock_item_ids.update(item_ids)
+        pending.stock_variant_ids.update(variant_ids)
+    else:
+        pending.item_ids.update(item_ids)
+        pending.variant_ids.update(variant_ids)
+        pending.business_ids.update(business_ids)
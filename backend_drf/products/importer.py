@@ -0,0 +1,511 @@
+import csv
+import time
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from analytics.rollups import schedule_rollup
+from api.utils.barcode_allocator import reserve_barcodes
+
+from .catalog import refresh_catalog
+from .models import Item, ItemVariant, VariantAttribute, VariantImage
+
+
+ITEM_FIELDS = [
+    "item_name",
+    "item_type",
+    "has_variants",
+    "description",
+    "category",
+    "subcategory",
+    "brand_product",
+    "hsn_sac_code_product",
+    "unit_product",
+    "area",
+    "customer_view",
+    "availability_status_service",
+    "tax_percent",
+    "cess_percent",
+    "best_selling",
+    "trending",
+    "isShow",
+    "item_image_url",
+    "item_image_1",
+    "item_image_2",
+    "item_image_3",
+    "item_video_link",
+    "category_image_url",
+    "subcategory_image_url",
+    "quantity_product",
+    "min_stock_product",
+    "mrp_baseprice",
+    "gross_amount",
+    "cost_price_product",
+    "min_order_quantity_product",
+    "max_order_quantity_product",
+    "barcode",
+]
+
+VARIANT_FIELDS = [
+    "variant_name",
+    "stock",
+    "min_stock",
+    "mrp_base",
+    "selling_price",
+    "cost_price",
+    "min_order_quantity",
+    "max_order_quantity",
+    "is_active",
+    "barcode",
+    "updated_at",
+]
+
+MAX_ATTRIBUTES = 10
+MAX_IMAGES = 10
+
+
+def to_bool(value, default="FALSE"):
+    return (value or default).strip().upper() == "TRUE"
+
+
+def to_int(value, default=0):
+    try:
+        return int(float(value.strip())) if value and value.strip() else default
+    except ValueError:
+        return default
+
+
+def to_decimal(value, default=0):
+    try:
+        return Decimal(value.strip()) if value and value.strip() else Decimal(default)
+    except InvalidOperation:
+        return Decimal(default)
+
+
+def read_chunks(csv_file, chunk_size):
+    """
+    Yields lists of (row_number, row) from the CSV.
+
+    A chunk is only ever cut in front of a parent row (a row with an
+    Item Name), so variant rows always travel with their parent item.
+    """
+    reader = csv.DictReader(csv_file)
+    chunk = []
+
+    for row_number, row in enumerate(reader, start=2):
+        is_parent = bool((row.get("Item Name") or "").strip())
+
+        if is_parent and len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+        chunk.append((row_number, row))
+
+    if chunk:
+        yield chunk
+
+
+class CatalogImporter:
+    """
+    Set-based catalog import for one business.
+
+    Existing slugs, SKUs and barcodes are loaded once up front, every
+    chunk is written with a handful of bulk statements inside its own
+    short transaction, and per-chunk counters are reported back.
+    """
+
+    def __init__(self, business, chunk_size=500):
+        self.business = business
+        self.chunk_size = chunk_size
+
+        # slug -> Item id
+        self.item_ids = dict(
+            Item.objects
+            .filter(business=business)
+            .values_list("slug", "id")
+        )
+
+        # (item id, sku) -> ItemVariant id
+        self.variant_ids = {
+            (item_id, sku): pk
+            for pk, item_id, sku in (
+                ItemVariant.objects
+                .filter(item__business=business)
+                .values_list("id", "item_id", "sku")
+            )
+        }
+
+        # Item id -> barcode, so updates never rotate an existing code
+        self.item_barcodes = dict(
+            Item.objects
+            .filter(business=business, barcode__isnull=False)
+            .values_list("id", "barcode")
+        )
+
+        self.variant_barcodes = dict(
+            ItemVariant.objects
+            .filter(item__business=business, barcode__isnull=False)
+            .values_list("id", "barcode")
+        )
+
+    # ---------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------
+
+    def build_item(self, row):
+        item_name = row.get("Item Name", "").strip()
+        provided_slug = (row.get("Item Slug") or "").strip()
+        item_type = (row.get("Item Type") or "Goods").strip() or "Goods"
+
+        if item_type not in ["Goods", "Service"]:
+            raise ValueError(f"Invalid Item Type '{item_type}'.")
+
+        slug = slugify(provided_slug or item_name)
+
+        if not slug:
+            raise ValueError("Item Slug could not be generated.")
+
+        has_variants = to_bool(row.get("Has Variants"))
+
+        if item_type == "Service":
+            has_variants = False
+
+        item = Item(
+            business=self.business,
+            slug=slug,
+            item_name=item_name,
+            item_type=item_type,
+            has_variants=has_variants,
+            description=row.get("Description", ""),
+            category=row.get("Category", ""),
+            subcategory=row.get("Subcategory", ""),
+            brand_product=row.get("Brand", ""),
+            hsn_sac_code_product=row.get("HSN", ""),
+            unit_product=row.get("Unit", "Pcs"),
+            area=row.get("Area", ""),
+            customer_view=row.get("Customer View", "General"),
+            availability_status_service=row.get("Availability Status", "Available"),
+
+            tax_percent=to_decimal(row.get("Tax %")),
+            cess_percent=to_decimal(row.get("Cess %")),
+            best_selling=to_bool(row.get("Best Selling")),
+            trending=to_bool(row.get("Trending")),
+            isShow=to_bool(row.get("Show")),
+
+            item_image_url=row.get("Main Image", ""),
+            item_image_1=row.get("Image 1", ""),
+            item_image_2=row.get("Image 2", ""),
+            item_image_3=row.get("Image 3", ""),
+            item_video_link=row.get("Video URL", ""),
+            category_image_url=row.get("Category Image", ""),
+            subcategory_image_url=row.get("Subcategory Image", ""),
+
+            quantity_product=to_int(row.get("Stock")),
+            min_stock_product=to_int(row.get("Minimum Stock")),
+            mrp_baseprice=to_decimal(row.get("MRP")),
+            gross_amount=to_decimal(row.get("Selling Price")),
+            cost_price_product=to_decimal(row.get("Cost Price")),
+            min_order_quantity_product=to_int(row.get("Minimum Order"), 1),
+            max_order_quantity_product=to_int(row.get("Maximum Order"), 1),
+        )
+
+        # Same rules as Item.save(), which bulk writes skip
+        if has_variants:
+            item.quantity_product = 0
+            item.min_stock_product = 0
+
+        return item
+
+    def build_variant(self, item, row):
+        variant = ItemVariant(
+            item=item,
+            sku=row.get("Variant SKU", "").strip(),
+            variant_name=row.get("Variant Name", ""),
+            stock=to_int(row.get("Variant Stock")),
+            min_stock=to_int(row.get("Variant Minimum Stock")),
+            mrp_base=to_decimal(row.get("Variant MRP")),
+            selling_price=to_decimal(row.get("Variant Selling Price")),
+            cost_price=to_decimal(row.get("Variant Cost Price")),
+            min_order_quantity=to_int(row.get("Variant Minimum Order"), 1),
+            max_order_quantity=to_int(row.get("Variant Maximum Order"), 1),
+            is_active=to_bool(row.get("Variant Active"), "TRUE"),
+            updated_at=timezone.now(),
+        )
+
+        attributes = {}
+
+        for i in range(1, MAX_ATTRIBUTES + 1):
+            attr_name = (row.get(f"Attr {i} Name") or "").strip()
+            attr_val = (row.get(f"Attr {i} Value") or "").strip()
+
+            if attr_name and attr_val:
+                attributes[attr_name] = attr_val
+
+        images = []
+
+        for i in range(1, MAX_IMAGES + 1):
+            image_url = (row.get(f"Variant Image {i}") or "").strip()
+
+            if image_url and image_url not in images:
+                images.append(image_url)
+
+        return variant, attributes, images
+
+    # ---------------------------------------------------------
+    # Import
+    # ---------------------------------------------------------
+
+    def run(self, csv_file, on_chunk=None):
+        started = time.monotonic()
+
+        summary = {
+            "rows": 0,
+            "items_created": 0,
+            "items_updated": 0,
+            "variants_created": 0,
+            "variants_updated": 0,
+            "attributes_upserted": 0,
+            "images_created": 0,
+        }
+        chunks = []
+        errors = []
+
+        for number, rows in enumerate(read_chunks(csv_file, self.chunk_size), start=1):
+            stats = self.import_chunk(rows, errors)
+            stats["chunk"] = number
+
+            for key in summary:
+                summary[key] += stats[key]
+
+            chunks.append(stats)
+
+            if on_chunk:
+                on_chunk(stats, errors)
+
+        summary["elapsed_ms"] = int((time.monotonic() - started) * 1000)
+        summary["total_errors"] = len(errors)
+
+        return {
+            "summary": summary,
+            "chunks": chunks,
+            "errors": errors,
+        }
+
+    def import_chunk(self, rows, errors):
+        started = time.monotonic()
+
+        stats = {
+            "rows": len(rows),
+            "items_created": 0,
+            "items_updated": 0,
+            "variants_created": 0,
+            "variants_updated": 0,
+            "attributes_upserted": 0,
+            "images_created": 0,
+        }
+
+        # ---------------------------------------------------------
+        # 1. Parse rows into in-memory objects
+        # ---------------------------------------------------------
+        items = {}
+        variants = {}
+        current_item = None
+        parent_row = None
+
+        for row_number, row in rows:
+            try:
+                if (row.get("Item Name") or "").strip():
+                    # A failed item row must not hand its variants to the previous item
+                    current_item = None
+                    parent_row = row_number
+                    item = self.build_item(row)
+
+                    # A repeated slug updates the item already in this chunk
+                    if item.slug in items:
+                        current_item = items[item.slug]
+
+                        for field in ITEM_FIELDS:
+                            setattr(current_item, field, getattr(item, field))
+                    else:
+                        current_item = items[item.slug] = item
+
+                if current_item is None and parent_row and (row.get("Variant SKU") or "").strip():
+                    errors.append(f"Row {row_number}: skipped, its item row {parent_row} failed")
+                    continue
+
+                if not current_item or not current_item.has_variants:
+                    continue
+
+                if (row.get("Variant SKU") or "").strip():
+                    variant, attributes, images = self.build_variant(current_item, row)
+                    variants[(current_item.slug, variant.sku)] = (variant, attributes, images)
+
+            except Exception as e:
+                errors.append(f"Row {row_number}: {str(e)}")
+
+        if not items:
+            stats["elapsed_ms"] = int((time.monotonic() - started) * 1000)
+            return stats
+
+        first_row = rows[0][0]
+        last_row = rows[-1][0]
+
+        # ---------------------------------------------------------
+        # 2. Write the chunk in one short transaction
+        # ---------------------------------------------------------
+        try:
+            with transaction.atomic():
+                self.write_chunk(list(items.values()), list(variants.values()), stats)
+
+            # Only remember new rows once the chunk has committed
+            for item in items.values():
+                self.item_ids[item.slug] = item.id
+
+                if item.barcode:
+                    self.item_barcodes[item.id] = item.barcode
+
+            for variant, _, _ in variants.values():
+                self.variant_ids[(variant.item_id, variant.sku)] = variant.id
+
+                if variant.barcode:
+                    self.variant_barcodes[variant.id] = variant.barcode
+
+        except Exception as e:
+            errors.append(f"Rows {first_row}-{last_row}: {str(e)}")
+
+            for key in stats:
+                if key != "rows":
+                    stats[key] = 0
+
+        else:
+            # Bulk writes send no signals, refresh the storefront and
+            # the product counts here
+            refresh_catalog(item_ids=[item.id for item in items.values()])
+            schedule_rollup(self.business.id, date.today())
+
+        stats["elapsed_ms"] = int((time.monotonic() - started) * 1000)
+        return stats
+
+    def write_chunk(self, items, variants, stats):
+        """
+        Upserts one chunk. Rows that already exist are matched through
+        the preloaded maps only to keep their barcode and to count them;
+        the write itself is a single INSERT ... ON CONFLICT DO UPDATE per
+        table, which is far cheaper than bulk_update's per-column CASE.
+        """
+
+        # ---------------- Items ----------------
+        items_updated = 0
+        needs_barcode = []
+
+        for item in items:
+            existing_id = self.item_ids.get(item.slug)
+
+            if existing_id:
+                items_updated += 1
+
+            if item.item_type == "Service" or item.has_variants:
+                item.barcode = None
+            else:
+                item.barcode = self.item_barcodes.get(existing_id)
+
+                if not item.barcode:
+                    needs_barcode.append(item)
+
+        for item, code in zip(needs_barcode, reserve_barcodes(len(needs_barcode))):
+            item.barcode = code
+
+        Item.objects.bulk_create(
+            items,
+            update_conflicts=True,
+            unique_fields=["business", "slug"],
+            update_fields=ITEM_FIELDS,
+        )
+
+        stats["items_created"] = len(items) - items_updated
+        stats["items_updated"] = items_updated
+
+        if not variants:
+            return
+
+        # ---------------- Variants ----------------
+        variants_updated = 0
+        variant_objs = []
+        needs_barcode = []
+
+        for variant, _, _ in variants:
+            # Re-assigning picks up the id the item upsert returned
+            variant.item = variant.item
+
+            existing_id = self.variant_ids.get((variant.item_id, variant.sku))
+
+            if existing_id:
+                variants_updated += 1
+
+            if variant.item.item_type == "Service":
+                variant.barcode = None
+            else:
+                variant.barcode = self.variant_barcodes.get(existing_id)
+
+                if not variant.barcode:
+                    needs_barcode.append(variant)
+
+            variant_objs.append(variant)
+
+        for variant, code in zip(needs_barcode, reserve_barcodes(len(needs_barcode))):
+            variant.barcode = code
+
+        ItemVariant.objects.bulk_create(
+            variant_objs,
+            update_conflicts=True,
+            unique_fields=["item", "sku"],
+            update_fields=VARIANT_FIELDS,
+        )
+
+        stats["variants_created"] = len(variant_objs) - variants_updated
+        stats["variants_updated"] = variants_updated
+
+        # ---------------- Attributes ----------------
+        attributes = [
+            VariantAttribute(
+                variant=variant,
+                attribute_name=name,
+                attribute_value=value,
+            )
+            for variant, variant_attributes, _ in variants
+            for name, value in variant_attributes.items()
+        ]
+
+        if attributes:
+            VariantAttribute.objects.bulk_create(
+                attributes,
+                update_conflicts=True,
+                unique_fields=["variant", "attribute_name"],
+                update_fields=["attribute_value"],
+            )
+
+        stats["attributes_upserted"] = len(attributes)
+
+        # ---------------- Images ----------------
+        variant_ids = [variant.id for variant, _, images in variants if images]
+
+        existing_images = set(
+            VariantImage.objects
+            .filter(variant_id__in=variant_ids)
+            .values_list("variant_id", "image_url")
+        ) if variant_ids else set()
+
+        images = [
+            VariantImage(variant=variant, image_url=image_url)
+            for variant, _, variant_images in variants
+            for image_url in variant_images
+            if (variant.id, image_url) not in existing_images
+        ]
+
+        if images:
+            VariantImage.objects.bulk_create(images)
+
+        stats["images_created"] = len(images)
@@ -0,0 +1,181 @@
+import os
+import socket
+from datetime import timedelta
+from io import BytesIO, TextIOWrapper
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .importer import CatalogImporter
+from .models import ImportFile, ImportJob
+
+
+# A running job whose worker has not reported for this long is requeued,
+# or failed once it has used up its attempts
+STALE_AFTER = timedelta(minutes=10)
+
+MAX_ATTEMPTS = 3
+
+# Only the first errors are kept on the job row
+MAX_STORED_ERRORS = 500
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def count_rows(uploaded_file):
+    lines = 0
+    last = b""
+
+    for chunk in uploaded_file.chunks():
+        lines += chunk.count(b"\n")
+        last = chunk
+
+    if last and not last.endswith(b"\n"):
+        lines += 1
+
+    uploaded_file.seek(0)
+
+    # Minus the header row
+    return max(lines - 1, 0)
+
+
+@transaction.atomic
+def enqueue_import(business, user, uploaded_file, chunk_size=500):
+    total_rows = count_rows(uploaded_file)
+
+    job = ImportJob.objects.create(
+        business=business,
+        created_by=user,
+        file_name=uploaded_file.name,
+        chunk_size=chunk_size,
+        total_rows=total_rows,
+    )
+
+    ImportFile.objects.create(job=job, data=uploaded_file.read())
+
+    return job
+
+
+def finish_job(job_id, **fields):
+    """Sets the final state of a job and drops its upload."""
+    with transaction.atomic():
+        ImportJob.objects.filter(pk=job_id).update(
+            finished_at=timezone.now(),
+            **fields
+        )
+        ImportFile.objects.filter(job_id=job_id).delete()
+
+
+def fail_abandoned_jobs(now):
+    """Jobs whose worker died on their last attempt will never finish."""
+    abandoned = ImportJob.objects.filter(
+        status="Running",
+        heartbeat_at__lt=now - STALE_AFTER,
+        attempts__gte=MAX_ATTEMPTS,
+    ).values_list("pk", flat=True)
+
+    for job_id in abandoned:
+        finish_job(
+            job_id,
+            status="Failed",
+            errors=[
+                f"Import failed: the worker stopped reporting, "
+                f"{MAX_ATTEMPTS} attempts used."
+            ],
+        )
+
+
+def claim_next_job(worker=None):
+    """
+    Picks the oldest queued job, or a running one whose worker went
+    quiet, and marks it as ours. SKIP LOCKED lets several workers poll
+    the same table without blocking each other.
+    """
+    now = timezone.now()
+
+    fail_abandoned_jobs(now)
+
+    with transaction.atomic():
+        job = (
+            ImportJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                Q(status="Queued")
+                | Q(
+                    status="Running",
+                    heartbeat_at__lt=now - STALE_AFTER,
+                    attempts__lt=MAX_ATTEMPTS,
+                )
+            )
+            .order_by("created_at")
+            .first()
+        )
+
+        if job is None:
+            return None
+
+        job.status = "Running"
+        job.worker = worker or worker_name()
+        job.attempts += 1
+        job.rows_processed = 0
+        job.errors = []
+        job.started_at = now
+        job.heartbeat_at = now
+        job.save(update_fields=[
+            "status",
+            "worker",
+            "attempts",
+            "rows_processed",
+            "errors",
+            "started_at",
+            "heartbeat_at",
+        ])
+
+    return job
+
+
+def run_job(job):
+    rows_processed = 0
+
+    def on_chunk(stats, errors):
+        nonlocal rows_processed
+        rows_processed += stats["rows"]
+
+        ImportJob.objects.filter(pk=job.pk).update(
+            rows_processed=rows_processed,
+            errors=errors[:MAX_STORED_ERRORS],
+            heartbeat_at=timezone.now(),
+        )
+
+    try:
+        data = ImportFile.objects.values_list("data", flat=True).get(job=job)
+
+        # utf-8-sig safely ignores the invisible Excel BOM if present
+        csv_file = TextIOWrapper(BytesIO(data), encoding="utf-8-sig")
+
+        result = CatalogImporter(
+            job.business,
+            chunk_size=job.chunk_size
+        ).run(csv_file, on_chunk=on_chunk)
+
+    except Exception as e:
+        finish_job(
+            job.pk,
+            status="Failed",
+            errors=[f"Import failed: {str(e)}"],
+        )
+        return
+
+    result["summary"]["chunks"] = len(result["chunks"])
+
+    finish_job(
+        job.pk,
+        status="Completed",
+        rows_processed=result["summary"]["rows"],
+        summary=result["summary"],
+        errors=result["errors"][:MAX_STORED_ERRORS],
+        heartbeat_at=timezone.now(),
+    )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from business_entity.models import BusinessEntity
+from products.catalog import rebuild_business_catalog
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the storefront item snapshots and category index."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--business",
+            type=int,
+            action="append",
+            help="Business id to rebuild. Repeatable; defaults to all."
+        )
+
+    def handle(self, *args, **options):
+        businesses = BusinessEntity.objects.all()
+
+        if options["business"]:
+            businesses = businesses.filter(id__in=options["business"])
+
+        for business_id in businesses.values_list("id", flat=True):
+            rebuild_business_catalog(business_id)
+            self.stdout.write(f"Rebuilt catalog of business {business_id}.")
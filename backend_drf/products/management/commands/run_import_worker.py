@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from products.jobs import claim_next_job, run_job, worker_name
+
+
+class Command(BaseCommand):
+    help = "Processes queued bulk catalog imports."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process every queued job, then exit."
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls when the queue is empty."
+        )
+
+    def handle(self, *args, **options):
+        name = worker_name()
+        self.stdout.write(f"Import worker {name} started.")
+
+        while True:
+            close_old_connections()
+
+            job = claim_next_job(name)
+
+            if job is None:
+                if options["once"]:
+                    break
+
+                time.sleep(options["sleep"])
+                continue
+
+            self.stdout.write(f"Importing {job.file_name} ({job.uid})")
+            run_job(job)
+            job.refresh_from_db()
+            self.stdout.write(f"Job {job.uid} {job.status.lower()}.")
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business_entity', '0013_alter_businessentity_slug'),
+        ('products', '0026_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessCatalog',
+            fields=[
+                ('business', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='catalog', serialize=False, to='business_entity.businessentity')),
+                ('categories', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ItemSnapshot',
+            fields=[
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='products.item')),
+                ('slug', models.SlugField(blank=True, db_index=False, max_length=200, null=True)),
+                ('item_type', models.CharField(max_length=10)),
+                ('is_visible', models.BooleanField(default=True)),
+                ('best_selling', models.BooleanField(default=False)),
+                ('trending', models.BooleanField(default=False)),
+                ('created_date', models.DateField()),
+                ('payload', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_snapshots', to='business_entity.businessentity')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['business', 'is_visible', 'created_date'], name='products_it_busines_84819f_idx'), models.Index(fields=['business', 'slug'], name='products_it_busines_f5508f_idx')],
+            },
+        ),
+    ]
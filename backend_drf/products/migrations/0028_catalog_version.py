@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:33
+
+from django.db import migrations, models
+
+
+def backfill_catalogs(apps, schema_editor):
+    BusinessCatalog = apps.get_model("products", "BusinessCatalog")
+    BusinessEntity = apps.get_model("business_entity", "BusinessEntity")
+
+    # Catalogs that exist were built by rebuild_business_catalog
+    BusinessCatalog.objects.update(built_at=models.F("updated_at"))
+
+    # Every business gets a row so the marketplace version covers it;
+    # snapshots are built on the first storefront request
+    missing = BusinessEntity.objects.exclude(
+        id__in=BusinessCatalog.objects.values("business_id")
+    ).values_list("id", flat=True)
+
+    BusinessCatalog.objects.bulk_create([
+        BusinessCatalog(business_id=business_id)
+        for business_id in missing
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0027_item_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businesscatalog',
+            name='built_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='businesscatalog',
+            name='version',
+            field=models.PositiveBigIntegerField(default=1),
+        ),
+        migrations.RunPython(backfill_catalogs, migrations.RunPython.noop),
+    ]
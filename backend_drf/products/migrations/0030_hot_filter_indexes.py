@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business_entity', '0013_alter_businessentity_slug'),
+        ('products', '0029_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('isShow', True)), fields=['business', 'item_type', 'created_date'], name='item_visible_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemsnapshot',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['business', 'item_type', 'created_date'], name='snapshot_visible_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemsnapshot',
+            index=models.Index(condition=models.Q(('best_selling', True), ('is_visible', True)), fields=['business', 'item'], name='snapshot_best_selling_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemsnapshot',
+            index=models.Index(condition=models.Q(('is_visible', True), ('trending', True)), fields=['business', 'item'], name='snapshot_trending_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0031_reserved_stock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='cess_percent',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=5),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_pending_uploads(apps, schema_editor):
+    """
+    Copies the CSVs of jobs that haven't finished out of media storage
+    into ImportFile. A file that can't be read fails its job instead.
+    """
+    from django.core.files.storage import default_storage
+    from django.utils import timezone
+
+    ImportJob = apps.get_model("products", "ImportJob")
+    ImportFile = apps.get_model("products", "ImportFile")
+
+    for job in ImportJob.objects.filter(status__in=["Queued", "Running"]):
+        try:
+            with default_storage.open(job.file_path, "rb") as file:
+                ImportFile.objects.create(job=job, data=file.read())
+        except Exception as e:
+            job.status = "Failed"
+            job.errors = [f"Import failed: upload could not be moved ({e})"]
+            job.finished_at = timezone.now()
+            job.save(update_fields=["status", "errors", "finished_at"])
+            continue
+
+        default_storage.delete(job.file_path)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0032_gst_components'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.BinaryField()),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='upload', to='products.importjob')),
+            ],
+        ),
+        migrations.RunPython(move_pending_uploads, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='importjob',
+            name='file_path',
+        ),
+    ]
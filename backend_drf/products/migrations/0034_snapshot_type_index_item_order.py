@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business_entity', '0013_alter_businessentity_slug'),
+        ('products', '0033_import_file_in_database'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='itemsnapshot',
+            name='snapshot_visible_type_idx',
+        ),
+        migrations.AddIndex(
+            model_name='itemsnapshot',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['business', 'item_type', 'item'], name='snapshot_visible_type_idx'),
+        ),
+    ]
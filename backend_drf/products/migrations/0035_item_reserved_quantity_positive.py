@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:44
+
+from django.db import migrations, models
+
+
+def clear_negative_reservations(apps, schema_editor):
+    Item = apps.get_model("products", "Item")
+
+    # The column is about to get a >= 0 check; a negative count could
+    # only come from a release without a matching hold
+    Item.objects.filter(reserved_quantity__lt=0).update(reserved_quantity=0)
+
+
+def rebuild_catalogs(apps, schema_editor):
+    BusinessCatalog = apps.get_model("products", "BusinessCatalog")
+
+    # Snapshots now carry available_quantity / available_stock: rebuild
+    # them on the next storefront request, under a new ETag
+    BusinessCatalog.objects.update(
+        built_at=None,
+        version=models.F("version") + 1
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0034_snapshot_type_index_item_order'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_negative_reservations, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='item',
+            name='reserved_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(rebuild_catalogs, migrations.RunPython.noop),
+    ]
@@ -120,13 +120,17 @@
 
 
 import uuid
+from functools import partial
+from django.conf import settings
 from django.db import models
 from django.utils.text import slugify
 from business_entity.models import BusinessEntity
+from api.utils.slug import save_with_unique_slug
+from api.utils.barcode_allocator import next_barcode
 
 
 def generate_barcode():
-    return str(uuid.uuid4()).replace("-", "")[:12]
+    return next_barcode()
 
 
 class Item(models.Model):
@@ -207,6 +211,9 @@ class Item(models.Model):
 
     quantity_product = models.IntegerField(default=0)
 
+    # Units held by unexpired checkout reservations (order.StockReservation)
+    reserved_quantity = models.PositiveIntegerField(default=0)
+
     min_order_quantity_product = models.IntegerField(default=1)
 
     max_order_quantity_product = models.IntegerField(default=1)
@@ -235,6 +242,13 @@ class Item(models.Model):
         default=0
     )
 
+    # GST compensation cess, on top of tax_percent
+    cess_percent = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=0
+    )
+
     min_stock_product = models.IntegerField(default=0)
 
     # -----------------------------------
@@ -286,6 +300,17 @@ class Item(models.Model):
         )
         ordering = ["-created_date", "-id"]
 
+        indexes = [
+            # Keyset pagination of the item list
+            models.Index(fields=["business", "created_date", "id"]),
+            # Visible items of a business, by type (category index, marketplace)
+            models.Index(
+                fields=["business", "item_type", "created_date"],
+                condition=models.Q(isShow=True),
+                name="item_visible_type_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.item_name
 
@@ -303,6 +328,11 @@ class Item(models.Model):
 
         return self.quantity_product
 
+    @property
+    def available_quantity(self):
+        """Stock not held by a checkout reservation."""
+        return self.quantity_product - self.reserved_quantity
+
     @property
     def selling_price(self):
         """
@@ -313,22 +343,6 @@ class Item(models.Model):
 
     def save(self, *args, **kwargs):
 
-        # Generate unique slug
-        if not self.slug:
-            base_slug = slugify(self.item_name)
-            slug = base_slug
-            counter = 1
-
-            while Item.objects.filter(
-                business=self.business,
-                slug=slug
-            ).exclude(pk=self.pk).exists():
-
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-
-            self.slug = slug
-
         # Services never have barcode
         if self.item_type == "Service":
             self.barcode = None
@@ -342,25 +356,22 @@ class Item(models.Model):
 
         # Simple goods get barcode
         elif not self.barcode:
-            while True:
-                code = generate_barcode()
+            self.barcode = generate_barcode()
 
-                if not Item.objects.filter(
-                    barcode=code
-                ).exclude(pk=self.pk).exists():
-
-                    self.barcode = code
-                    break
+        # Generate unique slug
+        if not self.slug:
+            return save_with_unique_slug(
+                self,
+                partial(super().save, *args, **kwargs),
+                scope=f"item:{self.business_id}",
+                base_slug=slugify(self.item_name)[:200] or "item",
+                queryset=Item.objects.filter(business_id=self.business_id),
+            )
 
         super().save(*args, **kwargs)
 
 
 
-
-def generate_barcode():
-    return str(uuid.uuid4()).replace("-", "")[:12]
-
-
 import uuid 
 
 class ItemVariant(models.Model):
@@ -400,6 +411,9 @@ class ItemVariant(models.Model):
     # Inventory
     stock = models.PositiveIntegerField(default=0)
 
+    # Units held by unexpired checkout reservations (order.StockReservation)
+    reserved_stock = models.PositiveIntegerField(default=0)
+
     min_stock = models.PositiveIntegerField(default=0)
 
     # Pricing
@@ -444,11 +458,17 @@ class ItemVariant(models.Model):
     def __str__(self):
         return f"{self.item.item_name} ({self.variant_name or self.sku})"
 
+    @property
+    def available_stock(self):
+        """Stock not held by a checkout reservation."""
+        return self.stock - self.reserved_stock
+
     @property
     def display_name(self):
-        attrs = self.attributes.all()
+        # list() so a prefetched attributes cache is used as is
+        attrs = list(self.attributes.all())
 
-        if attrs.exists():
+        if attrs:
             return " / ".join(
                 attr.attribute_value
                 for attr in attrs
@@ -460,16 +480,7 @@ class ItemVariant(models.Model):
         if self.item.item_type == "Service":
             self.barcode = None
         elif not self.barcode:
-            # SAFETY PATCH: Limit the number of attempts to 100
-            for _ in range(100):
-                code = generate_barcode()
-                if not ItemVariant.objects.filter(barcode=code).exists():
-                    self.barcode = code
-                    break
-            else:
-                # If we couldn't find a barcode after 100 tries, 
-                # something is seriously wrong with your data
-                raise Exception("Could not generate unique barcode.")
+            self.barcode = generate_barcode()
         super().save(*args, **kwargs)
 
         
@@ -530,4 +541,184 @@ class VariantImage(models.Model):
         ordering = ["sort_order", "id"]
 
     def __str__(self):
-        return f"{self.variant.display_name} - Image {self.id}"
\ No newline at end of file
+        return f"{self.variant.display_name} - Image {self.id}"
+
+
+class ImportJob(models.Model):
+    STATUS_CHOICES = [
+        ("Queued", "Queued"),
+        ("Running", "Running"),
+        ("Completed", "Completed"),
+        ("Failed", "Failed"),
+    ]
+
+    uid = models.UUIDField(
+        default=uuid.uuid4,
+        unique=True,
+        editable=False
+    )
+
+    business = models.ForeignKey(
+        BusinessEntity,
+        on_delete=models.CASCADE,
+        related_name="import_jobs"
+    )
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="import_jobs"
+    )
+
+    file_name = models.CharField(max_length=255)
+
+    chunk_size = models.PositiveIntegerField(default=500)
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="Queued"
+    )
+
+    # Estimated from line count at upload time
+    total_rows = models.PositiveIntegerField(default=0)
+
+    rows_processed = models.PositiveIntegerField(default=0)
+
+    summary = models.JSONField(default=dict, blank=True)
+
+    errors = models.JSONField(default=list, blank=True)
+
+    attempts = models.PositiveIntegerField(default=0)
+
+    worker = models.CharField(max_length=100, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    started_at = models.DateTimeField(blank=True, null=True)
+
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.file_name} ({self.status})"
+
+
+class ImportFile(models.Model):
+    """
+    The uploaded CSV of an import job. Kept in the database, apart from
+    the job row that progress polls read, so the worker needs nothing
+    but the database and the file is never served from media storage.
+    Deleted once the job completes or fails.
+    """
+    job = models.OneToOneField(
+        ImportJob,
+        on_delete=models.CASCADE,
+        related_name="upload"
+    )
+
+    data = models.BinaryField()
+
+
+class ItemSnapshot(models.Model):
+    """
+    Precomputed storefront JSON for one item. The payload is the
+    ProductSerializer output without the business fields, which are the
+    same for every item and merged in once per request.
+    """
+    item = models.OneToOneField(
+        Item,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="snapshot"
+    )
+
+    business = models.ForeignKey(
+        BusinessEntity,
+        on_delete=models.CASCADE,
+        related_name="item_snapshots"
+    )
+
+    slug = models.SlugField(
+        max_length=200,
+        blank=True,
+        null=True,
+        db_index=False
+    )
+
+    item_type = models.CharField(max_length=10)
+
+    is_visible = models.BooleanField(default=True)
+
+    best_selling = models.BooleanField(default=False)
+
+    trending = models.BooleanField(default=False)
+
+    created_date = models.DateField()
+
+    payload = models.JSONField(default=dict)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["business", "is_visible", "created_date"]),
+            models.Index(fields=["business", "slug"]),
+            # Storefront goods / services tabs, in their item order
+            models.Index(
+                fields=["business", "item_type", "item"],
+                condition=models.Q(is_visible=True),
+                name="snapshot_visible_type_idx"
+            ),
+            # Storefront summary shelves
+            models.Index(
+                fields=["business", "item"],
+                condition=models.Q(is_visible=True, best_selling=True),
+                name="snapshot_best_selling_idx"
+            ),
+            models.Index(
+                fields=["business", "item"],
+                condition=models.Q(is_visible=True, trending=True),
+                name="snapshot_trending_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Snapshot of item {self.item_id}"
+
+
+class BusinessCatalog(models.Model):
+    """
+    Per-business storefront index: the visible categories in order of
+    first appearance, as ItemSummaryBySlugView lists them, and the
+    catalog version the public endpoints derive their ETags from.
+    """
+    business = models.OneToOneField(
+        BusinessEntity,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="catalog"
+    )
+
+    categories = models.JSONField(default=list)
+
+    # Bumped on every item, variant, image or business settings change
+    version = models.PositiveBigIntegerField(default=1)
+
+    # Set once the item snapshots of the business have been built
+    built_at = models.DateTimeField(blank=True, null=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Catalog of {self.business_id}"
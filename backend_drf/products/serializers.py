@@ -2,7 +2,7 @@ from rest_framework import serializers
 from business_entity.serializers import BusinessEntitySerializer
 from api.utils.file_upload import upload_file_to_s3
 from django.core.files.uploadedfile import UploadedFile
-from .models import Item, ItemVariant
+from .models import ImportJob, Item, ItemVariant
 
 from .models import ItemVariant
 
@@ -94,6 +94,8 @@ class VariantImageSerializer(serializers.ModelSerializer):
 class ItemVariantSerializer(serializers.ModelSerializer):
     attributes = VariantAttributeSerializer(many=True, read_only=True)
     images = VariantImageSerializer(many=True, read_only=True)
+    # Stock minus units held by checkout reservations
+    available_stock = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = ItemVariant
@@ -104,6 +106,7 @@ class ItemVariantSerializer(serializers.ModelSerializer):
             "sku",
             "barcode",
             "stock",
+            "available_stock",
             "min_stock",
             "mrp_base",
             "selling_price",
@@ -163,11 +166,11 @@ class ProductSerializer(serializers.ModelSerializer):
             'variants',
 
             # Pricing
-            'mrp_baseprice', 'gross_amount', 'tax_percent', 'price_includes_tax', 'tax_type',
+            'mrp_baseprice', 'gross_amount', 'tax_percent', 'cess_percent', 'price_includes_tax', 'tax_type',
 
             # Goods
             'brand_product', 'hsn_sac_code_product',
-            'unit_product', 'quantity_product',
+            'unit_product', 'quantity_product', 'available_quantity',
             'min_stock_product',
             'min_order_quantity_product',
             'max_order_quantity_product',
@@ -321,6 +324,11 @@ class ProductSerializer(serializers.ModelSerializer):
                 "tax_percent cannot be negative."
             )
 
+        if data.get("cess_percent", 0) < 0:
+            raise serializers.ValidationError(
+                "cess_percent cannot be negative."
+            )
+
         return data
     
 
@@ -349,4 +357,113 @@ class ProductSerializer(serializers.ModelSerializer):
         return self._validate_image(image)
 
 
+# ProductSerializer fields that depend only on the business
+BUSINESS_FIELDS = [
+    "business",
+    "currency_symbol",
+    "currency_code",
+    "price_includes_tax",
+    "tax_type",
+]
+
+
+class ItemSnapshotSerializer(ProductSerializer):
+    """ProductSerializer output stored in ItemSnapshot.payload."""
+
+    class Meta(ProductSerializer.Meta):
+        fields = [
+            field for field in ProductSerializer.Meta.fields
+            if field not in BUSINESS_FIELDS
+        ]
+
+
+class ProductEnvelopeSerializer(ItemSnapshotSerializer):
+    """
+    Item rows of an enveloped list: the business and currency fields
+    are sent once next to the results, each row only keeps business_id.
+    """
+    business_id = serializers.IntegerField(read_only=True)
+
+    class Meta(ItemSnapshotSerializer.Meta):
+        fields = ["business_id"] + ItemSnapshotSerializer.Meta.fields
+
+
+def product_business_fields(business):
+    """
+    The BUSINESS_FIELDS values for a business, computed once and merged
+    into every snapshot payload of that business.
+    """
+    item = Item(business=business)
+    product = ProductSerializer()
+
+    return {
+        "business": BusinessEntitySerializer(business).data,
+        "currency_symbol": product.get_currency_symbol(item),
+        "currency_code": product.get_currency_code(item),
+        "price_includes_tax": product.get_price_includes_tax(item),
+        "tax_type": product.get_tax_type(item),
+    }
+
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    job_id = serializers.UUIDField(source="uid", read_only=True)
+    progress_percent = serializers.SerializerMethodField()
+    rows_per_second = serializers.SerializerMethodField()
+    eta_seconds = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            "job_id",
+            "file_name",
+            "status",
+            "total_rows",
+            "rows_processed",
+            "progress_percent",
+            "rows_per_second",
+            "eta_seconds",
+            "summary",
+            "errors",
+            "attempts",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+    def _elapsed(self, obj):
+        if not obj.started_at:
+            return None
+
+        end = obj.finished_at or obj.heartbeat_at or obj.started_at
+        return (end - obj.started_at).total_seconds()
+
+    def get_progress_percent(self, obj):
+        if obj.status == "Completed":
+            return 100
+
+        if not obj.total_rows:
+            return 0
+
+        return min(round(obj.rows_processed * 100 / obj.total_rows, 1), 99.9)
+
+    def get_rows_per_second(self, obj):
+        elapsed = self._elapsed(obj)
+
+        if not elapsed:
+            return None
+
+        return round(obj.rows_processed / elapsed, 1)
+
+    def get_eta_seconds(self, obj):
+        if obj.status != "Running":
+            return 0 if obj.status in ["Completed", "Failed"] else None
+
+        rate = self.get_rows_per_second(obj)
+
+        if not rate:
+            return None
 
+        remaining = max(obj.total_rows - obj.rows_processed, 0)
+        return round(remaining / rate)
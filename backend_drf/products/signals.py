@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from business_entity.models import BusinessEntity
+
+from .catalog import bump_catalog_version, schedule_refresh
+from .models import Item, ItemVariant, VariantAttribute, VariantImage
+
+
+# Keep ItemSnapshot / BusinessCatalog in step with catalog edits. Bulk
+# writes send no signals; their callers refresh the catalog themselves.
+
+@receiver(post_save, sender=Item)
+def item_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_refresh(item_ids=[instance.id])
+
+
+@receiver(post_delete, sender=Item)
+def item_deleted(sender, instance, **kwargs):
+    schedule_refresh(business_ids=[instance.business_id])
+
+
+@receiver(post_save, sender=ItemVariant)
+@receiver(post_delete, sender=ItemVariant)
+def variant_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_refresh(item_ids=[instance.item_id])
+
+
+@receiver(post_save, sender=VariantAttribute)
+@receiver(post_delete, sender=VariantAttribute)
+@receiver(post_save, sender=VariantImage)
+@receiver(post_delete, sender=VariantImage)
+def variant_detail_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_refresh(variant_ids=[instance.variant_id])
+
+
+# Business settings are merged into storefront responses at request
+# time, so a change only needs to invalidate cached responses.
+
+@receiver(post_save, sender=BusinessEntity)
+def business_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_catalog_version(instance.id)
@@ -11,21 +11,35 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from .serializers import ProductSerializer
-from api.utils.barcode import generate_barcode_image
+from api.utils.barcode import (
+    FORMATS as BARCODE_FORMATS,
+    SYMBOLOGIES as BARCODE_SYMBOLOGIES,
+    generate_barcode_image,
+    render_label_pdf,
+    stream_barcode_zip,
+)
+from api.utils.barcode_allocator import is_valid_ean13
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import StreamingHttpResponse
+from django.utils.text import slugify
 from .models import ItemVariant, VariantAttribute
 from .serializers import VariantAttributeSerializer
 
 from rest_framework import generics, serializers, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from api.utils.envelope import BusinessEnvelopeMixin
+from api.utils.pagination import KeysetPagination
 
-class ItemListCreateView(generics.ListCreateAPIView):
+class ItemListCreateView(BusinessEnvelopeMixin, generics.ListCreateAPIView):
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-created_date", "-id")
 
     def get_business(self):
-        business = self.request.user.active_business
+        business = self.request.business
 
         if not business:
             raise serializers.ValidationError(
@@ -34,10 +48,16 @@ class ItemListCreateView(generics.ListCreateAPIView):
 
         return business
 
+    def get_envelope_business(self):
+        return self.get_business()
+
     def get_queryset(self):
         return Item.objects.filter(
             business=self.get_business()
-        ).prefetch_related("variants")
+        ).select_related("business__user").prefetch_related(
+            "variants__attributes",
+            "variants__images"
+        )
 
     def perform_create(self, serializer):
         serializer.save(
@@ -51,7 +71,7 @@ class ItemDetailView(generics.RetrieveUpdateDestroyAPIView):
     parser_classes = (MultiPartParser, FormParser)
 
     def get_business(self):
-        business = self.request.user.active_business
+        business = self.request.business
 
         if not business:
             raise serializers.ValidationError(
@@ -81,7 +101,7 @@ class DownloadBarcodeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        business = request.user.active_business
+        business = request.business
 
         if not business:
             return Response(
@@ -124,18 +144,176 @@ class DownloadBarcodeView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        image = generate_barcode_image(item.barcode)
+        # Not "format", DRF reserves that for content negotiation
+        fmt = request.query_params.get("image_format", "png").lower()
+        symbology = request.query_params.get("type", "code128").lower()
+
+        if fmt not in BARCODE_FORMATS or symbology not in BARCODE_SYMBOLOGIES:
+            return Response(
+                {"detail": "Unsupported barcode format or type."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if symbology == "ean13" and not is_valid_ean13(item.barcode):
+            return Response(
+                {"detail": "This barcode is not a valid EAN-13."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        image = generate_barcode_image(item.barcode, fmt, symbology)
 
         response = HttpResponse(
             image,
-            content_type="image/png"
+            content_type=BARCODE_FORMATS[fmt]
         )
 
         response["Content-Disposition"] = (
-            f'attachment; filename="{item.item_name}_barcode.png"'
+            f'attachment; filename="{item.item_name}_barcode.{fmt}"'
         )
 
         return response
+
+
+class BarcodeBatchView(APIView):
+    """
+    Renders many item and variant barcodes in one response, either as a
+    printable PDF label sheet or as a ZIP of images.
+
+    Body: {"items": [ids], "variants": [uids], "copies": 1,
+           "format": "pdf" | "zip", "image_format": "png" | "svg"}
+    """
+    permission_classes = [IsAuthenticated]
+
+    MAX_LABELS = 1000
+
+    def post(self, request):
+        business = request.business
+
+        if not business:
+            return Response(
+                {"detail": "No active business selected."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        item_ids = request.data.get("items") or []
+        variant_uids = request.data.get("variants") or []
+        output = request.data.get("format", "pdf")
+        image_format = request.data.get("image_format", "png")
+        symbology = request.data.get("type", "code128")
+
+        try:
+            copies = max(int(request.data.get("copies", 1)), 1)
+        except (TypeError, ValueError):
+            copies = 1
+
+        if copies > self.MAX_LABELS:
+            return Response(
+                {"detail": f"At most {self.MAX_LABELS} labels per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if output not in ("pdf", "zip"):
+            return Response(
+                {"detail": "format must be pdf or zip."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if image_format not in BARCODE_FORMATS or symbology not in BARCODE_SYMBOLOGIES:
+            return Response(
+                {"detail": "Unsupported barcode format or type."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not isinstance(item_ids, list) or not isinstance(variant_uids, list):
+            return Response(
+                {"detail": "items and variants must be lists."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            items = {
+                item.id: item
+                for item in Item.objects.filter(
+                    business=business,
+                    id__in=item_ids,
+                    barcode__isnull=False
+                ).only("id", "item_name", "barcode")
+            }
+
+            variants = {
+                str(variant.uid): variant
+                for variant in ItemVariant.objects.filter(
+                    item__business=business,
+                    uid__in=variant_uids,
+                    barcode__isnull=False
+                ).select_related("item").only(
+                    "uid", "sku", "variant_name", "barcode", "item__item_name"
+                )
+            }
+
+        except (TypeError, ValueError, DjangoValidationError):
+            return Response(
+                {"detail": "Invalid item or variant id."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Keep the order the labels were asked for
+        labels = []
+
+        for pk in item_ids:
+            item = items.get(int(pk)) if str(pk).isdigit() else None
+
+            if item:
+                labels.append((item.barcode, item.item_name))
+
+        for uid in variant_uids:
+            variant = variants.get(str(uid))
+
+            if variant:
+                labels.append((
+                    variant.barcode,
+                    f"{variant.item.item_name} {variant.variant_name or variant.sku}"
+                ))
+
+        if symbology == "ean13":
+            labels = [
+                label for label in labels
+                if is_valid_ean13(label[0])
+            ]
+
+        if not labels:
+            return Response(
+                {"detail": "No barcodes found for the selected products."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Checked before expanding, so a huge `copies` never builds the list
+        if len(labels) * copies > self.MAX_LABELS:
+            return Response(
+                {"detail": f"At most {self.MAX_LABELS} labels per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        labels = [label for label in labels for _ in range(copies)]
+
+        if output == "pdf":
+            response = StreamingHttpResponse(
+                [render_label_pdf(labels, symbology)],
+                content_type="application/pdf"
+            )
+            response["Content-Disposition"] = 'attachment; filename="barcode_labels.pdf"'
+            return response
+
+        response = StreamingHttpResponse(
+            stream_barcode_zip(
+                [(code, slugify(name) or "barcode") for code, name in labels],
+                image_format,
+                symbology
+            ),
+            content_type="application/zip"
+        )
+        response["Content-Disposition"] = 'attachment; filename="barcodes.zip"'
+        return response
     
 
 class ItemVariantListCreateView(generics.ListCreateAPIView):
@@ -144,7 +322,7 @@ class ItemVariantListCreateView(generics.ListCreateAPIView):
     parser_classes = (MultiPartParser, FormParser)
 
     def get_business(self):
-        business = self.request.user.active_business
+        business = self.request.business
 
         if not business:
             raise serializers.ValidationError(
@@ -194,7 +372,7 @@ class ItemVariantDetailView(generics.RetrieveUpdateDestroyAPIView):
     parser_classes = (MultiPartParser, FormParser)
 
     def get_business(self):
-        business = self.request.user.active_business
+        business = self.request.business
 
         if not business:
             raise serializers.ValidationError(
@@ -229,7 +407,7 @@ class VariantAttributeListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_business(self):
-        business = self.request.user.active_business
+        business = self.request.business
 
         if not business:
             raise serializers.ValidationError(
@@ -265,7 +443,7 @@ class VariantAttributeDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_business(self):
-        business = self.request.user.active_business
+        business = self.request.business
 
         if not business:
             raise serializers.ValidationError(
@@ -308,7 +486,7 @@ class VariantImageListCreateView(generics.ListCreateAPIView):
     )
 
     def get_business(self):
-        business = self.request.user.active_business
+        business = self.request.business
 
         if not business:
             raise serializers.ValidationError(
@@ -348,7 +526,7 @@ class VariantImageDetailView(generics.RetrieveUpdateDestroyAPIView):
     parser_classes = (MultiPartParser, FormParser)
 
     def get_business(self):
-        business = self.request.user.active_business
+        business = self.request.business
 
         if not business:
             raise serializers.ValidationError(
@@ -1001,153 +1179,66 @@ class VariantImageDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 
-import csv
-from io import TextIOWrapper
-from django.db import transaction
-from django.utils.text import slugify
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated
 
-from .models import Item, ItemVariant, VariantAttribute, VariantImage
+from .jobs import enqueue_import
+from .models import ImportJob
+from .serializers import ImportJobSerializer
 
 class BulkImportView(APIView):
+    """
+    Queues the CSV for the import worker and answers straight away.
+    Progress is read from BulkImportStatusView.
+    """
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
-    @transaction.atomic 
+    # A chunk is one transaction with all its rows in memory
+    MAX_CHUNK_SIZE = 5000
+
     def post(self, request, *args, **kwargs):
+        business = request.business
+
+        if not business:
+            return Response({"error": "No active business selected."}, status=400)
+
         file = request.FILES.get('file')
         if not file:
             return Response({"error": "No file provided"}, status=400)
 
+        if not file.name.lower().endswith('.csv'):
+            return Response({"error": "Only CSV files are allowed."}, status=400)
+
         try:
-            # utf-8-sig safely ignores the invisible Excel BOM if present
-            csv_file = TextIOWrapper(file.file, encoding='utf-8-sig')
-            reader = csv.DictReader(csv_file)
-        except Exception as e:
-            return Response({"error": f"Invalid CSV file format: {str(e)}"}, status=400)
-        
-        current_item = None
-        items_created = 0
-        items_updated = 0
-        variants_created = 0
-        variants_updated = 0
-
-        def parse_num(val, default=0):
-            try:
-                return float(val.strip()) if val and val.strip() else default
-            except ValueError:
-                return default
-
-        for row in reader:
-            item_name = row.get('Item Name', '').strip()
-            provided_slug = row.get('Item Slug', '').strip()
-            has_variants = row.get('Has Variants', 'FALSE').strip().upper() == 'TRUE'
-
-            # ---------------------------------------------------------
-            # 1. BASE ITEM CREATION
-            # ---------------------------------------------------------
-            # If Item Name is present, it's the Parent row.
-            if item_name:
-                final_slug = provided_slug if provided_slug else slugify(item_name)
-                
-                current_item, created = Item.objects.update_or_create(
-                    slug=final_slug, 
-                    business=request.user.active_business,
-                    defaults={
-                        'item_name': item_name,
-                        'item_type': row.get('Item Type', 'Goods'),
-                        'has_variants': has_variants,
-                        'description': row.get('Description', ''),
-                        'category': row.get('Category', ''),
-                        'subcategory': row.get('Subcategory', ''),
-                        'brand_product': row.get('Brand', ''),
-                        'hsn_sac_code_product': row.get('HSN', ''),
-                        'unit_product': row.get('Unit', 'Pcs'),
-                        'area': row.get('Area', ''),
-                        'customer_view': row.get('Customer View', 'General'),
-                        'availability_status_service': row.get('Availability Status', 'Available'),
-                        
-                        'tax_percent': parse_num(row.get('Tax %', 0)),
-                        'best_selling': row.get('Best Selling', 'FALSE').strip().upper() == 'TRUE',
-                        'trending': row.get('Trending', 'FALSE').strip().upper() == 'TRUE',
-                        'isShow': row.get('Show', 'FALSE').strip().upper() == 'TRUE',
-                        
-                        'item_image_url': row.get('Main Image', ''),
-                        'item_image_1': row.get('Image 1', ''),
-                        'item_image_2': row.get('Image 2', ''),
-                        'item_image_3': row.get('Image 3', ''),
-                        'item_video_link': row.get('Video URL', ''),
-                        'category_image_url': row.get('Category Image', ''),
-                        'subcategory_image_url': row.get('Subcategory Image', ''),
-                        
-                        'quantity_product': parse_num(row.get('Stock', 0)),
-                        'min_stock_product': parse_num(row.get('Minimum Stock', 0)),
-                        'mrp_baseprice': parse_num(row.get('MRP', 0)),
-                        'gross_amount': parse_num(row.get('Selling Price', 0)),
-                        'cost_price_product': parse_num(row.get('Cost Price', 0)),
-                        'min_order_quantity_product': parse_num(row.get('Minimum Order', 1)),
-                        'max_order_quantity_product': parse_num(row.get('Maximum Order', 1)),
-                    }
-                )
-                if created:
-                    items_created += 1
-                else:
-                    items_updated += 1
-
-            # ---------------------------------------------------------
-            # 2. VARIANT CREATION
-            # ---------------------------------------------------------
-            if not current_item or not current_item.has_variants:
-                continue 
-
-            variant_sku = row.get('Variant SKU', '').strip()
-            if variant_sku:
-                variant, v_created = ItemVariant.objects.update_or_create(
-                    item=current_item,
-                    sku=variant_sku,
-                    defaults={
-                        'variant_name': row.get('Variant Name', ''),
-                        'stock': parse_num(row.get('Variant Stock', 0)),
-                        'min_stock': parse_num(row.get('Variant Minimum Stock', 0)),
-                        'mrp_base': parse_num(row.get('Variant MRP', 0)),
-                        'selling_price': parse_num(row.get('Variant Selling Price', 0)),
-                        'cost_price': parse_num(row.get('Variant Cost Price', 0)),
-                        'min_order_quantity': parse_num(row.get('Variant Minimum Order', 1)),
-                        'max_order_quantity': parse_num(row.get('Variant Maximum Order', 1)),
-                        'is_active': row.get('Variant Active', 'TRUE').strip().upper() == 'TRUE',
-                    }
-                )
-                if v_created:
-                    variants_created += 1
-                else:
-                    variants_updated += 1
-
-                # Loop to extract Attr 1 through Attr 10
-                for i in range(1, 11):
-                    attr_name = row.get(f'Attr {i} Name', '').strip()
-                    attr_val = row.get(f'Attr {i} Value', '').strip()
-                    if attr_name and attr_val:
-                        VariantAttribute.objects.update_or_create(
-                            variant=variant, 
-                            attribute_name=attr_name, 
-                            defaults={'attribute_value': attr_val}
-                        )
-
-                # Loop to extract Variant Image 1 through Variant Image 10
-                for i in range(1, 11):
-                    image_url = row.get(f'Variant Image {i}', '').strip()
-                    if image_url:
-                        VariantImage.objects.get_or_create(variant=variant, image_url=image_url)
+            chunk_size = int(request.data.get('chunk_size', 500))
+        except (TypeError, ValueError):
+            chunk_size = 500
+
+        job = enqueue_import(
+            business,
+            request.user,
+            file,
+            chunk_size=min(max(chunk_size, 1), self.MAX_CHUNK_SIZE)
+        )
 
         return Response({
-            "message": "Import Successful",
-            "items_created": items_created,
-            "items_updated": items_updated,
-            "variants_created": variants_created,
-            "variants_updated": variants_updated
-        }, status=200)
-    
+            "message": "Import queued",
+            "job_id": job.uid,
+            "status": job.status,
+            "total_rows": job.total_rows,
+        }, status=202)
 
+
+class BulkImportStatusView(generics.RetrieveAPIView):
+    serializer_class = ImportJobSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_field = "uid"
+    lookup_url_kwarg = "job_id"
+
+    def get_queryset(self):
+        return ImportJob.objects.filter(
+            business=self.request.business
+        )